@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import io
+import os
+import pyarrow.feather as feather
 from datetime import datetime, timedelta
 
 # Page configuration
@@ -49,8 +52,60 @@ st.markdown("""
 # Title
 st.markdown('<div class="linkedin-blue"><h1>🤝 LinkedIn Lead Outreach Tracker</h1><p>30-Day Challenge: 40 Connection Requests Daily + AI Systems Offer Follow-up</p></div>', unsafe_allow_html=True)
 
+# Local data tier: trackers persist as Feather files between sessions, in this app's own subdirectory
+# (the other apps keep datasets of the same names with different schemas next to it)
+LOCAL_DATA_ROOT = os.environ.get("LINKEDIN_TRACKER_DATA_DIR", ".data")
+LOCAL_DATA_DIR = os.path.join(LOCAL_DATA_ROOT, "a34pp")
+# Files written to the shared root before the split are adopted only if they have this app's columns
+LEGACY_DATASET_COLUMNS = {"daily_tracker": "Follow_Up_1", "leads_database": "Stage"}
+
+def load_local_dataset(name):
+    path = os.path.join(LOCAL_DATA_DIR, f"{name}.feather")
+    legacy = not os.path.exists(path)
+    if legacy:
+        path = os.path.join(LOCAL_DATA_ROOT, f"{name}.feather")
+        if name not in LEGACY_DATASET_COLUMNS or not os.path.exists(path):
+            return None
+    try:
+        df = feather.read_table(path, memory_map=True).to_pandas()
+    except Exception:
+        return None
+    if legacy and LEGACY_DATASET_COLUMNS[name] not in df.columns:
+        return None
+    return df
+
+def save_local_dataset(name, df):
+    os.makedirs(LOCAL_DATA_DIR, exist_ok=True)
+    path = os.path.join(LOCAL_DATA_DIR, f"{name}.feather")
+    try:
+        feather.write_feather(df.reset_index(drop=True), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        return True
+    except Exception:
+        return False
+
+# Leads schema: stage and connection status are categoricals over fixed sets, the checkboxes are booleans
+LEAD_STAGES = ["Connection Sent", "Connection Accepted", "Initial Message Sent", "Interested in AI Systems", "Link Sent",
+               "Follow-up 1", "Follow-up 2", "Follow-up 3", "Follow-up 4", "Converted", "Not Interested"]
+CONNECTION_STATUSES = ["Pending", "Accepted", "Declined"]
+LEAD_FLAG_COLUMNS = ['Initial_Message_Sent', 'Interested', 'Converted']
+
+def apply_leads_schema(df):
+    for col, categories in (('Stage', LEAD_STAGES), ('Connection_Status', CONNECTION_STATUSES)):
+        if col in df.columns:
+            # Values outside the fixed set (e.g. from an uploaded CSV) are kept as extra categories
+            extra = pd.Index(df[col].dropna().unique()).difference(categories)
+            df[col] = df[col].astype(pd.CategoricalDtype(categories + extra.tolist()))
+    for col in LEAD_FLAG_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].eq(True)
+    return df
+
 # Initialize session state
 if 'daily_tracker' not in st.session_state:
+    st.session_state.daily_tracker = load_local_dataset("daily_tracker")
+
+if st.session_state.daily_tracker is None:
     start_date = datetime.now()
     dates = [(start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(30)]
     
@@ -71,7 +126,12 @@ if 'daily_tracker' not in st.session_state:
     })
 
 if 'leads_database' not in st.session_state:
-    st.session_state.leads_database = pd.DataFrame({
+    st.session_state.leads_database = load_local_dataset("leads_database")
+    if st.session_state.leads_database is not None:
+        st.session_state.leads_database = apply_leads_schema(st.session_state.leads_database)
+
+if st.session_state.leads_database is None:
+    st.session_state.leads_database = apply_leads_schema(pd.DataFrame({
         'Name': [],
         'LinkedIn_URL': [],
         'Date_Connected': [],
@@ -86,7 +146,7 @@ if 'leads_database' not in st.session_state:
         'Follow_Up_4_Date': [],
         'Converted': [],
         'Notes': []
-    })
+    }))
 
 if 'challenge_start_date' not in st.session_state:
     st.session_state.challenge_start_date = datetime.now().strftime("%Y-%m-%d")
@@ -96,6 +156,29 @@ def get_current_day():
     days_elapsed = (datetime.now() - datetime.strptime(st.session_state.challenge_start_date, "%Y-%m-%d")).days + 1
     return min(days_elapsed, 30)
 
+# Next-action classifier: each lead gets exactly one action bucket, the earliest outstanding pipeline step
+NEXT_ACTIONS = ["Send Initial Message", "Send Checklist Link", "Follow-up 1", "Follow-up 2", "Follow-up 3", "Follow-up 4"]
+
+def classify_next_actions(leads):
+    link_sent_date = leads['Link_Sent_Date']
+    # Stages are factorized in one pass and only the distinct values are matched: k-1 for "Follow-up k", else -1
+    stage_codes, stages = pd.factorize(leads['Stage'])
+    follow_up = np.append(pd.Index(NEXT_ACTIONS[2:]).get_indexer(stages), -1)[stage_codes]
+    conditions = [
+        (leads['Connection_Status'].eq('Accepted') & leads['Initial_Message_Sent'].eq(False)).to_numpy(),
+        (leads['Interested'].eq(True) & (link_sent_date.isna() | link_sent_date.eq(''))).to_numpy(),
+    ] + [follow_up == n for n in range(4)]
+    codes = np.select(conditions, np.arange(len(NEXT_ACTIONS), dtype=np.int8), default=-1).astype(np.int8)
+    
+    # One stable sort groups the row positions by bucket; -1 (no action) sorts first
+    counts = np.bincount(codes + 1, minlength=len(NEXT_ACTIONS) + 1)
+    groups = np.split(np.argsort(codes, kind='stable'), np.cumsum(counts)[:-1])
+    return {
+        'codes': codes,
+        'counts': dict(zip(NEXT_ACTIONS, counts[1:].tolist())),
+        'rows': {action: leads.index[groups[code + 1]] for code, action in enumerate(NEXT_ACTIONS)}
+    }
+
 # Sidebar
 st.sidebar.header("📊 Challenge Overview")
 current_day = get_current_day()
@@ -158,13 +241,18 @@ st.sidebar.download_button(
 uploaded_daily = st.sidebar.file_uploader("📤 Upload Daily Tracker", type=['csv'], key="daily")
 if uploaded_daily:
     st.session_state.daily_tracker = pd.read_csv(uploaded_daily)
+    save_local_dataset("daily_tracker", st.session_state.daily_tracker)
     st.sidebar.success("✅ Daily tracker loaded!")
 
 uploaded_leads = st.sidebar.file_uploader("📤 Upload Leads Database", type=['csv'], key="leads")
 if uploaded_leads:
-    st.session_state.leads_database = pd.read_csv(uploaded_leads)
+    st.session_state.leads_database = apply_leads_schema(pd.read_csv(uploaded_leads))
+    save_local_dataset("leads_database", st.session_state.leads_database)
     st.sidebar.success("✅ Leads database loaded!")
 
+# Classified once per run; the leads database and the daily checklist both read this result
+next_actions = classify_next_actions(st.session_state.leads_database)
+
 # Main Dashboard
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Dashboard", "📅 Daily Tracker", "👥 Leads Database", "✅ Daily Checklist", "📖 Templates & Guide"])
 
@@ -312,6 +400,7 @@ with tab2:
             st.session_state.daily_tracker.loc[today_idx, 'Interested_Responses'] = interested_today
             st.session_state.daily_tracker.loc[today_idx, 'Links_Sent'] = links_today
             st.session_state.daily_tracker.loc[today_idx, 'Conversions'] = conversions_today
+            save_local_dataset("daily_tracker", st.session_state.daily_tracker)
             st.success("✅ Today's progress saved!")
             st.rerun()
     
@@ -343,6 +432,7 @@ with tab2:
     
     if st.button("💾 Update All Changes"):
         st.session_state.daily_tracker = edited_df
+        save_local_dataset("daily_tracker", edited_df)
         st.success("✅ All changes saved!")
 
 # TAB 3: LEADS DATABASE
@@ -356,21 +446,9 @@ with tab3:
         with col1:
             new_name = st.text_input("Name")
             new_linkedin = st.text_input("LinkedIn URL")
-            new_status = st.selectbox("Connection Status", ["Pending", "Accepted", "Declined"])
+            new_status = st.selectbox("Connection Status", CONNECTION_STATUSES)
         with col2:
-            new_stage = st.selectbox("Current Stage", [
-                "Connection Sent",
-                "Connection Accepted",
-                "Initial Message Sent",
-                "Interested in AI Systems",
-                "Link Sent",
-                "Follow-up 1",
-                "Follow-up 2",
-                "Follow-up 3",
-                "Follow-up 4",
-                "Converted",
-                "Not Interested"
-            ])
+            new_stage = st.selectbox("Current Stage", LEAD_STAGES)
             new_notes = st.text_area("Notes")
         
         if st.button("➕ Add Lead"):
@@ -391,7 +469,8 @@ with tab3:
                     'Converted': [False],
                     'Notes': [new_notes]
                 })
-                st.session_state.leads_database = pd.concat([st.session_state.leads_database, new_lead], ignore_index=True)
+                st.session_state.leads_database = apply_leads_schema(pd.concat([st.session_state.leads_database, new_lead], ignore_index=True))
+                save_local_dataset("leads_database", st.session_state.leads_database)
                 st.success(f"✅ Added {new_name} to database!")
                 st.rerun()
             else:
@@ -401,29 +480,20 @@ with tab3:
     
     # Filter leads
     st.markdown("### 🔍 Filter Leads")
-    filter_col1, filter_col2 = st.columns(2)
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
     
     with filter_col1:
-        stage_filter = st.multiselect("Filter by Stage", [
-            "All",
-            "Connection Sent",
-            "Connection Accepted",
-            "Initial Message Sent",
-            "Interested in AI Systems",
-            "Link Sent",
-            "Follow-up 1",
-            "Follow-up 2",
-            "Follow-up 3",
-            "Follow-up 4",
-            "Converted",
-            "Not Interested"
-        ], default=["All"])
+        stage_filter = st.multiselect("Filter by Stage", ["All"] + LEAD_STAGES, default=["All"])
     
     with filter_col2:
         connection_filter = st.multiselect("Filter by Connection Status", 
-                                          ["All", "Pending", "Accepted", "Declined"],
+                                          ["All"] + CONNECTION_STATUSES,
                                           default=["All"])
     
+    with filter_col3:
+        action_filter = st.multiselect("Filter by Next Action", NEXT_ACTIONS,
+                                       format_func=lambda action: f"{action} ({next_actions['counts'][action]})")
+    
     # Display filtered leads
     if len(st.session_state.leads_database) > 0:
         filtered_df = st.session_state.leads_database.copy()
@@ -434,6 +504,10 @@ with tab3:
         if "All" not in connection_filter and len(connection_filter) > 0:
             filtered_df = filtered_df[filtered_df['Connection_Status'].isin(connection_filter)]
         
+        if len(action_filter) > 0:
+            action_rows = np.concatenate([next_actions['rows'][action] for action in action_filter])
+            filtered_df = filtered_df[filtered_df.index.isin(action_rows)]
+        
         st.markdown(f"**Showing {len(filtered_df)} leads**")
         
         edited_leads = st.data_editor(
@@ -445,21 +519,9 @@ with tab3:
                 "LinkedIn_URL": st.column_config.LinkColumn("LinkedIn Profile"),
                 "Date_Connected": st.column_config.DateColumn("Connected"),
                 "Connection_Status": st.column_config.SelectboxColumn("Status", 
-                    options=["Pending", "Accepted", "Declined"]),
+                    options=CONNECTION_STATUSES),
                 "Stage": st.column_config.SelectboxColumn("Stage",
-                    options=[
-                        "Connection Sent",
-                        "Connection Accepted",
-                        "Initial Message Sent",
-                        "Interested in AI Systems",
-                        "Link Sent",
-                        "Follow-up 1",
-                        "Follow-up 2",
-                        "Follow-up 3",
-                        "Follow-up 4",
-                        "Converted",
-                        "Not Interested"
-                    ]),
+                    options=LEAD_STAGES),
                 "Initial_Message_Sent": st.column_config.CheckboxColumn("Messaged"),
                 "Interested": st.column_config.CheckboxColumn("Interested"),
                 "Converted": st.column_config.CheckboxColumn("Converted"),
@@ -472,6 +534,8 @@ with tab3:
             for idx, row in edited_leads.iterrows():
                 if idx in st.session_state.leads_database.index:
                     st.session_state.leads_database.loc[idx] = row
+            save_local_dataset("leads_database", st.session_state.leads_database)
+            next_actions = classify_next_actions(st.session_state.leads_database)
             st.success("✅ Lead database updated!")
     else:
         st.info("No leads in database yet. Add your first lead above!")
@@ -500,24 +564,20 @@ with tab4:
     if len(st.session_state.leads_database) > 0:
         st.markdown("## 📋 Action Items Today")
         
-        # New acceptances to message
-        to_message = st.session_state.leads_database[
-            (st.session_state.leads_database['Connection_Status'] == 'Accepted') &
-            (st.session_state.leads_database['Initial_Message_Sent'] == False)
-        ]
+        leads = st.session_state.leads_database
+        action_counts = next_actions['counts']
+        action_rows = next_actions['rows']
         
-        if len(to_message) > 0:
+        # New acceptances to message
+        if action_counts["Send Initial Message"] > 0:
+            to_message = leads.loc[action_rows["Send Initial Message"]]
             st.markdown(f'<div class="warning-box">⚠️ <b>{len(to_message)} new connections</b> waiting for initial AI Systems message</div>', unsafe_allow_html=True)
             with st.expander(f"View {len(to_message)} leads to message"):
                 st.dataframe(to_message[['Name', 'LinkedIn_URL', 'Date_Connected']], use_container_width=True)
         
         # Interested leads to send link
-        to_send_link = st.session_state.leads_database[
-            (st.session_state.leads_database['Interested'] == True) &
-            (st.session_state.leads_database['Link_Sent_Date'].astype(str) == '')
-        ]
-        
-        if len(to_send_link) > 0:
+        if action_counts["Send Checklist Link"] > 0:
+            to_send_link = leads.loc[action_rows["Send Checklist Link"]]
             st.markdown(f'<div class="warning-box">💡 <b>{len(to_send_link)} interested leads</b> waiting for checklist link</div>', unsafe_allow_html=True)
             with st.expander(f"View {len(to_send_link)} leads to send link"):
                 st.dataframe(to_send_link[['Name', 'LinkedIn_URL', 'Stage']], use_container_width=True)
@@ -525,11 +585,9 @@ with tab4:
         # Follow-ups needed
         for follow_up_num in range(1, 5):
             stage_name = f"Follow-up {follow_up_num}"
-            leads_needing_followup = st.session_state.leads_database[
-                st.session_state.leads_database['Stage'] == stage_name
-            ]
             
-            if len(leads_needing_followup) > 0:
+            if action_counts[stage_name] > 0:
+                leads_needing_followup = leads.loc[action_rows[stage_name]]
                 st.markdown(f'<div class="stage-card">📧 <b>{len(leads_needing_followup)} leads</b> ready for Follow-up {follow_up_num}</div>', unsafe_allow_html=True)
                 with st.expander(f"View leads for Follow-up {follow_up_num}"):
                     st.dataframe(leads_needing_followup[['Name', 'LinkedIn_URL', 'Link_Sent_Date']], use_container_width=True)
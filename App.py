@@ -1,11 +1,29 @@
 import streamlit as st
 import pandas as pd
 import requests
+from urllib.parse import urlparse
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 import io
+import os
+import csv
+import sqlite3
+import time
+import hashlib
+import re
+import pyarrow.feather as feather
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import plotly.express as px
 import plotly.graph_objects as go
 
+logger = logging.getLogger(__name__)  # Failures in background threads, which cannot reach the page
+
 # Page configuration
 st.set_page_config(page_title="LinkedIn Outreach Tracker Pro", page_icon="🚀", layout="wide")
 
@@ -78,103 +96,475 @@ LEADS_DATABASE_SHEET_ID = "1eLEFvyV1_f74UC1g5uQ-xA7A62sK8Pog27KIjw_Sk3Y"
 DAILY_TRACKER_SHEET_NAME = "daily_tracker_20251021"
 LEADS_SHEET_GID = "1881909623"  # linkedin-tracking-csv.csv sheet
 
+# Local data tier
+# Each app keeps its files in its own subdirectory: the apps share dataset names but not their schemas
+LOCAL_DATA_DIR = os.path.join(os.environ.get("LINKEDIN_TRACKER_DATA_DIR", ".data"), "app")
+LOCAL_SYNC_INTERVAL = 60  # seconds between background syncs
+SHEET_CACHE_MAX_ENTRIES = 16  # parsed sheet frames kept in the shared cache
+SHEET_CACHE_TTL = 30  # seconds a frame is served without revalidating the export
+# Low-cardinality lead columns loaded as categoricals, so filters and counts compare integer codes
+LEADS_CATEGORICAL_COLUMNS = ['connection_status', 'status', 'search_term', 'search_city', 'search_country']
+# Long free-text lead columns; they are kept out of the leads frame in a SQLite store and loaded on demand
+LEADS_TEXT_COLUMNS = ['linkedin_message', 'email_message', 'personalization_points', 'follow_up_suggestions', 'summary']
+LEADS_TEXT_CHUNK_ROWS = 5000  # rows per chunk when copying text columns from an export into the store
+LEADS_TEXT_QUERY_BATCH = 500  # lead URLs per SELECT when reading texts back
+SHEETS_DOWNLOAD_CHUNK_SIZE = 1 << 20  # bytes per chunk when streaming an export to disk
+
+# Pooled HTTP session shared by every session in this process
+SHEETS_MAX_CONCURRENT_PER_HOST = 4
+
+@st.cache_resource
+def get_http_session():
+    """Process-wide HTTP session with keep-alive pooling and retry/backoff on 429/5xx"""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@st.cache_resource
+def get_host_limits():
+    """Per-host semaphores capping concurrent requests to the same host"""
+    return {"lock": threading.Lock(), "semaphores": {}}
+
+@contextmanager
+def http_get(url, timeout=10, **kwargs):
+    """GET a URL through the pooled session; the per-host slot is held until the response is closed on exit"""
+    host = urlparse(url).netloc
+    limits = get_host_limits()
+    with limits["lock"]:
+        if host not in limits["semaphores"]:
+            limits["semaphores"][host] = threading.BoundedSemaphore(SHEETS_MAX_CONCURRENT_PER_HOST)
+        semaphore = limits["semaphores"][host]
+    with semaphore, get_http_session().get(url, timeout=timeout, **kwargs) as response:
+        yield response
+
+# Change detection: parsed frames are reused while an export's content is unchanged
+@st.cache_resource
+def get_sheet_snapshots():
+    """Process-wide LRU store of parsed sheet frames keyed by sheet ID and GID/name"""
+    return {"lock": threading.Lock(), "entries": OrderedDict()}
+
+def invalidate_sheet_snapshots():
+    """Expire every cached sheet frame so the next read revalidates it against Google"""
+    snapshots = get_sheet_snapshots()
+    with snapshots["lock"]:
+        for entry in snapshots["entries"].values():
+            entry["validated_at"] = 0
+
+def get_export_path(cache_key):
+    """Local path a sheet's CSV export is downloaded under; each download goes to its own temporary file next to it"""
+    return get_local_data_path("export_" + "_".join(re.sub(r"\W+", "_", str(part)) for part in cache_key) + ".csv")
+
+def download_export(response, path):
+    """Stream a response body to `path` chunk by chunk and return its SHA-256 digest"""
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        for chunk in response.iter_content(SHEETS_DOWNLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+def read_csv_header(path):
+    """Column names from the first line of a CSV file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+def read_leads_export(path):
+    """Parse a leads export without its long text columns, which are copied into the lead text store instead"""
+    header = read_csv_header(path)
+    text_cols = [col for col in header if col.strip() in LEADS_TEXT_COLUMNS]
+    url_cols = [col for col in header if col.strip() == 'linkedin_url']
+    if text_cols and url_cols:
+        chunks = pd.read_csv(path, usecols=url_cols[:1] + text_cols, dtype=str, chunksize=LEADS_TEXT_CHUNK_ROWS)
+        store_lead_texts(chunk.rename(columns=str.strip) for chunk in chunks)
+
+    usecols = [col for col in header if col.strip() not in LEADS_TEXT_COLUMNS]
+    if not usecols:
+        return pd.DataFrame()
+    # Cells are read as strings (categoricals for the low-cardinality columns) and typed by normalize_leads_database
+    dtypes = {col: 'category' if col.strip() in LEADS_CATEGORICAL_COLUMNS else str for col in usecols}
+    return pd.read_csv(path, usecols=usecols, dtype=dtypes)
+
+def fetch_sheet_snapshot(cache_key, url, normalize=None, parse=pd.read_csv):
+    """Download a CSV export and return its frame, skipping the parse and normalize steps when unchanged.
+
+    The body is streamed to a temporary file rather than held in memory, `parse` reads the frame from it,
+    and the file is removed afterwards. The returned frame is shared across sessions and must be treated as read-only.
+    """
+    snapshots = get_sheet_snapshots()
+    with snapshots["lock"]:
+        entry = snapshots["entries"].get(cache_key)
+        if entry is not None:
+            snapshots["entries"].move_to_end(cache_key)
+
+    # Within the TTL every session shares the cached frame without touching the network
+    if entry is not None and entry["url"] == url and time.time() - entry["validated_at"] < SHEET_CACHE_TTL:
+        return entry["df"]
+
+    headers = {}
+    if entry is not None and entry["url"] == url and entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+
+    download_path = f"{get_export_path(cache_key)}.{threading.get_ident()}.tmp"
+    try:
+        with http_get(url, timeout=10, headers=headers, stream=True) as response:
+            if response.status_code == 304 and entry is not None:
+                entry["validated_at"] = time.time()
+                return entry["df"]
+            if response.status_code != 200:
+                return None
+            digest = download_export(response, download_path)
+
+        if entry is not None and entry["digest"] == digest:
+            entry["validated_at"] = time.time()
+            return entry["df"]
+        df = parse(download_path)
+    finally:
+        if os.path.exists(download_path):
+            os.remove(download_path)
+    if normalize is not None:
+        df = normalize(df)
+
+    with snapshots["lock"]:
+        snapshots["entries"][cache_key] = {
+            "url": url,
+            "digest": digest,
+            "etag": response.headers.get("ETag"),
+            "df": df,
+            "validated_at": time.time()
+        }
+        snapshots["entries"].move_to_end(cache_key)
+        while len(snapshots["entries"]) > SHEET_CACHE_MAX_ENTRIES:
+            snapshots["entries"].popitem(last=False)
+    return df
+
 # Function to get sheet data by GID
-def get_sheet_by_gid(sheet_id, gid):
+def get_sheet_by_gid(sheet_id, gid, normalize=None, parse=pd.read_csv):
     """Get Google Sheet data using GID"""
     try:
         url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            df = pd.read_csv(io.StringIO(response.text))
-            return df
+        return fetch_sheet_snapshot((sheet_id, gid), url, normalize, parse)
     except Exception as e:
         st.error(f"Error loading sheet with GID {gid}: {str(e)}")
     return None
 
 # Function to get sheet data by name (fallback)
-def get_sheet_by_name(sheet_id, sheet_name):
+def get_sheet_by_name(sheet_id, sheet_name, normalize=None):
+    urls = [
+        f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}",
+        f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+    ]
+    for url in urls:
+        try:
+            df = fetch_sheet_snapshot((sheet_id, sheet_name), url, normalize)
+            if df is not None:
+                return df
+        except:
+            pass
+    return None
+
+def normalize_daily_tracker(df):
+    """Clean column names and coerce the daily tracker's numeric columns"""
+    df.columns = df.columns.str.strip()
+    numeric_cols = ['Connections_Sent', 'Connections_Accepted', 'Initial_Messages_Sent',
+                  'Interested_Responses', 'Links_Sent', 'Follow_Up_1', 'Follow_Up_2',
+                  'Follow_Up_3', 'Follow_Up_4', 'Conversions']
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    return df
+
+# Local columnar data tier: the app reads Feather files that a background thread keeps in sync with Sheets
+def get_local_data_path(filename):
+    """Path inside the local data directory, created on first use"""
+    os.makedirs(LOCAL_DATA_DIR, exist_ok=True)
+    return os.path.join(LOCAL_DATA_DIR, filename)
+
+@st.cache_resource
+def get_local_dataset_cache():
+    """Process-wide cache of local datasets keyed by name and file mtime"""
+    return {"lock": threading.Lock(), "entries": {}}
+
+def load_local_dataset(name):
+    """Memory-map a dataset from the local tier; the returned frame is shared and read-only"""
+    path = get_local_data_path(f"{name}.feather")
     try:
-        url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            return pd.read_csv(io.StringIO(response.text))
-    except:
-        pass
+        version = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    cache = get_local_dataset_cache()
+    with cache["lock"]:
+        entry = cache["entries"].get(name)
+    if entry is not None and entry["version"] == version:
+        return entry["df"]
+
     try:
-        url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            return pd.read_csv(io.StringIO(response.text))
-    except:
+        df = feather.read_table(path, memory_map=True).to_pandas()
+    except Exception:
+        return None
+
+    with cache["lock"]:
+        cache["entries"][name] = {"version": version, "df": df}
+    return df
+
+def save_local_dataset(name, df):
+    """Atomically write a dataset to the local tier, returning False if it cannot be stored"""
+    path = get_local_data_path(f"{name}.feather")
+    try:
+        feather.write_feather(df.reset_index(drop=True), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        return True
+    except Exception:
+        return False
+
+def remove_local_dataset(name):
+    """Delete a dataset from the local tier if it exists"""
+    try:
+        os.remove(get_local_data_path(f"{name}.feather"))
+    except OSError:
         pass
-    return None
+
+@st.cache_resource
+def get_local_sync_state():
+    """Process-wide record of the sheet snapshot last written to each local dataset"""
+    return {}
 
 # Load daily tracker data
-@st.cache_data(ttl=60)
 def load_daily_tracker():
+    """Read the daily tracker from the local data tier, seeding it from the sheet on first use"""
     try:
-        df = get_sheet_by_name(DAILY_TRACKER_SHEET_ID, DAILY_TRACKER_SHEET_NAME)
+        # Saved progress and uploads live apart from the sheet mirror so the background sync never overwrites them
+        df = load_local_dataset("daily_tracker_edits")
+        if df is None:
+            df = load_local_dataset("daily_tracker")
+        if df is None:
+            df = get_sheet_by_name(DAILY_TRACKER_SHEET_ID, DAILY_TRACKER_SHEET_NAME, normalize=normalize_daily_tracker)
+            if df is not None and not df.empty:
+                save_local_dataset("daily_tracker", df)
         if df is not None and not df.empty:
-            df.columns = df.columns.str.strip()
-            numeric_cols = ['Connections_Sent', 'Connections_Accepted', 'Initial_Messages_Sent', 
-                          'Interested_Responses', 'Links_Sent', 'Follow_Up_1', 'Follow_Up_2', 
-                          'Follow_Up_3', 'Follow_Up_4', 'Conversions']
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-            return df
+            return df.copy()
         return create_empty_daily_tracker()
     except:
         return create_empty_daily_tracker()
 
+def normalize_leads_database(df):
+    """Keep the expected linkedin-tracking-csv.csv columns and parse their types"""
+    # Clean column names
+    df.columns = df.columns.str.strip()
+    
+    # Define expected columns from linkedin-tracking-csv.csv
+    expected_columns = [
+        'timestamp', 'profile_name', 'profile_location', 'profile_tagline',
+        'linkedin_url', 'linkedin_subject', 'linkedin_message',
+        'email_subject', 'email_message', 'outreach_strategy',
+        'personalization_points', 'follow_up_suggestions', 'connection_status',
+        'browserflow_session', 'success', 'credits_used', 'error_message',
+        'status', 'search_term', 'search_city', 'search_country',
+        'name', 'image_url', 'tagline', 'location', 'summary'
+    ]
+    
+    # Keep only columns that exist in both expected and actual dataframe
+    available_columns = [col for col in expected_columns if col in df.columns]
+    
+    if available_columns:
+        df = df[available_columns].copy()
+    
+    # Parse success column - TRUE means initial message sent or connection made
+    if 'success' in df.columns:
+        df['success'] = df['success'].astype(str).str.lower().isin(['true', 'yes', '1', 't'])
+    
+    # Parse timestamp column
+    if 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+    
+    # Parse credits_used as numeric
+    if 'credits_used' in df.columns:
+        df['credits_used'] = pd.to_numeric(df['credits_used'], errors='coerce').fillna(0)
+    
+    return apply_leads_schema(df)
+
+def apply_leads_schema(df):
+    """Store the low-cardinality lead columns as categoricals; returns df unchanged when they already are"""
+    columns = [col for col in LEADS_CATEGORICAL_COLUMNS
+               if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)]
+    if not columns:
+        return df
+    
+    df = df.copy(deep=False)
+    for col in columns:
+        df[col] = df[col].astype('category')
+    return df
+
+# Lead text store: long text columns in SQLite, keyed by the lead's linkedin_url so that frames from older
+# exports, re-sorted sheets and uploads all find their own texts
+def connect_lead_text_store():
+    """Connection to the on-disk lead text store, creating its table on first use"""
+    conn = sqlite3.connect(get_local_data_path("lead_texts.sqlite3"), timeout=30, isolation_level=None,
+                           check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    existing = [row[1] for row in conn.execute("PRAGMA table_info(lead_texts)")]
+    if existing and 'linkedin_url' not in existing:
+        conn.execute("DROP TABLE lead_texts")  # keyed by export row position; refilled by the next export
+    columns = ", ".join(f"{col} TEXT" for col in LEADS_TEXT_COLUMNS)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS lead_texts (linkedin_url TEXT PRIMARY KEY, {columns})")
+    return conn
+
+@st.cache_resource
+def get_lead_text_store():
+    """Process-wide connection to the lead text store and the lock serializing its use"""
+    return {"lock": threading.Lock(), "conn": connect_lead_text_store()}
+
+def store_lead_texts(chunks):
+    """Upsert the texts of the given frames (linkedin_url plus text columns); leads without a URL are skipped"""
+    columns = ['linkedin_url'] + LEADS_TEXT_COLUMNS
+    updates = ", ".join(f"{col} = excluded.{col}" for col in LEADS_TEXT_COLUMNS)
+    upsert = (f"INSERT INTO lead_texts ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+              f"ON CONFLICT (linkedin_url) DO UPDATE SET {updates}")
+    store = get_lead_text_store()
+    with store["lock"]:
+        conn = store["conn"]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for chunk in chunks:
+                chunk = chunk.reindex(columns=columns).astype(object)
+                chunk = chunk[chunk['linkedin_url'].notna() & (chunk['linkedin_url'] != '')]
+                conn.executemany(upsert, chunk.where(chunk.notna(), None).itertuples(index=False, name=None))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+def get_lead_texts(df, columns=LEADS_TEXT_COLUMNS):
+    """Requested text columns for the leads of a frame, looked up by linkedin_url and aligned to its index"""
+    if 'linkedin_url' not in df.columns:
+        return pd.DataFrame(index=df.index, columns=list(columns), dtype=object)
+    urls = df['linkedin_url'].astype(object).where(df['linkedin_url'].notna(), None).tolist()
+    wanted = list(dict.fromkeys(url for url in urls if url))
+    store = get_lead_text_store()
+    rows = []
+    with store["lock"]:
+        for start in range(0, len(wanted), LEADS_TEXT_QUERY_BATCH):
+            batch = wanted[start:start + LEADS_TEXT_QUERY_BATCH]
+            rows += store["conn"].execute(
+                f"SELECT linkedin_url, {', '.join(columns)} FROM lead_texts WHERE linkedin_url IN ({', '.join('?' * len(batch))})",
+                batch
+            ).fetchall()
+    texts = pd.DataFrame.from_records(rows, columns=['linkedin_url'] + list(columns), index='linkedin_url')
+    return texts.reindex(urls).set_axis(df.index)
+
+def with_lead_texts(df):
+    """Leads frame with its text columns joined back from the lead text store, for exports and detail tables"""
+    missing = [col for col in LEADS_TEXT_COLUMNS if col not in df.columns]
+    if not missing or df.empty:
+        return df
+    return df.join(get_lead_texts(df, missing))
+
+def split_lead_texts(df):
+    """Move the text columns of a leads frame (an older local file or an upload) into the store"""
+    text_cols = [col for col in LEADS_TEXT_COLUMNS if col in df.columns]
+    if not text_cols:
+        return df
+    if 'linkedin_url' in df.columns:
+        store_lead_texts([df[['linkedin_url'] + text_cols]])
+    return df.drop(columns=text_cols)
+
+def render_lead_text_details(df, key):
+    """Lead picker showing the selected lead's messages and summary, loaded from the lead text store"""
+    names = df['name'] if 'name' in df.columns else df.get('profile_name', pd.Series('Unknown', index=df.index))
+    labels = dict(zip(df.index.tolist(), names.tolist()))
+    lead_id = st.selectbox("Open Lead", list(labels), index=None, format_func=labels.get,
+                           placeholder="Select a lead", key=key)
+    if lead_id is None:
+        return
+
+    lead = with_lead_texts(df.loc[[lead_id]]).iloc[0]
+    for col in LEADS_TEXT_COLUMNS:
+        if pd.notna(lead.get(col)) and str(lead[col]).strip():
+            st.markdown(f"**{col.replace('_', ' ').title()}:**")
+            st.text(lead[col])
+
 # Load leads database
-@st.cache_data(ttl=60)
 def load_leads_database():
-    """Load leads database from linkedin-tracking-csv.csv sheet"""
+    """Load leads database from the local data tier, seeding it from linkedin-tracking-csv.csv on first use"""
     try:
-        # Try loading by GID first (for linkedin-tracking-csv.csv sheet)
-        df = get_sheet_by_gid(LEADS_DATABASE_SHEET_ID, LEADS_SHEET_GID)
+        # An uploaded leads CSV takes the place of the sheet mirror until the sheets are loaded again
+        upload = load_local_dataset("leads_database_upload")
+        if upload is not None and not upload.empty:
+            return upload
+
+        df = load_local_dataset("leads_database")
+        if df is None:
+            df = get_sheet_by_gid(LEADS_DATABASE_SHEET_ID, LEADS_SHEET_GID, normalize=normalize_leads_database,
+                                  parse=read_leads_export)
+            if df is not None and not df.empty:
+                save_local_dataset("leads_database", df)
+        else:
+            # Files written before the categorical schema or the lead text store are converted once
+            schema_df = apply_leads_schema(split_lead_texts(df))
+            if schema_df is not df:
+                df = schema_df
+                save_local_dataset("leads_database", df)
         
         if df is not None and not df.empty:
-            # Clean column names
-            df.columns = df.columns.str.strip()
-            
-            # Define expected columns from linkedin-tracking-csv.csv
-            expected_columns = [
-                'timestamp', 'profile_name', 'profile_location', 'profile_tagline',
-                'linkedin_url', 'linkedin_subject', 'linkedin_message',
-                'email_subject', 'email_message', 'outreach_strategy',
-                'personalization_points', 'follow_up_suggestions', 'connection_status',
-                'browserflow_session', 'success', 'credits_used', 'error_message',
-                'status', 'search_term', 'search_city', 'search_country',
-                'name', 'image_url', 'tagline', 'location', 'summary'
-            ]
-            
-            # Keep only columns that exist in both expected and actual dataframe
-            available_columns = [col for col in expected_columns if col in df.columns]
-            
-            if available_columns:
-                df = df[available_columns]
-            
-            # Parse success column - TRUE means initial message sent or connection made
-            if 'success' in df.columns:
-                df['success'] = df['success'].astype(str).str.lower().isin(['true', 'yes', '1', 't'])
-            
-            # Parse timestamp column
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-            
-            # Parse credits_used as numeric
-            if 'credits_used' in df.columns:
-                df['credits_used'] = pd.to_numeric(df['credits_used'], errors='coerce').fillna(0)
-            
-            return df
+            return df  # shared read-only frame
         
         return create_empty_leads_database()
     except Exception as e:
         st.sidebar.error(f"Error loading leads: {str(e)}")
         return create_empty_leads_database()
 
+# Pull all sheets at the same time
+def load_all_sheets():
+    """Fetch the daily tracker and leads database concurrently and write changed sheets to the local data tier"""
+    # Worker threads need the script context to use st.* inside the loaders (absent in the background sync)
+    ctx = get_script_run_ctx(suppress_warning=True)
+
+    def run_with_context(fetch):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        daily_future = executor.submit(run_with_context, lambda: get_sheet_by_name(
+            DAILY_TRACKER_SHEET_ID, DAILY_TRACKER_SHEET_NAME, normalize=normalize_daily_tracker))
+        leads_future = executor.submit(run_with_context, lambda: get_sheet_by_gid(
+            LEADS_DATABASE_SHEET_ID, LEADS_SHEET_GID, normalize=normalize_leads_database, parse=read_leads_export))
+        daily_data, leads_data = daily_future.result(), leads_future.result()
+
+    # Snapshot frames stay identical while a sheet is unchanged, so only changed sheets are rewritten
+    written = get_local_sync_state()
+    for name, df in (("daily_tracker", daily_data), ("leads_database", leads_data)):
+        if df is not None and not df.empty and written.get(name) is not df and save_local_dataset(name, df):
+            written[name] = df
+    return daily_data, leads_data
+
+# Background sync keeps the local data tier reconciled with Sheets
+@st.cache_resource
+def start_local_sync():
+    """Start the process-wide thread that re-pulls both sheets into the local data tier"""
+    def sync_forever():
+        while True:
+            try:
+                load_all_sheets()
+            except Exception:
+                logger.warning("Local data sync failed", exc_info=True)
+            time.sleep(LOCAL_SYNC_INTERVAL)
+
+    thread = threading.Thread(target=sync_forever, name="local-data-sync", daemon=True)
+    thread.start()
+    return thread
+
 # Create empty dataframes
 def create_empty_daily_tracker():
     start_date = datetime.now()
@@ -226,6 +616,8 @@ def create_empty_leads_database():
         'summary': []
     })
 
+start_local_sync()
+
 # Initialize session state
 if 'daily_tracker' not in st.session_state:
     st.session_state.daily_tracker = load_daily_tracker()
@@ -264,19 +656,19 @@ with st.sidebar.expander("🔍 Connection Info", expanded=False):
 col1, col2 = st.sidebar.columns(2)
 with col1:
     if st.button("⬇️ Load Sheets", use_container_width=True):
-        st.cache_data.clear()
+        invalidate_sheet_snapshots()
         with st.spinner("Loading data..."):
-            daily_data = load_daily_tracker()
-            leads_data = load_leads_database()
+            daily_data, leads_data = load_all_sheets()
             
             if daily_data is not None and not daily_data.empty:
-                st.session_state.sheets_data = daily_data
+                st.session_state.sheets_data = daily_data.copy()
                 st.sidebar.success(f"✅ Daily: {len(daily_data)} rows")
             else:
                 st.sidebar.warning("⚠️ No daily tracker data")
                 
             if leads_data is not None and not leads_data.empty:
                 st.session_state.leads_sheets_data = leads_data
+                remove_local_dataset("leads_database_upload")
                 st.sidebar.success(f"✅ Leads: {len(leads_data)} rows")
             else:
                 st.sidebar.warning("⚠️ No leads data")
@@ -284,7 +676,9 @@ with col1:
 
 with col2:
     if st.button("🔄 Refresh", use_container_width=True):
-        st.cache_data.clear()
+        invalidate_sheet_snapshots()
+        with st.spinner("Syncing with Google Sheets..."):
+            load_all_sheets()
         st.rerun()
 
 st.sidebar.markdown("---")
@@ -345,11 +739,10 @@ st.sidebar.download_button(
     use_container_width=True
 )
 
-csv_leads = io.StringIO()
-leads_df.to_csv(csv_leads, index=False)
+# Texts are joined back from the lead text store only when the file is requested
 st.sidebar.download_button(
     label="📥 Download Leads Database",
-    data=csv_leads.getvalue(),
+    data=lambda: with_lead_texts(leads_df).to_csv(index=False),
     file_name=f"leads_database_{datetime.now().strftime('%Y%m%d')}.csv",
     mime="text/csv",
     use_container_width=True
@@ -357,14 +750,29 @@ st.sidebar.download_button(
 
 # Upload
 uploaded_daily = st.sidebar.file_uploader("📤 Upload Daily Tracker", type=['csv'], key="daily")
-if uploaded_daily:
-    st.session_state.daily_tracker = pd.read_csv(uploaded_daily)
-    st.sidebar.success("✅ Loaded!")
+if uploaded_daily and st.session_state.get("uploaded_daily_id") != uploaded_daily.file_id:
+    upload_df = pd.read_csv(uploaded_daily)
+    if 'Date' not in upload_df.columns.str.strip():
+        st.sidebar.error("❌ Daily tracker CSV needs a Date column")
+    else:
+        daily_df = st.session_state.daily_tracker = normalize_daily_tracker(upload_df)
+        st.session_state.sheets_data = None
+        save_local_dataset("daily_tracker_edits", st.session_state.daily_tracker)
+        st.session_state.uploaded_daily_id = uploaded_daily.file_id
+        st.sidebar.success("✅ Loaded!")
 
 uploaded_leads = st.sidebar.file_uploader("📤 Upload Leads DB", type=['csv'], key="leads")
-if uploaded_leads:
-    st.session_state.leads_database = pd.read_csv(uploaded_leads)
-    st.sidebar.success("✅ Loaded!")
+if uploaded_leads and st.session_state.get("uploaded_leads_id") != uploaded_leads.file_id:
+    upload_df = pd.read_csv(uploaded_leads)
+    if 'linkedin_url' not in upload_df.columns.str.strip():
+        st.sidebar.error("❌ Leads CSV needs the linkedin-tracking-csv.csv columns (no linkedin_url column found)")
+    else:
+        # Texts go to the lead text store like a sheet pull and the frame is saved apart from the sheet mirror
+        leads_df = apply_leads_schema(split_lead_texts(normalize_leads_database(upload_df)))
+        save_local_dataset("leads_database_upload", leads_df)
+        st.session_state.leads_sheets_data = None
+        st.session_state.uploaded_leads_id = uploaded_leads.file_id
+        st.sidebar.success("✅ Loaded!")
 
 # Main Tabs
 tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
@@ -551,6 +959,7 @@ with tab2:
             daily_df.loc[today_idx, 'Links_Sent'] = link_today
             daily_df.loc[today_idx, 'Conversions'] = conv_today
             st.session_state.daily_tracker = daily_df
+            save_local_dataset("daily_tracker_edits", daily_df)
             st.success("✅ Saved!")
     
     st.markdown("---")
@@ -675,6 +1084,7 @@ with tab3:
         # Detailed view with all columns
         with st.expander("🔍 View All Columns & Details"):
             st.markdown("**All Available Columns:**")
+            # Long text columns live in the lead text store rather than in the frame
             
             # Show columns in organized groups
             col1, col2, col3 = st.columns(3)
@@ -684,7 +1094,7 @@ with tab3:
                 profile_cols = ['timestamp', 'profile_name', 'name', 'profile_location', 
                               'location', 'profile_tagline', 'tagline', 'image_url', 'summary']
                 for col in profile_cols:
-                    if col in filtered_df.columns:
+                    if col in filtered_df.columns or col in LEADS_TEXT_COLUMNS:
                         st.caption(f"• {col}")
             
             with col2:
@@ -693,7 +1103,7 @@ with tab3:
                                'email_subject', 'email_message', 'outreach_strategy',
                                'personalization_points', 'follow_up_suggestions']
                 for col in outreach_cols:
-                    if col in filtered_df.columns:
+                    if col in filtered_df.columns or col in LEADS_TEXT_COLUMNS:
                         st.caption(f"• {col}")
             
             with col3:
@@ -702,20 +1112,25 @@ with tab3:
                              'credits_used', 'error_message', 'search_term', 'search_city', 
                              'search_country']
                 for col in status_cols:
-                    if col in filtered_df.columns:
+                    if col in filtered_df.columns or col in LEADS_TEXT_COLUMNS:
                         st.caption(f"• {col}")
             
             st.markdown("---")
             st.markdown("**Full Data Table:**")
-            st.dataframe(filtered_df, width="stretch", height=400)
+            table_df = filtered_df
+            if st.checkbox("Include message and summary text", key="leads_include_texts"):
+                table_df = with_lead_texts(filtered_df)
+            st.dataframe(table_df, width="stretch", height=400)
+            
+            st.markdown("**Lead Details:**")
+            render_lead_text_details(filtered_df, "leads_detail_lead")
         
         # Export filtered data
         st.markdown("---")
-        csv_filtered = io.StringIO()
-        filtered_df.to_csv(csv_filtered, index=False)
+        # Built only when clicked, since it joins every filtered lead's texts back in
         st.download_button(
             label=f"📥 Download Filtered Leads ({len(filtered_df)} records)",
-            data=csv_filtered.getvalue(),
+            data=lambda: with_lead_texts(filtered_df).to_csv(index=False),
             file_name=f"filtered_leads_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
             mime="text/csv",
             width="stretch"
@@ -776,7 +1191,8 @@ with tab4:
             # Show column mapping
             with st.expander("📋 Column Structure"):
                 st.write("**Available Columns:**")
-                for i, col in enumerate(leads_df.columns, 1):
+                text_cols = [col for col in LEADS_TEXT_COLUMNS if col not in leads_df.columns]
+                for i, col in enumerate(list(leads_df.columns) + text_cols, 1):
                     st.caption(f"{i}. {col}")
             
             # Key metrics
@@ -854,7 +1270,8 @@ with tab4:
         st.info("💡 Data auto-refreshes every 60 seconds. Click 'Load Sheets' or 'Refresh' for immediate update.")
     with col2:
         if st.button("🔄 Refresh All Data Now", width="stretch", type="primary"):
-            st.cache_data.clear()
+            invalidate_sheet_snapshots()
+            load_all_sheets()
             st.rerun()
 
 # TAB 5: DAILY CHECKLIST
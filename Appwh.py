@@ -1,20 +1,35 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime, timedelta
 import json
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import requests
+from urllib.parse import urlparse
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import re
 import hashlib
-from io import BytesIO
 import base64
 import io
+import os
+import pyarrow.feather as feather
+import random
+import sqlite3
+import threading
+import weakref
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+logger = logging.getLogger(__name__) # Failures in background threads, which cannot reach the page
 
 # ==================== PAGE CONFIG ==================== #
 st.set_page_config(
@@ -30,26 +45,53 @@ CHAT_SHEET_NAME = "linkedin_chat_history_advanced 2"
 OUTREACH_SPREADSHEET_ID = "1eLEFvyV1_f74UC1g5uQ-xA7A62sK8Pog27KIjw_Sk3Y"
 OUTREACH_SHEET_NAME = "linkedin-tracking-csv.csv"
 MY_PROFILE = {"name": "Donmenico Hudson", "url": "https://www.linkedin.com/in/donmenicohudson/"}
-WEBHOOK_URL = "https://agentonline-u29564.vm.elestio.app/webhook/Leadlinked"
+WEBHOOK_URL = os.environ.get("LINKEDIN_TRACKER_WEBHOOK_URL", "https://agentonline-u29564.vm.elestio.app/webhook/Leadlinked")
 DAILY_TRACKER_SHEET_ID = "1UkuTf8VwGPIilTxhTEdP9K-zdtZFnThazFdGyxVYfmg"
 LEADS_DATABASE_SHEET_ID = "1eLEFvyV1_f74UC1g5uQ-xA7A62sK8Pog27KIjw_Sk3Y"
 DAILY_TRACKER_SHEET_NAME = "daily_tracker_20251021"
 LEADS_SHEET_GID = "1881909623"
+HTTP_MAX_CONCURRENT_PER_HOST = 4
+LOCAL_DATA_DIR = os.path.join(os.environ.get("LINKEDIN_TRACKER_DATA_DIR", ".data"), "appwh") # Per-app subdirectory; the apps share dataset names but not schemas
+LEADS_INCREMENTAL_SYNC = True # Leads tab is append-only; fetch only new rows after the first export
+LOCAL_SYNC_INTERVAL = 60 # Seconds between background syncs of the local data tier
+LOCAL_DATASETS = ["chat_df", "leads_database", "daily_tracker"]
+LEAD_STATUSES = ['Connected', 'Sent', 'Pending', 'Replied', 'Converted', 'Ready'] # Category set of the leads Status column
+CRM_SEARCH_FIELDS = {"name": "Contact_Name", "title": "Title", "company": "Company"} # field:value prefixes for the lead search
+CRM_SORT_COLUMNS = {"Last_Message_Date": "last_message_date", "Status": "status_rank", "Contact_Name": "contact_name"} # CRM sort options and the indexed CRM store column each orders by
+CRM_MIRROR_SNAPSHOTS = 4 # Leads snapshots mirrored in the CRM store at once (least recently used dropped)
+SEARCH_INDEX_MAX_DELTA = 1000 # Changed rows kept in the incremental overlay before the search index is rebuilt
+MESSAGE_HISTORY_PAGE_SIZE = 50 # Messages shown per page of a conversation thread
+HTML_FRAGMENT_CACHE_SIZE = 20000 # Rendered message bubbles and lead cards kept in memory
+FIGURE_CACHE_SIZE = 64 # Built Plotly figures kept in memory
+DAILY_CUBE_CACHE_SIZE = 8 # Daily tracker snapshots whose aggregate cube is kept in memory
+SHEET_CACHE_MAX_ENTRIES = 16 # Processed sheet snapshots kept in the shared cache (least recently used evicted)
+SHEET_CACHE_TTL = 30 # Seconds a snapshot is served without revalidating it against Google
+SHEET_DOWNLOAD_CHUNK_SIZE = 1 << 20 # Bytes per chunk when streaming a CSV export to disk
+LEAD_WRITE_BATCH_SIZE = 20 # Queued lead edits that trigger an immediate background flush
+LEAD_WRITE_MAX_DELAY = 5 # Seconds a queued lead edit may wait before it is flushed
+LEAD_WRITE_MAX_ATTEMPTS = 5 # Failed Sheets writes of a lead edit before it is given up and reported in the CRM
+WEBHOOK_WORKERS = 4 # Threads delivering webhooks from the outbox
+WEBHOOK_BATCH_SIZE = 1 # Lead payloads per POST; above 1 they are sent together as {"batch": [...]}
+WEBHOOK_MAX_ATTEMPTS = 8 # Deliveries are marked failed after this many attempts
+WEBHOOK_BACKOFF_BASE = 2 # Seconds before the first retry, doubled on every further attempt
+WEBHOOK_BACKOFF_MAX = 300 # Upper bound on the retry delay
+WEBHOOK_LEASE_SECONDS = 120 # A claimed delivery not finished within this time is taken over by another worker or process
 
 # ==================== SESSION STATE ==================== #
 for key, default in [
     ("authenticated", False), ("gsheets_client", None), ("activity_log", []),
-    ("sent_leads", set()), ("selected_leads", []), ("current_client", None),
+    ("sent_leads", set()), ("selected_leads", []), ("bulk_webhook_job", None), ("current_client", None),
     ("chat_df", pd.DataFrame()), ("outreach_df", pd.DataFrame()),
-    ("last_refresh", datetime.utcnow()), ("webhook_history", []), ("email_queue", []),
+    ("last_refresh", datetime.utcnow()), ("email_queue", []),
     ("show_notifications", True), ("dark_mode", False), ("selected_contact", None),
     ("filter_status", "all"), ("filter_date_range", 7), ("sort_by", "timestamp"),
-    ("search_query", ""), ("favorites", set()), ("notes", {}), ("tags", {}),
+    ("search_query", ""), ("favorites", set()),
     ("export_format", "csv"), ("auto_refresh", False), ("refresh_interval", 60),
     ("daily_tracker", pd.DataFrame()), ("leads_database", pd.DataFrame()),
-    ("challenge_start_date", datetime.now().strftime("%Y-%m-%d")), ("sheets_data", None),
-    ("leads_sheets_data", None), ("webhook_test_payload", "{}"),
-    ("current_page", "🏠 Dashboard") # Added for multi-page navigation
+    ("challenge_start_date", datetime.now().strftime("%Y-%m-%d")), ("snapshot_versions", {}),
+    ("webhook_test_payload", "{}"),
+    ("current_page", "🏠 Dashboard"), # Added for multi-page navigation
+    ("local_data_versions", {}), ("history_limit", MESSAGE_HISTORY_PAGE_SIZE)
 ]:
     if key not in st.session_state:
         st.session_state[key] = default
@@ -503,22 +545,63 @@ st.markdown("""
 
 # ==================== UTILITY FUNCTIONS ==================== #
 
+@st.cache_resource
+def get_http_session():
+    """Returns the process-wide HTTP session with keep-alive pooling and retry/backoff on 429/5xx."""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@st.cache_resource
+def get_host_limits():
+    """Returns the per-host semaphores that cap concurrent requests to the same host."""
+    return {"lock": threading.Lock(), "semaphores": {}}
+
+@contextmanager
+def http_get(url, timeout=10, **kwargs):
+    """Performs a GET through the pooled session as a context manager, respecting the per-host concurrency limit.
+    
+    The host's slot is held until the response is closed on exit, so streamed bodies count against the limit too.
+    """
+    host = urlparse(url).netloc
+    limits = get_host_limits()
+    with limits["lock"]:
+        if host not in limits["semaphores"]:
+            limits["semaphores"][host] = threading.BoundedSemaphore(HTTP_MAX_CONCURRENT_PER_HOST)
+        semaphore = limits["semaphores"][host]
+    with semaphore, get_http_session().get(url, timeout=timeout, **kwargs) as response:
+        yield response
+
+def authorize_gsheets_client():
+    """Builds an authorized gspread client from the service account in st.secrets."""
+    # Use st.secrets for credentials
+    creds_json = st.secrets["gcp_service_account"]
+    
+    # Define the scope
+    scope = ['https://spreadsheets.google.com/feeds',
+             'https://www.googleapis.com/auth/drive']
+    
+    # Create credentials object
+    creds = Credentials.from_service_account_info(creds_json, scopes=scope)
+    
+    # Authorize the client
+    return gspread.authorize(creds)
+
 def get_gsheets_client():
     """Initializes and returns the gspread client."""
     if st.session_state.gsheets_client is None:
         try:
-            # Use st.secrets for credentials
-            creds_json = st.secrets["gcp_service_account"]
-            
-            # Define the scope
-            scope = ['https://spreadsheets.google.com/feeds',
-                     'https://www.googleapis.com/auth/drive']
-            
-            # Create credentials object
-            creds = Credentials.from_service_account_info(creds_json, scopes=scope)
-            
-            # Authorize the client
-            client = gspread.authorize(creds)
+            client = authorize_gsheets_client()
             st.session_state.gsheets_client = client
             st.session_state.authenticated = True
             st.toast("✅ Google Sheets client authenticated successfully!", icon="🔑")
@@ -529,27 +612,370 @@ def get_gsheets_client():
             return None
     return st.session_state.gsheets_client
 
-def load_data_from_gsheets(spreadsheet_id, sheet_name, use_cache=True):
-    """Loads data from a Google Sheet into a pandas DataFrame."""
-    client = get_gsheets_client()
-    if client is None:
-        return pd.DataFrame()
+@st.cache_resource
+def get_sheet_snapshots():
+    """Returns the process-wide LRU cache of processed sheet snapshots, keyed by (spreadsheet_id, sheet).
     
-    # Simple caching mechanism
-    if use_cache and (spreadsheet_id, sheet_name) in st.session_state.sheets_data:
-        return st.session_state.sheets_data[(spreadsheet_id, sheet_name)]
+    Every session reads the same frames from here, so they must be treated as read-only.
+    """
+    return {"lock": threading.Lock(), "entries": OrderedDict(), "seq": 0}
+
+def get_snapshot(key):
+    """Returns the cached snapshot entry for a sheet key, or None."""
+    snapshots = get_sheet_snapshots()
+    with snapshots["lock"]:
+        entry = snapshots["entries"].get(key)
+        if entry is not None:
+            snapshots["entries"].move_to_end(key)
+        return entry
 
+def put_snapshot(key, df, version=None, digest=None, etag=None):
+    """Caches a processed DataFrame with the change markers it was built from and a new snapshot number."""
+    snapshots = get_sheet_snapshots()
+    with snapshots["lock"]:
+        snapshots["seq"] += 1
+        snapshots["entries"][key] = {
+            "df": df, "version": version, "digest": digest, "etag": etag,
+            "snapshot": snapshots["seq"], "validated_at": time.time()
+        }
+        snapshots["entries"].move_to_end(key)
+        while len(snapshots["entries"]) > SHEET_CACHE_MAX_ENTRIES:
+            snapshots["entries"].popitem(last=False)
+
+def mark_snapshot_validated(key):
+    """Restarts the TTL of a snapshot after Google confirmed it is unchanged."""
+    snapshots = get_sheet_snapshots()
+    with snapshots["lock"]:
+        if key in snapshots["entries"]:
+            snapshots["entries"][key]["validated_at"] = time.time()
+
+def is_snapshot_fresh(entry, max_age):
+    """Checks whether a snapshot was validated within the last `max_age` seconds."""
+    return entry is not None and time.time() - entry["validated_at"] < max_age
+
+def invalidate_snapshots(keys=None):
+    """Expires the given sheet snapshots (all by default) so their next read revalidates them with Google."""
+    snapshots = get_sheet_snapshots()
+    with snapshots["lock"]:
+        for key in (snapshots["entries"] if keys is None else keys):
+            if key in snapshots["entries"]:
+                snapshots["entries"][key]["validated_at"] = 0
+
+def get_spreadsheet_modified_time(client, spreadsheet_id):
+    """Returns the Drive modifiedTime of a spreadsheet (one metadata call), or None if unavailable."""
     try:
-        spreadsheet = client.open_by_key(spreadsheet_id)
-        worksheet = spreadsheet.worksheet(sheet_name)
-        data = worksheet.get_all_records()
-        df = pd.DataFrame(data)
+        return client.get_file_drive_metadata(spreadsheet_id).get("modifiedTime")
+    except Exception:
+        return None
+
+# ==================== LOCAL DATA TIER ==================== #
+
+def get_local_data_path(filename):
+    """Returns a path inside the local data directory, creating the directory if needed."""
+    os.makedirs(LOCAL_DATA_DIR, exist_ok=True)
+    return os.path.join(LOCAL_DATA_DIR, filename)
+
+@st.cache_resource
+def get_local_dataset_cache():
+    """Returns the process-wide cache of datasets read from the local tier, keyed by name and file mtime."""
+    return {"lock": threading.Lock(), "entries": {}}
+
+def get_local_dataset_version(name):
+    """Returns the modification stamp of a local dataset file, or None if it does not exist."""
+    try:
+        return os.stat(get_local_data_path(f"{name}.feather")).st_mtime_ns
+    except OSError:
+        return None
+
+def load_local_dataset(name):
+    """Memory-maps a dataset from the local Feather tier; the returned frame is shared and read-only."""
+    version = get_local_dataset_version(name)
+    if version is None:
+        return None
+    
+    cache = get_local_dataset_cache()
+    with cache["lock"]:
+        entry = cache["entries"].get(name)
+    if entry is not None and entry["version"] == version:
+        return entry["df"]
+    
+    try:
+        df = feather.read_table(get_local_data_path(f"{name}.feather"), memory_map=True).to_pandas()
+    except Exception:
+        return None
+    
+    with cache["lock"]:
+        cache["entries"][name] = {"version": version, "df": df}
+    return df
+
+def normalize_for_feather(df):
+    """Returns `df` with object columns of mixed cell types (e.g. ints and '' from get_all_records) as strings.
+    
+    Arrow cannot store such columns; missing cells stay missing.
+    """
+    mixed = [col for col in df.columns if df[col].dtype == object
+             and pd.api.types.infer_dtype(df[col], skipna=True) in ("mixed", "mixed-integer")]
+    if not mixed:
+        return df
+    df = df.copy(deep=False)
+    for col in mixed:
+        df[col] = df[col].map(str).where(df[col].notna(), None)
+    return df
+
+def save_local_dataset(name, df):
+    """Writes a dataset to the local Feather tier atomically; returns False (and logs why) if it cannot be stored."""
+    path = get_local_data_path(f"{name}.feather")
+    try:
+        feather.write_feather(normalize_for_feather(df.reset_index(drop=True)), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        return True
+    except Exception as e:
+        logger.warning("Could not write local dataset %s: %s", name, e)
+        return False
+
+def read_local_leads_snapshot(spreadsheet_id, sheet_gid):
+    """Reads the persisted raw leads snapshot and its sync metadata, or (None, None) if unusable."""
+    base = get_local_data_path(f"leads_{spreadsheet_id}_{sheet_gid}")
+    try:
+        with open(base + ".json") as f:
+            meta = json.load(f)
+        raw = pd.read_parquet(base + ".parquet")
+    except Exception:
+        return None, None
+    
+    if len(raw) != meta.get("row_count") or list(raw.columns) != meta.get("header"):
+        return None, None
+    return raw, meta
+
+def write_local_leads_snapshot(spreadsheet_id, sheet_gid, raw):
+    """Persists the raw leads rows as Parquet along with the synced row count and anchor value."""
+    base = get_local_data_path(f"leads_{spreadsheet_id}_{sheet_gid}")
+    last_value = raw.iloc[-1, 0] if len(raw) > 0 and len(raw.columns) > 0 else ""
+    meta = {
+        "row_count": len(raw),
+        "header": list(raw.columns),
+        "anchor": "" if pd.isna(last_value) else str(last_value)
+    }
+    # Callers hold get_leads_snapshot_lock(), so the Parquet and JSON files are always replaced as a pair;
+    # the temporary names are per writer all the same
+    tmp = f".{threading.get_ident()}.tmp"
+    try:
+        # Write to temporary files first so a crash never leaves a half-written snapshot
+        raw.to_parquet(base + ".parquet" + tmp, index=False)
+        with open(base + ".json" + tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(base + ".parquet" + tmp, base + ".parquet")
+        os.replace(base + ".json" + tmp, base + ".json")
+        return True
+    except Exception as e:
+        logger.warning("Could not write the local leads snapshot: %s", e)
+        return False
+
+def download_export(response, path):
+    """Streams a response body to `path` in chunks and returns its SHA-256 digest."""
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        for chunk in response.iter_content(SHEET_DOWNLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+@st.cache_resource
+def get_leads_snapshot_lock():
+    """Returns the process-wide lock guarding the raw leads snapshot and its processed frame."""
+    return threading.Lock()
+
+def sync_leads_incremental(client, spreadsheet_id, sheet_gid):
+    """Fetches only the rows appended since the last sync and merges them into the local snapshot.
+    
+    Returns (raw_df, changed), or None when there is no usable snapshot and a full export is needed.
+    """
+    raw, meta = read_local_leads_snapshot(spreadsheet_id, sheet_gid)
+    if raw is None:
+        return None
+    
+    header = meta["header"]
+    row_count = meta["row_count"]
+    last_column = re.sub(r"\d", "", gspread.utils.rowcol_to_a1(1, len(header)))
+    worksheet = client.open_by_key(spreadsheet_id).get_worksheet_by_id(int(sheet_gid))
+    
+    # Re-read the last synced row (header is row 1) as an anchor; a mismatch means
+    # rows were edited or deleted, so fall back to a full export
+    first_row = row_count + 1 if row_count > 0 else 2
+    values = list(worksheet.get(f"A{first_row}:{last_column}"))
+    if row_count > 0:
+        anchor_row = values[0] if values else []
+        if (anchor_row[0] if anchor_row else "") != meta["anchor"]:
+            return None
+        values = values[1:]
+    
+    if not values:
+        return raw, False
+    
+    new_rows = pd.DataFrame([row + [""] * (len(header) - len(row)) for row in values], columns=header)
+    new_rows = new_rows.mask(new_rows == "")
+    raw = pd.concat([raw, new_rows], ignore_index=True)
+    write_local_leads_snapshot(spreadsheet_id, sheet_gid, raw)
+    return raw, True
+
+# ==================== SHEET FETCHING ==================== #
+
+def fetch_worksheet_data(client, spreadsheet_id, sheet_name, process=None, max_age=SHEET_CACHE_TTL):
+    """Fetches a worksheet as a processed DataFrame, skipping the download when Drive reports no change.
+    
+    Returns the shared snapshot frame (treat as read-only); raises on gspread errors.
+    """
+    key = (spreadsheet_id, sheet_name)
+    snapshot = get_snapshot(key)
+    if is_snapshot_fresh(snapshot, max_age):
+        return snapshot["df"]
+    
+    modified_time = get_spreadsheet_modified_time(client, spreadsheet_id)
+    if snapshot is not None and modified_time is not None and snapshot["version"] == modified_time:
+        mark_snapshot_validated(key)
+        return snapshot["df"]
+    
+    spreadsheet = client.open_by_key(spreadsheet_id)
+    worksheet = spreadsheet.worksheet(sheet_name)
+    data = worksheet.get_all_records()
+    df = pd.DataFrame(data)
+    if process is not None:
+        df = process(df)
+    put_snapshot(key, df, version=modified_time)
+    return df
+
+def fetch_leads_data(client, spreadsheet_id, sheet_gid, process=None, max_age=SHEET_CACHE_TTL):
+    """Fetches the leads tab as a processed DataFrame, incrementally when possible and via CSV export otherwise.
+    
+    Returns the shared snapshot frame (treat as read-only); raises on network or gspread errors.
+    """
+    key = (spreadsheet_id, sheet_gid)
+    snapshot = get_snapshot(key)
+    if is_snapshot_fresh(snapshot, max_age):
+        return snapshot["df"]
+    
+    # The leads tab is append-only, so normally only the new rows are fetched
+    # (the lock keeps this from interleaving with status write-backs patching the same snapshot)
+    with get_leads_snapshot_lock():
+        try:
+            synced = sync_leads_incremental(client, spreadsheet_id, sheet_gid) if LEADS_INCREMENTAL_SYNC else None
+        except Exception as e:
+            # Quota or permission errors on the Sheets API fall back to the CSV export
+            logger.warning("Incremental leads sync failed, using the CSV export: %s", e)
+            synced = None
+        if synced is not None:
+            raw, changed = synced
+            if not changed and snapshot is not None:
+                mark_snapshot_validated(key)
+                return snapshot["df"]
+            df = process(raw.copy()) if process is not None else raw.copy()
+            put_snapshot(key, df, version=len(raw))
+            return df
+    
+    try:
+        return fetch_leads_export(spreadsheet_id, sheet_gid, snapshot, process)
+    except Exception as e:
+        # A valid earlier snapshot beats blanking the CRM; it is revalidated again after the TTL
+        if snapshot is not None:
+            logger.warning("Leads export failed, serving the previous snapshot: %s", e)
+            mark_snapshot_validated(key)
+            return snapshot["df"]
+        with get_leads_snapshot_lock():
+            raw, _ = read_local_leads_snapshot(spreadsheet_id, sheet_gid)
+        if raw is None:
+            raise
+        logger.warning("Leads export failed, serving the local snapshot: %s", e)
+        df = process(raw.copy()) if process is not None else raw.copy()
+        put_snapshot(key, df, version=len(raw))
+        return df
+
+def fetch_leads_export(spreadsheet_id, sheet_gid, snapshot, process=None):
+    """Downloads the leads tab as a CSV export and stores it as the new snapshot unless its content is unchanged."""
+    key = (spreadsheet_id, sheet_gid)
+    
+    # Construct the export URL for the specific sheet (GID) as CSV
+    export_url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid={sheet_gid}"
+    
+    # Send the last ETag so an unchanged export can come back as 304
+    headers = {"If-None-Match": snapshot["etag"]} if snapshot is not None and snapshot["etag"] else {}
+    
+    # Stream the CSV through the pooled session to a local file, hashing it on the way,
+    # so a large export is never held in memory as one response body
+    download_path = get_local_data_path(f"leads_{spreadsheet_id}_{sheet_gid}.{threading.get_ident()}.csv.tmp")
+    try:
+        with http_get(export_url, timeout=30, headers=headers, stream=True) as response:
+            if response.status_code == 304 and snapshot is not None:
+                mark_snapshot_validated(key)
+                return snapshot["df"]
+            response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
+            digest = download_export(response, download_path)
         
-        # Store in cache
-        if st.session_state.sheets_data is None:
-            st.session_state.sheets_data = {}
-        st.session_state.sheets_data[(spreadsheet_id, sheet_name)] = df
+        # Identical content hashes reuse the processed frame without re-parsing
+        if snapshot is not None and snapshot["digest"] == digest:
+            mark_snapshot_validated(key)
+            return snapshot["df"]
         
+        # Read the raw CSV as strings so later appended rows (also strings) line up
+        raw = pd.read_csv(download_path, dtype=str)
+    finally:
+        if os.path.exists(download_path): # A failed download may not have created it
+            os.remove(download_path)
+    if LEADS_INCREMENTAL_SYNC:
+        with get_leads_snapshot_lock():
+            write_local_leads_snapshot(spreadsheet_id, sheet_gid, raw)
+    df = process(raw.copy()) if process is not None else raw.copy()
+    put_snapshot(key, df, digest=digest, etag=response.headers.get("ETag"))
+    return df
+
+def fetch_daily_tracker_data(client, max_age=SHEET_CACHE_TTL):
+    """Fetches and processes the daily tracker, reusing the last snapshot while the sheet is unchanged."""
+    key = (DAILY_TRACKER_SHEET_ID, DAILY_TRACKER_SHEET_NAME)
+    snapshot = get_snapshot(key)
+    if is_snapshot_fresh(snapshot, max_age):
+        return snapshot["df"]
+    
+    modified_time = get_spreadsheet_modified_time(client, DAILY_TRACKER_SHEET_ID)
+    if snapshot is not None and modified_time is not None and snapshot["version"] == modified_time:
+        mark_snapshot_validated(key)
+        return snapshot["df"]
+    
+    spreadsheet = client.open_by_key(DAILY_TRACKER_SHEET_ID)
+    try:
+        worksheet = spreadsheet.worksheet(DAILY_TRACKER_SHEET_NAME)
+    except gspread.exceptions.WorksheetNotFound:
+        st.warning(f"Daily tracker worksheet '{DAILY_TRACKER_SHEET_NAME}' not found. Attempting to load the first worksheet.")
+        worksheet = spreadsheet.sheet1 # Fallback to the first sheet
+
+    data = worksheet.get_all_records()
+    df = pd.DataFrame(data)
+    # Ensure numeric types for calculations
+    for col in ['Connections_Sent', 'Messages_Sent', 'Follow_ups_Sent', 'Responses_Received', 'Leads_Converted']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    
+    # Ensure 'Date' column is in datetime format for filtering
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce').dt.strftime("%Y-%m-%d")
+    
+    put_snapshot(key, df, version=modified_time)
+    return df
+
+def remember_snapshot_version(key):
+    """Records which snapshot of a sheet this session is showing."""
+    snapshot = get_snapshot(key)
+    if snapshot is not None:
+        st.session_state.snapshot_versions[key] = snapshot["snapshot"]
+
+def load_data_from_gsheets(spreadsheet_id, sheet_name, use_cache=True, process=None):
+    """Loads data from a Google Sheet into a pandas DataFrame shared by all sessions (treat as read-only)."""
+    client = get_gsheets_client()
+    if client is None:
+        return pd.DataFrame()
+
+    try:
+        # Within the TTL the shared snapshot is served as is; use_cache=False forces a revalidation
+        df = fetch_worksheet_data(client, spreadsheet_id, sheet_name, process=process, max_age=SHEET_CACHE_TTL if use_cache else 0)
+        remember_snapshot_version((spreadsheet_id, sheet_name))
         return df
     except gspread.exceptions.SpreadsheetNotFound:
         st.error(f"Spreadsheet with ID '{spreadsheet_id}' not found.")
@@ -560,35 +986,15 @@ def load_data_from_gsheets(spreadsheet_id, sheet_name, use_cache=True):
     
     return pd.DataFrame()
 
-def load_leads_data(spreadsheet_id, sheet_gid, use_cache=True):
-    """Loads leads data from a Google Sheet using the GID for CSV export."""
+def load_leads_data(spreadsheet_id, sheet_gid, use_cache=True, process=None):
+    """Loads leads data from a Google Sheet using the GID for CSV export, shared by all sessions (treat as read-only)."""
     client = get_gsheets_client()
     if client is None:
         return pd.DataFrame()
 
-    # Simple caching mechanism
-    if use_cache and (spreadsheet_id, sheet_gid) in st.session_state.leads_sheets_data:
-        return st.session_state.leads_sheets_data[(spreadsheet_id, sheet_gid)]
-
     try:
-        # Construct the export URL for the specific sheet (GID) as CSV
-        export_url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid={sheet_gid}"
-        
-        # Use gspread to get the spreadsheet title for logging/error messages
-        spreadsheet = client.open_by_key(spreadsheet_id)
-        
-        # Use requests to download the CSV content
-        response = requests.get(export_url)
-        response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
-        
-        # Read the CSV content directly into a pandas DataFrame
-        df = pd.read_csv(BytesIO(response.content))
-        
-        # Store in cache
-        if st.session_state.leads_sheets_data is None:
-            st.session_state.leads_sheets_data = {}
-        st.session_state.leads_sheets_data[(spreadsheet_id, sheet_gid)] = df
-
+        df = fetch_leads_data(client, spreadsheet_id, sheet_gid, process=process, max_age=SHEET_CACHE_TTL if use_cache else 0)
+        remember_snapshot_version((spreadsheet_id, sheet_gid))
         return df
     except gspread.exceptions.SpreadsheetNotFound:
         st.error(f"Leads Spreadsheet with ID '{spreadsheet_id}' not found.")
@@ -599,19 +1005,264 @@ def load_leads_data(spreadsheet_id, sheet_gid, use_cache=True):
     
     return pd.DataFrame()
 
+def load_daily_tracker_data(client):
+    """Loads and processes the daily activity tracker data."""
+    if client:
+        try:
+            df = fetch_daily_tracker_data(client)
+            remember_snapshot_version((DAILY_TRACKER_SHEET_ID, DAILY_TRACKER_SHEET_NAME))
+            return df
+        except Exception as e:
+            st.error(f"🔴 Error loading daily tracker: {e}")
+    return pd.DataFrame()
+
+def run_in_parallel(tasks, max_workers=4):
+    """Runs named callables concurrently in a bounded thread pool and returns their results by name."""
+    if not tasks:
+        return {}
+    
+    # Worker threads need the script context to use st.* and st.session_state
+    ctx = get_script_run_ctx()
+    
+    def run_with_context(func):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func()
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+        futures = {name: executor.submit(run_with_context, func) for name, func in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+def sync_local_store(client):
+    """Pulls every sheet-backed dataset and rewrites the ones whose snapshot changed in the local tier."""
+    data = run_in_parallel({
+        "chat_df": lambda: fetch_worksheet_data(client, CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME, process=process_chat_data, max_age=0),
+        "leads_database": lambda: fetch_leads_data(client, LEADS_DATABASE_SHEET_ID, LEADS_SHEET_GID, process=process_outreach_data, max_age=0),
+        "daily_tracker": lambda: fetch_daily_tracker_data(client, max_age=0),
+    })
+    
+    # Snapshot objects stay identical while a sheet is unchanged, so identity tells us what to rewrite
+    # (a snapshot that could not be written is not retried until the sheet changes)
+    written = get_local_sync_state()["written"]
+    for name, df in data.items():
+        if written.get(name) is not df:
+            save_local_dataset(name, df)
+            written[name] = df
+    return data
+
+@st.cache_resource
+def get_local_sync_state():
+    """Returns the process-wide record of which snapshot was last written per local dataset."""
+    return {"written": {}}
+
+@st.cache_resource
+def get_refresh_scheduler():
+    """Returns the process-wide refresh scheduler shared by every session.
+    
+    Sessions with auto-refresh on register the interval they want; the single sync thread polls the
+    sheets at the shortest registered interval (or LOCAL_SYNC_INTERVAL) and can be woken early.
+    """
+    return {"lock": threading.Lock(), "wake": threading.Event(), "requests": {}}
+
+def request_refresh_interval(interval):
+    """Registers this session's auto-refresh interval with the shared scheduler."""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    scheduler = get_refresh_scheduler()
+    with scheduler["lock"]:
+        scheduler["requests"][ctx.session_id] = (interval, time.time())
+
+def get_sync_interval():
+    """Returns the shortest interval requested by a session that checked in recently."""
+    scheduler = get_refresh_scheduler()
+    now = time.time()
+    with scheduler["lock"]:
+        # Sessions that stopped polling (closed tab, auto-refresh off) expire after two missed intervals
+        scheduler["requests"] = {
+            session_id: (interval, seen) for session_id, (interval, seen) in scheduler["requests"].items()
+            if now - seen < 2 * interval + LOCAL_SYNC_INTERVAL
+        }
+        return min([LOCAL_SYNC_INTERVAL] + [interval for interval, _ in scheduler["requests"].values()])
+
+@st.cache_resource
+def start_local_sync():
+    """Starts the process-wide background thread that keeps the local data tier reconciled with the sheets."""
+    scheduler = get_refresh_scheduler()
+    
+    def sync_forever():
+        client = None
+        while True:
+            try:
+                if client is None:
+                    client = authorize_gsheets_client()
+                sync_local_store(client)
+            except Exception:
+                logger.warning("Local data sync failed; reconnecting on the next pass", exc_info=True)
+                client = None
+            scheduler["wake"].wait(timeout=get_sync_interval())
+            scheduler["wake"].clear()
+    
+    thread = threading.Thread(target=sync_forever, name="local-data-sync", daemon=True)
+    thread.start()
+    return thread
+
+def get_local_data_versions():
+    """Returns the current version stamp of every local dataset."""
+    return {name: get_local_dataset_version(name) for name in LOCAL_DATASETS}
+
+def watch_for_new_data():
+    """Reruns the app once the shared scheduler has written a newer snapshot than this session shows.
+    
+    Runs as a fragment on the session's refresh interval, so checking costs a few file stats.
+    """
+    request_refresh_interval(st.session_state.refresh_interval)
+    if get_local_data_versions() != st.session_state.local_data_versions:
+        st.session_state.last_refresh = datetime.utcnow()
+        st.rerun(scope="app")
+
+def load_all_data(client, use_cache=True):
+    """Loads the chat history, leads and daily tracker, reading the local data tier before the sheets."""
+    start_local_sync()
+    
+    # Local tier first: a near-instant mmap read that the background sync keeps current
+    versions = get_local_data_versions()
+    if all(version is not None for version in versions.values()):
+        if use_cache and versions == st.session_state.local_data_versions:
+            return {name: st.session_state[name] for name in LOCAL_DATASETS}
+        # Sessions keep references to the shared frames plus the versions they came from
+        local = {name: load_local_dataset(name) for name in LOCAL_DATASETS}
+        if all(df is not None for df in local.values()):
+            st.session_state.local_data_versions = versions
+            return local
+    
+    # Cold start: fetch all sheets at the same time and seed the local tier
+    data = run_in_parallel({
+        "chat_df": lambda: load_data_from_gsheets(CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME, use_cache=use_cache, process=process_chat_data),
+        "leads_database": lambda: load_leads_data(LEADS_DATABASE_SHEET_ID, LEADS_SHEET_GID, use_cache=use_cache, process=process_outreach_data),
+        "daily_tracker": lambda: load_daily_tracker_data(client),
+    })
+    for name, df in data.items():
+        if not df.empty:
+            save_local_dataset(name, df)
+    st.session_state.local_data_versions = get_local_data_versions()
+    return data
+
+@st.cache_resource
+def get_synced_sheet_values():
+    """Returns the process-wide record of the cell grid last written to (or read from) each worksheet."""
+    return {"lock": threading.Lock(), "entries": {}}
+
+def sheet_cell_text(value):
+    """Formats one cell as the text Google Sheets reads back for it: 1 for 1.0, TRUE for True, dates without 00:00:00."""
+    if isinstance(value, str):
+        return value
+    if pd.isna(value):
+        return ""
+    if isinstance(value, (bool, np.bool_)):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        if (value.hour, value.minute, value.second, value.microsecond) == (0, 0, 0, 0):
+            return value.strftime("%Y-%m-%d")
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+def sheet_column_text(values):
+    """Formats a column like `sheet_cell_text`, vectorized for numeric, boolean and datetime columns."""
+    dtype = values.dtype
+    if pd.api.types.is_bool_dtype(dtype) and dtype != object:
+        text = values.map({True: "TRUE", False: "FALSE"})
+    elif pd.api.types.is_integer_dtype(dtype):
+        text = values.astype(str)
+    elif pd.api.types.is_float_dtype(dtype):
+        whole = values.notna() & (values % 1 == 0) & (values.abs() < 2 ** 53)
+        rest = values.notna() & ~whole
+        text = pd.Series("", index=values.index, dtype=object)
+        text[whole] = values[whole].astype(np.int64).astype(str)
+        text[rest] = values[rest].astype(str)
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        text = values.dt.strftime("%Y-%m-%d %H:%M:%S")
+        text = text.where(values != values.dt.normalize(), text.str[:10])
+    elif pd.api.types.is_string_dtype(dtype) and dtype != object:
+        text = values
+    else:
+        return values.astype(object).map(sheet_cell_text)
+    return text.astype(object).where(values.notna(), "")
+
+def dataframe_to_sheet_values(df):
+    """Converts a DataFrame into the header + rows grid of cell strings Google Sheets would display."""
+    cells = {i: sheet_column_text(df.iloc[:, i]) for i in range(df.shape[1])}
+    rows = pd.DataFrame(cells, index=df.index) if cells else pd.DataFrame(index=df.index)
+    return [[str(column) for column in df.columns]] + rows.values.tolist()
+
+def pad_sheet_values(values, n_rows, n_cols):
+    """Returns a ragged grid as an (n_rows, n_cols) object array padded with empty cells."""
+    grid = np.full((n_rows, n_cols), "", dtype=object)
+    for i, row in enumerate(values[:n_rows]):
+        grid[i, :len(row)] = row[:n_cols]
+    return grid
+
+def diff_sheet_values(old_values, new_values):
+    """Computes the writes that turn the `old_values` grid into `new_values`.
+    
+    Returns (updates, appended): A1 ranges with their values for batch_update, covering changed cells in
+    existing rows (rows that disappeared are blanked), and the trailing new rows for append_rows.
+    """
+    n_old = len(old_values)
+    n_cols = max((len(row) for row in old_values + new_values), default=0)
+    old = pad_sheet_values(old_values, n_old, n_cols)
+    new = pad_sheet_values(new_values, n_old, n_cols)
+    changed = old != new # Exact text, so whitespace edits and "01" vs "1" are written too
+    
+    # Runs of changed cells per row, as [start, end) column bounds
+    edges = np.diff(np.pad(changed.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    run_rows, run_starts = np.nonzero(edges == 1)
+    _, run_ends = np.nonzero(edges == -1)
+    
+    # Stack identical runs in consecutive rows into rectangles
+    blocks = []
+    for row, start, end in zip(run_rows.tolist(), run_starts.tolist(), run_ends.tolist()):
+        last = blocks[-1] if blocks else None
+        if last is not None and last[1] == row and last[2] == start and last[3] == end:
+            last[1] = row + 1
+        else:
+            blocks.append([row, row + 1, start, end])
+    
+    updates = [{
+        "range": f"{gspread.utils.rowcol_to_a1(top + 1, start + 1)}:{gspread.utils.rowcol_to_a1(bottom, end)}",
+        "values": new[top:bottom, start:end].tolist()
+    } for top, bottom, start, end in blocks]
+    return updates, new_values[n_old:]
+
 def save_data_to_gsheets(df, spreadsheet_id, sheet_name):
-    """Saves a pandas DataFrame to a Google Sheet."""
+    """Saves a pandas DataFrame to a Google Sheet, writing only the cells that differ from the last synced grid."""
     client = get_gsheets_client()
     if client is None:
         return False
     
+    key = (spreadsheet_id, sheet_name)
+    synced = get_synced_sheet_values()
     try:
         spreadsheet = client.open_by_key(spreadsheet_id)
         worksheet = spreadsheet.worksheet(sheet_name)
         
-        # Clear existing data and write new data including headers
-        worksheet.clear()
-        worksheet.update([df.columns.values.tolist()] + df.values.tolist())
+        with synced["lock"]:
+            old_values = synced["entries"].get(key)
+        if old_values is None:
+            old_values = worksheet.get_all_values()
+        
+        # Changed cells go out in a single batch_update and new trailing rows through append_rows
+        new_values = dataframe_to_sheet_values(df)
+        updates, appended = diff_sheet_values(old_values, new_values)
+        if updates:
+            worksheet.batch_update(updates, value_input_option="USER_ENTERED")
+        if appended:
+            worksheet.append_rows(appended, value_input_option="USER_ENTERED", table_range="A1")
+        
+        with synced["lock"]:
+            synced["entries"][key] = new_values
+        invalidate_snapshots([key])
         st.toast(f"✅ Data saved successfully to {sheet_name}!", icon="💾")
         return True
     except gspread.exceptions.SpreadsheetNotFound:
@@ -619,6 +1270,9 @@ def save_data_to_gsheets(df, spreadsheet_id, sheet_name):
     except gspread.exceptions.WorksheetNotFound:
         st.error(f"Worksheet '{sheet_name}' not found for saving.")
     except Exception as e:
+        # The sheet may now differ from the recorded grid, so the next save re-reads it
+        with synced["lock"]:
+            synced["entries"].pop(key, None)
         st.error(f"An error occurred while saving data: {e}")
     
     return False
@@ -654,97 +1308,100 @@ def get_status_badge(status):
     </div>
     """
 
-def get_message_history(df, contact_url):
-    """Filters the chat DataFrame for a specific contact and formats the history."""
-    history_df = df[df['Contact_URL'] == contact_url].sort_values(by='Timestamp', ascending=True)
+@st.cache_resource
+def get_message_indexes():
+    """Returns the process-wide per-contact message index of the current chat snapshot."""
+    return {"lock": threading.Lock(), "entry": None}
+
+def build_message_index(df):
+    """Groups a chat snapshot by contact URL into runs of row positions sorted by timestamp."""
+    if 'Contact_URL' not in df.columns:
+        return {"df": df, "positions": np.empty(0, dtype=np.int64), "ranges": {}}
     
-    history_html = ""
-    for index, row in history_df.iterrows():
-        sender = row['Sender_Name']
-        message = row['Message_Content']
-        timestamp = row['Timestamp']
-        
-        # Determine if the message is from 'Me' (the user's profile)
-        is_me = sender == MY_PROFILE["name"]
-        
-        # Simple markdown to HTML conversion for messages
-        message_html = message.replace('\n', '<br>')
-        
-        # Style the message based on sender
-        if is_me:
-            # Outgoing message (Blue/Purple)
-            style = """
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white !important;
-                border-radius: 20px 20px 5px 20px;
-                align-self: flex-end;
-                text-align: right;
-            """
-            sender_name = "You"
-        else:
-            # Incoming message (Light Gray)
-            style = """
-                background: #f0f2f6;
-                color: #333 !important;
-                border-radius: 20px 20px 20px 5px;
-                align-self: flex-start;
-                text-align: left;
-            """
-            sender_name = sender
-            
-        history_html += f"""
-        <div style="display: flex; justify-content: {'flex-end' if is_me else 'flex-start'}; margin-bottom: 1rem;">
-            <div style="max-width: 70%; padding: 1rem 1.5rem; {style} box-shadow: 0 2px 10px rgba(0,0,0,0.1);">
-                <small style="opacity: 0.8; font-size: 0.75rem; color: {'#ddd' if is_me else '#666'} !important;">{sender_name} - {timestamp}</small>
-                <p style="margin: 0; font-size: 0.95rem; line-height: 1.4; color: {'white' if is_me else '#333'} !important;">{message_html}</p>
-            </div>
-        </div>
-        """
+    # Sort once by timestamp, then stably by contact so each contact's messages form one chronological run
+    order = np.arange(len(df))
+    if 'Timestamp' in df.columns:
+        order = np.argsort(df['Timestamp'].to_numpy(), kind="stable")
+    codes, contacts = pd.factorize(df['Contact_URL'].to_numpy()[order])
+    order, codes = order[codes >= 0], codes[codes >= 0] # Rows without a contact URL are never shown
+    positions = order[np.argsort(codes, kind="stable")]
+    counts = np.bincount(codes, minlength=len(contacts))
+    ends = np.cumsum(counts)
+    
+    ranges = dict(zip(contacts.tolist(), zip((ends - counts).tolist(), ends.tolist())))
+    return {"df": df, "positions": positions, "ranges": ranges}
+
+def get_message_index(df):
+    """Returns the message index for a chat snapshot, building it once per snapshot."""
+    indexes = get_message_indexes()
+    with indexes["lock"]:
+        if indexes["entry"] is None or indexes["entry"]["df"] is not df:
+            indexes["entry"] = build_message_index(df)
+        return indexes["entry"]
+
+def count_contact_messages(df, contact_url):
+    """Returns the number of messages exchanged with a contact."""
+    start, end = get_message_index(df)["ranges"].get(contact_url, (0, 0))
+    return end - start
+
+def get_contact_messages(df, contact_url, last_n=None, offset=0):
+    """Returns a contact's messages in chronological order.
     
-    if not history_html:
+    `last_n` limits the result to the newest messages and `offset` skips that many of the newest ones,
+    so long threads can be paged backwards without touching the rest of the chat history.
+    """
+    index = get_message_index(df)
+    start, end = index["ranges"].get(contact_url, (0, 0))
+    end = max(start, end - offset)
+    if last_n is not None:
+        start = max(start, end - last_n)
+    return df.iloc[index["positions"][start:end]]
+
+def get_message_history(df, contact_url, last_n=None):
+    """Formats the (most recent `last_n`) message history with a specific contact."""
+    history_df = get_contact_messages(df, contact_url, last_n=last_n)
+    if history_df.empty:
         return "<p style='text-align: center; color: #999;'>No message history found for this contact.</p>"
-        
-    return history_html
+    
+    # Plain lists avoid boxing a Timestamp per message; the fragment cache hashes the row values
+    rows = zip(
+        history_df['Sender_Name'].tolist(),
+        history_df['Message_Content'].tolist(),
+        history_df['Timestamp'].astype(str).tolist()
+    )
+    return render_fragments("message", render_message_bubble, rows)
 
-@st.cache_data(ttl=60)
-def load_daily_tracker_data(client):
-    """Loads and processes the daily activity tracker data."""
-    if client:
-        try:
-            spreadsheet = client.open_by_key(DAILY_TRACKER_SHEET_ID)
-            try:
-                worksheet = spreadsheet.worksheet(DAILY_TRACKER_SHEET_NAME)
-            except gspread.exceptions.WorksheetNotFound:
-                st.warning(f"Daily tracker worksheet '{DAILY_TRACKER_SHEET_NAME}' not found. Attempting to load the first worksheet.")
-                worksheet = spreadsheet.sheet1 # Fallback to the first sheet
-
-            data = worksheet.get_all_records()
-            df = pd.DataFrame(data)
-            # Ensure numeric types for calculations
-            for col in ['Connections_Sent', 'Messages_Sent', 'Follow_ups_Sent', 'Responses_Received', 'Leads_Converted']:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-            
-            # Ensure 'Date' column is in datetime format for filtering
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce').dt.strftime("%Y-%m-%d")
-            return df
-        except Exception as e:
-            st.error(f"🔴 Error loading daily tracker: {e}")
-    return pd.DataFrame()
+DAILY_TRACKER_METRICS = ['Connections_Sent', 'Messages_Sent', 'Follow_ups_Sent', 'Responses_Received', 'Leads_Converted']
 
-@st.cache_data(ttl=60)
-def get_daily_summary(df):
-    """Calculates summary statistics from the daily tracker data."""
-    if df.empty:
-        return {}
+@st.cache_resource
+def get_daily_cubes():
+    """Returns the process-wide LRU of daily tracker aggregate cubes, keyed by tracker snapshot."""
+    return {"lock": threading.Lock(), "entries": OrderedDict()}
+
+def build_daily_cube(df):
+    """Materializes the daily, weekly and challenge-level rollups of the daily tracker in one pass.
+    
+    `daily` holds per-date metric totals (rows without a date are kept under a missing date), `first_entry`
+    the first tracker row of each date, `weekly` the sums per calendar week and `summary` the challenge
+    KPIs read by the dashboard tiles and charts. KPIs are taken over the tracker rows, as before the cube.
+    """
+    metrics = df.reindex(columns=DAILY_TRACKER_METRICS, fill_value=0)
+    if 'Date' in df.columns:
+        by_date = metrics.groupby(df['Date'], sort=True, dropna=False)
+        daily, first_entry = by_date.sum(), by_date.first()
+    else:
+        daily = first_entry = pd.DataFrame(columns=DAILY_TRACKER_METRICS, index=pd.Index([], name='Date'))
+    week_start = pd.to_datetime(daily.index, errors='coerce').to_period('W').start_time
+    weekly = daily.groupby(week_start.strftime("%Y-%m-%d"), dropna=False).sum()
+    weekly.index.name = 'Week'
     
     # Calculate totals
-    total_connections = df['Connections_Sent'].sum()
-    total_messages = df['Messages_Sent'].sum()
-    total_followups = df['Follow_ups_Sent'].sum()
-    total_responses = df['Responses_Received'].sum()
-    total_leads = df['Leads_Converted'].sum()
+    totals = metrics.sum()
+    total_connections = totals['Connections_Sent']
+    total_messages = totals['Messages_Sent']
+    total_followups = totals['Follow_ups_Sent']
+    total_responses = totals['Responses_Received']
+    total_leads = totals['Leads_Converted']
     
     # Calculate averages
     days_tracked = df.shape[0]
@@ -757,11 +1414,9 @@ def get_daily_summary(df):
     response_rate = (total_responses / total_outreach) * 100 if total_outreach > 0 else 0
     
     # Get last 7 days data
-    last_7_days = df.tail(7)
-    last_7_connections = last_7_days['Connections_Sent'].sum()
-    last_7_leads = last_7_days['Leads_Converted'].sum()
+    last_7_days = metrics.tail(7)
     
-    return {
+    summary = {
         "total_connections": total_connections,
         "total_messages": total_messages,
         "total_followups": total_followups,
@@ -772,10 +1427,39 @@ def get_daily_summary(df):
         "avg_messages": avg_messages,
         "conversion_rate": conversion_rate,
         "response_rate": response_rate,
-        "last_7_connections": last_7_connections,
-        "last_7_leads": last_7_leads,
+        "last_7_connections": last_7_days['Connections_Sent'].sum(),
+        "last_7_leads": last_7_days['Leads_Converted'].sum(),
+        "daily": daily,
+        "weekly": weekly,
         "df": df
     }
+    return {"daily": daily, "first_entry": first_entry, "weekly": weekly, "summary": summary}
+
+def get_daily_cube(df):
+    """Returns the aggregate cube of a daily tracker snapshot, building it once per snapshot.
+    
+    Snapshots are never mutated, so their identity is their version (see `get_cached_figure`).
+    """
+    cache = get_daily_cubes()
+    with cache["lock"]:
+        entry = cache["entries"].get(id(df))
+        if entry is not None and entry["source"] is df:
+            cache["entries"].move_to_end(id(df))
+            return entry["cube"]
+    
+    cube = build_daily_cube(df)
+    with cache["lock"]:
+        cache["entries"][id(df)] = {"source": df, "cube": cube}
+        cache["entries"].move_to_end(id(df))
+        while len(cache["entries"]) > DAILY_CUBE_CACHE_SIZE:
+            cache["entries"].popitem(last=False)
+    return cube
+
+def get_daily_summary(df):
+    """Returns the summary statistics of the daily tracker data from its aggregate cube."""
+    if df.empty:
+        return {}
+    return get_daily_cube(df)["summary"]
 
 def get_daily_goal_progress(df, goals):
     """Calculates the progress towards daily goals."""
@@ -783,12 +1467,12 @@ def get_daily_goal_progress(df, goals):
         return {}
     
     today_date = datetime.now().strftime("%Y-%m-%d")
-    today_data = df[df['Date'] == today_date]
+    first_entry = get_daily_cube(df)["first_entry"]
     
     progress = {}
     
     for goal_name, goal_value in goals.items():
-        current_value = today_data[goal_name].iloc[0] if not today_data.empty and goal_name in today_data.columns else 0
+        current_value = first_entry.at[today_date, goal_name] if today_date in first_entry.index and goal_name in first_entry.columns else 0
         
         # Calculate percentage
         percent = (current_value / goal_value) * 100 if goal_value > 0 else 0
@@ -802,47 +1486,484 @@ def get_daily_goal_progress(df, goals):
         
     return progress
 
+# ==================== HTML RENDERING ==================== #
+
+# Bubble and card templates are filled in once per variant at import; rendering a row is a single format call
+MESSAGE_BUBBLE_TEMPLATE = """
+        <div style="display: flex; justify-content: {justify}; margin-bottom: 1rem;">
+            <div style="max-width: 70%; padding: 1rem 1.5rem; {style} box-shadow: 0 2px 10px rgba(0,0,0,0.1);">
+                <small style="opacity: 0.8; font-size: 0.75rem; color: {meta_color} !important;">{{sender}} - {{timestamp}}</small>
+                <p style="margin: 0; font-size: 0.95rem; line-height: 1.4; color: {text_color} !important;">{{message}}</p>
+            </div>
+        </div>
+        """
+MESSAGE_BUBBLE_TEMPLATES = {
+    # Outgoing message (Blue/Purple)
+    True: MESSAGE_BUBBLE_TEMPLATE.format(
+        justify="flex-end", meta_color="#ddd", text_color="white",
+        style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white !important; "
+              "border-radius: 20px 20px 5px 20px; align-self: flex-end; text-align: right;"
+    ),
+    # Incoming message (Light Gray)
+    False: MESSAGE_BUBBLE_TEMPLATE.format(
+        justify="flex-start", meta_color="#666", text_color="#333",
+        style="background: #f0f2f6; color: #333 !important; "
+              "border-radius: 20px 20px 20px 5px; align-self: flex-start; text-align: left;"
+    )
+}
+
+LEAD_CARD_TEMPLATE = """
+<div style="padding: 1rem; border-radius: 10px; margin-bottom: 0.5rem; box-shadow: 0 2px 5px rgba(0,0,0,0.05); {border}">
+    <div style="display: flex; justify-content: space-between; align-items: center;">
+        <div style="font-weight: 700; color: #333; font-size: 1rem;">{{name}}</div>
+        <div style="font-size: 0.75rem; color: #999;">{{last_message_date}}</div>
+    </div>
+    <div style="font-size: 0.85rem; color: #666;">{{title}} at {{company}}</div>
+    <div style="margin-top: 0.5rem;">{{badge}}</div>
+</div>
+"""
+LEAD_CARD_TEMPLATES = {
+    True: LEAD_CARD_TEMPLATE.format(border="background-color: #e6e9f0; border: 2px solid #667eea;"),
+    False: LEAD_CARD_TEMPLATE.format(border="background-color: #f8f8f8; border: 1px solid #eee;")
+}
+
+@st.cache_resource
+def get_fragment_cache():
+    """Returns the process-wide LRU cache of rendered HTML fragments, keyed by row content."""
+    return {"lock": threading.Lock(), "entries": OrderedDict()}
+
+def render_fragments(kind, render_row, rows):
+    """Renders each row tuple with `render_row`, reusing cached fragments for rows seen before, and joins them once."""
+    cache = get_fragment_cache()
+    fragments = []
+    with cache["lock"]:
+        entries = cache["entries"]
+        for row in rows:
+            key = (kind, row)
+            html = entries.get(key)
+            if html is None:
+                html = entries[key] = render_row(*row)
+            else:
+                entries.move_to_end(key)
+            fragments.append(html)
+        while len(entries) > HTML_FRAGMENT_CACHE_SIZE:
+            entries.popitem(last=False)
+    return "".join(fragments)
+
+def column_values(df, column, default=""):
+    """Returns a column as a list, or `default` for every row when the column is missing."""
+    if column in df.columns:
+        return df[column].tolist()
+    return [default] * len(df)
+
+def render_message_bubble(sender, message, timestamp):
+    """Renders one chat message as an outgoing or incoming bubble."""
+    is_me = sender == MY_PROFILE["name"]
+    return MESSAGE_BUBBLE_TEMPLATES[is_me].format(
+        sender="You" if is_me else sender,
+        timestamp=timestamp,
+        message=str(message).replace('\n', '<br>') # Simple markdown to HTML conversion for messages
+    )
+
+def render_lead_card(is_selected, name, last_message_date, title, company, status):
+    """Renders one lead card for the CRM lead list."""
+    return LEAD_CARD_TEMPLATES[is_selected].format(
+        name=name, last_message_date=last_message_date, title=title, company=company,
+        badge=get_status_badge(status)
+    )
+
+# ==================== WEBHOOK OUTBOX ==================== #
+
+def payload_hash(payload):
+    """Returns the SHA-256 hex digest of a payload's JSON, used as its idempotency key."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def connect_webhook_outbox():
+    """Opens a connection to the on-disk webhook outbox, creating its table on first use."""
+    conn = sqlite3.connect(get_local_data_path("webhook_outbox.sqlite3"), timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL") # WAL keeps commits atomic without an fsync per delivery
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT NOT NULL,
+            url TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            created_at REAL NOT NULL,
+            sent_at REAL,
+            response_status INTEGER,
+            response_text TEXT,
+            claimed_at REAL
+        )
+    """)
+    if "claimed_at" not in [column[1] for column in conn.execute("PRAGMA table_info(outbox)")]:
+        conn.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL") # Outboxes created before leases
+    conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS outbox_key ON outbox (idempotency_key)")
+    return conn
+
+@st.cache_resource
+def get_webhook_dispatcher():
+    """Returns the process-wide dispatcher state: the enqueue connection and the event that wakes the workers."""
+    return {"lock": threading.Lock(), "conn": connect_webhook_outbox(), "wake": threading.Event()}
+
+def enqueue_webhooks(payloads, url=None):
+    """Stores payloads in the webhook outbox in one transaction and returns the range of outbox ids they got.
+    
+    A payload identical to one still waiting for delivery is not queued twice.
+    """
+    start_webhook_workers()
+    dispatcher = get_webhook_dispatcher()
+    now = time.time()
+    rows = []
+    for payload in payloads:
+        key = payload_hash(payload)
+        rows.append((key, url or WEBHOOK_URL, json.dumps(payload, default=str), now, now, key))
+    
+    with dispatcher["lock"]:
+        conn = dispatcher["conn"]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            first_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM outbox").fetchone()[0] + 1
+            conn.executemany(
+                """INSERT INTO outbox (idempotency_key, url, payload, next_attempt_at, created_at)
+                   SELECT ?, ?, ?, ?, ? WHERE NOT EXISTS (
+                       SELECT 1 FROM outbox WHERE idempotency_key = ? AND status IN ('pending', 'sending'))""",
+                rows
+            )
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM outbox").fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    dispatcher["wake"].set()
+    return first_id, last_id
+
+def enqueue_webhook(payload, url=None):
+    """Stores a payload in the webhook outbox for background delivery and returns its idempotency key."""
+    enqueue_webhooks([payload], url)
+    return payload_hash(payload)
+
+def get_webhook_job_progress(first_id, last_id):
+    """Returns outbox counts per status for the deliveries queued with ids in [first_id, last_id]."""
+    dispatcher = get_webhook_dispatcher()
+    with dispatcher["lock"]:
+        return dict(dispatcher["conn"].execute(
+            "SELECT status, COUNT(*) FROM outbox WHERE id BETWEEN ? AND ? GROUP BY status", (first_id, last_id)
+        ).fetchall())
+
+def claim_webhook_batch(conn):
+    """Marks up to WEBHOOK_BATCH_SIZE due deliveries for one URL as sending and returns them."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Deliveries whose lease ran out belong to a worker that stopped, in this process or another one
+        rows = conn.execute(
+            """SELECT id, idempotency_key, url, payload, attempts FROM outbox
+               WHERE (status = 'pending' AND next_attempt_at <= ?)
+                  OR (status = 'sending' AND COALESCE(claimed_at, 0) <= ?)
+               ORDER BY id LIMIT ?""",
+            (now, now - WEBHOOK_LEASE_SECONDS, WEBHOOK_BATCH_SIZE)
+        ).fetchall()
+        rows = [row for row in rows if row[2] == rows[0][2]] # A POST goes to a single URL
+        conn.executemany("UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ?", [(now, row[0]) for row in rows])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return rows
+
+def post_webhook_payload(payload, url=None, idempotency_key=None):
+    """Posts a payload to the webhook URL through the pooled session and returns the response; raises on HTTP errors."""
+    headers = {'Content-Type': 'application/json'}
+    if idempotency_key:
+        headers['Idempotency-Key'] = idempotency_key
+    response = get_http_session().post(url or WEBHOOK_URL, data=json.dumps(payload, default=str), headers=headers, timeout=10)
+    response.raise_for_status()
+    return response
+
+def deliver_webhook_batch(conn, rows):
+    """Posts claimed deliveries and records the outcome, scheduling retries with exponential backoff and jitter."""
+    payloads = [json.loads(row[3]) for row in rows]
+    if len(rows) == 1:
+        body, key = payloads[0], rows[0][1]
+    else:
+        body, key = {"batch": payloads}, payload_hash([row[1] for row in rows])
+    
+    try:
+        response = post_webhook_payload(body, url=rows[0][2], idempotency_key=key)
+        conn.executemany(
+            "UPDATE outbox SET status = 'sent', attempts = attempts + 1, sent_at = ?, response_status = ?, response_text = ? WHERE id = ?",
+            [(time.time(), response.status_code, response.text[:100], row[0]) for row in rows]
+        )
+    except requests.exceptions.RequestException as e:
+        status_code = getattr(e.response, 'status_code', None)
+        # Client errors other than timeouts and rate limits will not succeed on retry
+        permanent = status_code is not None and 400 <= status_code < 500 and status_code not in (408, 429)
+        schedule_webhook_retries(conn, rows, str(e), status_code, permanent)
+
+def schedule_webhook_retries(conn, rows, error, status_code=None, permanent=False):
+    """Returns claimed deliveries to pending with exponential backoff and jitter, or marks them failed for good."""
+    updates = []
+    for row in rows:
+        attempts = row[4] + 1
+        delay = min(WEBHOOK_BACKOFF_MAX, WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.5, 1.5)
+        status = "failed" if permanent or attempts >= WEBHOOK_MAX_ATTEMPTS else "pending"
+        updates.append((status, attempts, time.time() + delay, status_code, error[:100], row[0]))
+    conn.executemany(
+        "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, response_status = ?, response_text = ? WHERE id = ?",
+        updates
+    )
+
+@st.cache_resource
+def start_webhook_workers():
+    """Starts the process-wide pool of threads that deliver webhooks from the outbox."""
+    dispatcher = get_webhook_dispatcher()
+    
+    def deliver_forever():
+        conn = connect_webhook_outbox()
+        while True:
+            rows = []
+            try:
+                rows = claim_webhook_batch(conn)
+                if rows:
+                    deliver_webhook_batch(conn, rows)
+                    continue
+            except Exception as e:
+                logger.warning("Webhook worker failed on %d outbox deliveries: %s", len(rows), e, exc_info=True)
+                # Unexpected errors count as an attempt, so a delivery that always fails is eventually given up
+                try:
+                    schedule_webhook_retries(conn, rows, str(e) or type(e).__name__)
+                except Exception:
+                    logger.warning("Could not release claimed outbox deliveries; their lease will expire", exc_info=True)
+            dispatcher["wake"].wait(timeout=1)
+            dispatcher["wake"].clear()
+    
+    threads = [threading.Thread(target=deliver_forever, name=f"webhook-worker-{i}", daemon=True) for i in range(WEBHOOK_WORKERS)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def get_webhook_deliveries(limit=100):
+    """Returns the most recent outbox entries as a DataFrame for display."""
+    dispatcher = get_webhook_dispatcher()
+    with dispatcher["lock"]:
+        df = pd.read_sql_query(
+            """SELECT created_at, status, idempotency_key, attempts, response_status, response_text
+               FROM outbox ORDER BY id DESC LIMIT ?""",
+            dispatcher["conn"], params=(limit,)
+        )
+    df['created_at'] = pd.to_datetime(df['created_at'], unit='s').dt.strftime("%Y-%m-%d %H:%M:%S")
+    df['idempotency_key'] = df['idempotency_key'].str[:8]
+    return df.rename(columns={"created_at": "timestamp", "idempotency_key": "payload_hash"})
+
+def get_webhook_outbox_stats(window=60):
+    """Returns outbox counts per status and deliveries per second over the last `window` seconds."""
+    dispatcher = get_webhook_dispatcher()
+    with dispatcher["lock"]:
+        counts = dict(dispatcher["conn"].execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        recent = dispatcher["conn"].execute(
+            "SELECT COUNT(*) FROM outbox WHERE status = 'sent' AND sent_at >= ?", (time.time() - window,)
+        ).fetchone()[0]
+    return {"counts": counts, "throughput": recent / window}
+
+# ==================== CRM STORE ==================== #
+
+def connect_crm_store():
+    """Opens a connection to the on-disk CRM store, creating its tables and indexes on first use.
+    
+    `leads` mirrors the columns of the leads snapshots in use that the CRM filters, sorts and counts on, one
+    `snapshot` number per frame and `position` being the row's position in it. It is derived data, so it lives
+    in the connection's temporary schema. `lead_meta` keeps the notes and tags added in the app.
+    """
+    conn = sqlite3.connect(get_local_data_path("crm_store.sqlite3"), timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("DROP TABLE IF EXISTS main.leads") # Single-snapshot mirror written by earlier versions
+    conn.execute("""
+        CREATE TEMP TABLE leads (
+            snapshot INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            contact_url TEXT,
+            contact_name TEXT,
+            status TEXT,
+            status_rank INTEGER,
+            last_message_date TEXT,
+            PRIMARY KEY (snapshot, position)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX leads_url ON leads (snapshot, contact_url)")
+    conn.execute("CREATE INDEX leads_status ON leads (snapshot, status, last_message_date)")
+    conn.execute("CREATE INDEX leads_rank ON leads (snapshot, status_rank)")
+    conn.execute("CREATE INDEX leads_date ON leads (snapshot, last_message_date)")
+    conn.execute("CREATE INDEX leads_name ON leads (snapshot, contact_name)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lead_meta (
+            contact_url TEXT PRIMARY KEY,
+            notes TEXT NOT NULL DEFAULT '',
+            tags TEXT NOT NULL DEFAULT '[]',
+            updated_at REAL NOT NULL
+        )
+    """)
+    return conn
+
+@st.cache_resource
+def get_crm_store():
+    """Returns the process-wide CRM store: its connection, the lock serializing it, and the mirrored leads snapshots.
+    
+    "snapshots" maps each `snapshot` number in the `leads` table to a weak reference to its frame, least recently used first.
+    """
+    return {"lock": threading.Lock(), "conn": connect_crm_store(), "snapshots": OrderedDict(), "next_snapshot": 0}
+
+def store_values(df, column):
+    """Returns a column's cells as strings for the CRM store, with None for missing cells or a missing column."""
+    if column not in df.columns:
+        return [None] * len(df)
+    return [None if pd.isna(value) else str(value) for value in df[column].tolist()]
+
+def find_crm_snapshot(store, df):
+    """Returns the `snapshot` number mirroring `df`, or None when it is not mirrored (the caller holds the lock)."""
+    for snapshot, ref in store["snapshots"].items():
+        if ref() is df:
+            store["snapshots"].move_to_end(snapshot)
+            return snapshot
+    return None
+
+def add_crm_snapshot(store, df):
+    """Registers `df` under a new `snapshot` number and drops the mirrors of collected or least recently used frames."""
+    snapshot = store["next_snapshot"]
+    store["next_snapshot"] += 1
+    store["snapshots"][snapshot] = weakref.ref(df)
+    dropped = [number for number, ref in store["snapshots"].items() if ref() is None]
+    for number in dropped:
+        del store["snapshots"][number]
+    while len(store["snapshots"]) > CRM_MIRROR_SNAPSHOTS:
+        dropped.append(store["snapshots"].popitem(last=False)[0])
+    store["conn"].executemany("DELETE FROM leads WHERE snapshot = ?", [(number,) for number in dropped])
+    return snapshot
+
+def sync_crm_leads(store, df):
+    """Returns the `snapshot` number mirroring `df`, writing its rows into `leads` first if needed (the caller holds the lock).
+    
+    Every session's frame keeps its own mirror, so sessions showing different snapshots do not rewrite each other's.
+    """
+    snapshot = find_crm_snapshot(store, df)
+    if snapshot is not None:
+        return snapshot
+    
+    # Status sorts by its category order, like sort_values on the categorical column
+    status = df['Status'] if 'Status' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    codes = status.cat.codes if isinstance(status.dtype, pd.CategoricalDtype) else pd.Series(pd.Categorical(status).codes)
+    ranks = [None if code < 0 else code for code in codes.tolist()]
+    
+    conn = store["conn"]
+    snapshot = add_crm_snapshot(store, df)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = zip([snapshot] * len(df), range(len(df)), store_values(df, 'Contact_URL'), store_values(df, 'Contact_Name'),
+                   store_values(df, 'Status'), ranks, store_values(df, 'Last_Message_Date'))
+        conn.executemany("INSERT INTO leads VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        store["snapshots"].pop(snapshot, None)
+        raise
+    return snapshot
+
+def query_crm_positions(df, status=None, sort_by=None, positions=None):
+    """Returns the row positions of `df` with the given Status, in descending order of the CRM sort column.
+    
+    The filter and sort run as indexed queries on the CRM store's mirror of `df`. `positions` (e.g. search
+    matches) restricts the result to those rows while keeping the query's order.
+    """
+    sql, params = "SELECT position FROM leads WHERE snapshot = ?", []
+    if status is not None:
+        sql += " AND status = ?"
+        params.append(str(status))
+    if sort_by in CRM_SORT_COLUMNS:
+        sql += f" ORDER BY {CRM_SORT_COLUMNS[sort_by]} DESC" # read in index order; NULLs sort last, as in sort_values
+    
+    store = get_crm_store()
+    with store["lock"]:
+        snapshot = sync_crm_leads(store, df)
+        result = np.fromiter((row[0] for row in store["conn"].execute(sql, [snapshot] + params)), dtype=np.int64)
+    if positions is not None:
+        result = result[np.isin(result, positions)]
+    return result
+
+def count_crm_statuses(df):
+    """Returns the number of leads in `df` per Status (statuses with no leads omitted), counted by the CRM store."""
+    store = get_crm_store()
+    with store["lock"]:
+        snapshot = sync_crm_leads(store, df)
+        rows = store["conn"].execute(
+            "SELECT status, COUNT(*) FROM leads WHERE snapshot = ? AND status IS NOT NULL GROUP BY status", (snapshot,)
+        ).fetchall()
+    return pd.Series(dict(rows), dtype=np.int64).sort_values(ascending=False)
+
+def patch_crm_lead_status(previous, df, contact_url, new_status):
+    """Moves the mirror of `previous` over to `df`, which differs from it only in one lead's Status.
+    
+    A single indexed UPDATE replaces the rewrite the next query would otherwise do. Edits reach every session
+    through the shared queued-status overlay, so no session keeps querying `previous` afterwards; when it is
+    not mirrored (or `df` already is) nothing happens.
+    """
+    store = get_crm_store()
+    with store["lock"]:
+        snapshot = find_crm_snapshot(store, previous)
+        if snapshot is None or find_crm_snapshot(store, df) is not None or not isinstance(df['Status'].dtype, pd.CategoricalDtype):
+            return
+        rank = df['Status'].cat.categories.get_loc(new_status)
+        store["conn"].execute("UPDATE leads SET status = ?, status_rank = ? WHERE snapshot = ? AND contact_url = ?",
+                              (new_status, rank, snapshot, contact_url))
+        store["snapshots"][snapshot] = weakref.ref(df)
+
+def get_lead_meta(contact_urls=None):
+    """Returns the stored notes and tags as {Contact_URL: notes} and {Contact_URL: [tags]}, for all leads or only `contact_urls`."""
+    sql, params = "SELECT contact_url, notes, tags FROM lead_meta", []
+    if contact_urls is not None:
+        params = [str(url) for url in contact_urls]
+        sql += f" WHERE contact_url IN ({', '.join('?' * len(params))})"
+    store = get_crm_store()
+    with store["lock"]:
+        rows = store["conn"].execute(sql, params).fetchall()
+    notes = {url: text for url, text, _ in rows if text}
+    tags = {url: json.loads(values) for url, _, values in rows if values != '[]'}
+    return notes, tags
+
+def save_lead_notes(contact_url, notes):
+    """Stores a lead's notes in the CRM store, where they outlive the session and are shared with every other one."""
+    store = get_crm_store()
+    with store["lock"]:
+        store["conn"].execute(
+            """INSERT INTO lead_meta (contact_url, notes, updated_at) VALUES (?, ?, ?)
+               ON CONFLICT (contact_url) DO UPDATE SET notes = excluded.notes, updated_at = excluded.updated_at""",
+            (contact_url, notes, time.time())
+        )
+
 # ==================== WEBHOOK & CRM FUNCTIONS ==================== #
 
 def send_webhook_payload(payload):
-    """Sends a payload to the external webhook URL."""
+    """Queues a payload for delivery to the external webhook URL and returns immediately."""
+    key = enqueue_webhook(payload) # The outbox records the delivery outcome
+    add_log_entry(f"Webhook queued for delivery ({key[:8]})")
+    return True
+
+def test_webhook_request(payload):
+    """Posts a payload straight to the webhook URL and returns (success, response text); tests bypass the outbox."""
     try:
-        headers = {'Content-Type': 'application/json'}
-        response = requests.post(WEBHOOK_URL, data=json.dumps(payload), headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # Log the successful webhook
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = {
-            "timestamp": timestamp,
-            "status": "Success",
-            "payload_hash": hashlib.sha256(json.dumps(payload).encode('utf-8')).hexdigest()[:8],
-            "response_status": response.status_code,
-            "response_text": response.text[:100] # Truncate response for log
-        }
-        st.session_state.webhook_history.append(log_entry)
-        add_log_entry(f"Webhook sent successfully! Status: {response.status_code}")
-        return True
+        response = post_webhook_payload(payload)
+        return True, response.text
     except requests.exceptions.RequestException as e:
-        error_message = f"Webhook failed: {e}"
-        st.error(error_message)
-        
-        # Log the failed webhook
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = {
-            "timestamp": timestamp,
-            "status": "Failed",
-            "payload_hash": hashlib.sha256(json.dumps(payload).encode('utf-8')).hexdigest()[:8],
-            "response_status": getattr(e.response, 'status_code', 'N/A'),
-            "response_text": str(e)
-        }
-        st.session_state.webhook_history.append(log_entry)
-        add_log_entry(error_message)
-        return False
+        return False, str(e)
 
 def create_lead_payload(row):
     """Creates a standard lead payload from a DataFrame row."""
     # Ensure all keys exist in the payload, even if values are empty
+    notes, tags = get_lead_meta([row.get('Contact_URL', '')])
     payload = {
         "Contact_Name": row.get('Contact_Name', ''),
         "Contact_URL": row.get('Contact_URL', ''),
@@ -853,48 +1974,515 @@ def create_lead_payload(row):
         "Location": row.get('Location', ''),
         "Email": row.get('Email', ''),
         "Phone": row.get('Phone', ''),
-        "Notes": st.session_state.notes.get(row.get('Contact_URL', ''), ''),
-        "Tags": ", ".join(st.session_state.tags.get(row.get('Contact_URL', ''), [])),
+        "Notes": notes.get(row.get('Contact_URL', ''), ''),
+        "Tags": ", ".join(tags.get(row.get('Contact_URL', ''), [])),
         "Source": "LinkedIn CRM App"
     }
     return payload
 
-def update_lead_status(contact_url, new_status):
-    """Updates the status of a lead in the leads database and sends a webhook."""
+def connect_lead_write_store():
+    """Opens a connection to the CRM store for the lead write queue, creating its table on first use.
     
-    # 1. Update the local leads_database DataFrame
-    df = st.session_state.leads_database.copy()
-    if 'Contact_URL' in df.columns:
-        # Find the row index for the contact
-        idx = df[df['Contact_URL'] == contact_url].index
-        
-        if not idx.empty:
-            # Update the status
-            df.loc[idx, 'Status'] = new_status
-            
-            # Update the local session state
-            st.session_state.leads_database = df
-            
-            # 2. Prepare and send the webhook payload
-            lead_row = df.loc[idx].iloc[0]
-            payload = create_lead_payload(lead_row)
-            payload['Status'] = new_status # Ensure the new status is in the payload
-            send_webhook_payload(payload)
-            
-            # 3. Save the updated DataFrame back to Google Sheets (optional, can be done less frequently)
-            # save_data_to_gsheets(df, LEADS_DATABASE_SHEET_ID, LEADS_SHEET_NAME) 
-            
-            add_log_entry(f"Status for {lead_row.get('Contact_Name', 'Lead')} updated to {new_status}")
+    `lead_writes` keeps every queued or given-up lead edit, so edits not yet in the leads sheet survive a
+    restart. An edit being written stays "pending" there until the sheet has taken it.
+    """
+    conn = sqlite3.connect(get_local_data_path("crm_store.sqlite3"), timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lead_writes (
+            contact_url TEXT PRIMARY KEY,
+            state TEXT NOT NULL,
+            status TEXT,
+            payload TEXT NOT NULL,
+            queued_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            webhook_queued INTEGER NOT NULL DEFAULT 0,
+            error TEXT
+        )
+    """)
+    return conn
+
+@st.cache_resource
+def get_lead_write_queue():
+    """Returns the process-wide write-behind queue of lead status edits, keyed by Contact_URL.
+    
+    Edits wait in "pending" (a newer edit to the same lead replaces the older one) until the background
+    writer moves them to "inflight" and writes them to the leads sheet and the webhook. Edits the sheet
+    rejected LEAD_WRITE_MAX_ATTEMPTS times, or could never take, move to "failed" until retried or dismissed.
+    "generation" changes whenever the set of queued statuses does; "overlay" caches the leads frame with them applied.
+    Every change is written through to the `lead_writes` table on "conn".
+    """
+    return {
+        "lock": threading.Lock(), "wake": threading.Event(), "pending": OrderedDict(), "inflight": {},
+        "failed": OrderedDict(), "generation": 0, "overlay": None, "conn": connect_lead_write_store()
+    }
+
+def persist_lead_writes(queue, saved=(), deleted=()):
+    """Writes queue changes through to `lead_writes` in one transaction (the caller holds the queue lock).
+    
+    `saved` holds (Contact_URL, state, entry) triples and `deleted` the Contact_URLs whose edits are done.
+    The in-memory queue stays authoritative, so a failed write is logged rather than raised.
+    """
+    rows = [
+        (url, state, entry["status"], json.dumps(entry["payload"], default=str), entry["queued_at"],
+         entry.get("attempts", 0), int(bool(entry.get("webhook_queued"))), entry.get("error"))
+        for url, state, entry in saved
+    ]
+    conn = queue["conn"]
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("DELETE FROM lead_writes WHERE contact_url = ?", [(url,) for url in deleted])
+            conn.executemany("INSERT OR REPLACE INTO lead_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    except sqlite3.Error as e:
+        logger.warning("Could not persist %d lead write queue changes: %s", len(rows) + len(deleted), e)
+
+def restore_lead_writes(queue):
+    """Reloads the edits kept in `lead_writes` into the queue; edits that were being written are pending again."""
+    with queue["lock"]:
+        rows = queue["conn"].execute(
+            """SELECT contact_url, state, status, payload, queued_at, attempts, webhook_queued, error
+               FROM lead_writes ORDER BY queued_at"""
+        ).fetchall()
+        for url, state, status, payload, queued_at, attempts, webhook_queued, error in rows:
+            entry = {
+                "status": status, "payload": json.loads(payload), "queued_at": queued_at,
+                "attempts": attempts, "webhook_queued": bool(webhook_queued)
+            }
+            if state == "failed":
+                queue["failed"].setdefault(url, {**entry, "error": error})
+            else:
+                queue["pending"].setdefault(url, entry)
+        if rows:
+            queue["generation"] += 1
+            queue["wake"].set()
+
+def enqueue_lead_update(contact_url, new_status, payload):
+    """Queues a lead status edit for the background writer, coalescing it with any unsent edit of that lead."""
+    start_lead_writer()
+    queue = get_lead_write_queue()
+    with queue["lock"]:
+        previous = queue["pending"].get(contact_url)
+        entry = queue["pending"][contact_url] = {
+            "status": new_status,
+            "payload": payload,
+            "queued_at": previous["queued_at"] if previous else time.time()
+        }
+        queue["failed"].pop(contact_url, None) # A newer edit supersedes one that was given up
+        persist_lead_writes(queue, saved=[(contact_url, "pending", entry)])
+        queue["generation"] += 1
+        if len(queue["pending"]) >= LEAD_WRITE_BATCH_SIZE:
+            queue["wake"].set()
+
+def get_queued_lead_statuses():
+    """Returns the statuses of every lead edit not yet reflected in the shared leads snapshot."""
+    queue = get_lead_write_queue()
+    with queue["lock"]:
+        statuses = {url: entry["status"] for url, entry in queue["inflight"].items()}
+        statuses.update((url, entry["status"]) for url, entry in queue["pending"].items())
+    return statuses
+
+def get_failed_lead_updates():
+    """Returns the lead edits the background writer gave up on, as {Contact_URL: entry} with an "error" reason."""
+    start_lead_writer() # Restores the edits kept from an earlier run
+    queue = get_lead_write_queue()
+    with queue["lock"]:
+        return dict(queue["failed"])
+
+def retry_failed_lead_updates():
+    """Queues every given-up lead edit again with a fresh attempt budget."""
+    queue = get_lead_write_queue()
+    with queue["lock"]:
+        for url, entry in queue["failed"].items():
+            queue["pending"].setdefault(url, {**entry, "attempts": 0, "queued_at": time.time()})
+        persist_lead_writes(queue, saved=[(url, "pending", queue["pending"][url]) for url in queue["failed"]])
+        queue["failed"].clear()
+        queue["generation"] += 1
+        queue["wake"].set()
+
+def dismiss_failed_lead_updates():
+    """Drops every given-up lead edit; the sheet keeps its current statuses."""
+    queue = get_lead_write_queue()
+    with queue["lock"]:
+        persist_lead_writes(queue, deleted=[url for url in queue["failed"] if url not in queue["pending"]])
+        queue["failed"].clear()
+
+def replace_lead_statuses(df, mask, statuses):
+    """Returns `df` with the Status of the masked rows replaced, sharing every other column with it."""
+    status = df['Status'].copy()
+    status[mask] = statuses
+    df = df.copy(deep=False)
+    df['Status'] = status
+    return df
+
+def overlay_lead_statuses(df, statuses):
+    """Returns `df` with the given statuses applied by Contact_URL, or `df` itself when they already are."""
+    if not statuses or df.empty or 'Contact_URL' not in df.columns or 'Status' not in df.columns:
+        return df
+    
+    mask = df['Contact_URL'].isin(statuses)
+    if not mask.any():
+        return df
+    wanted = df.loc[mask, 'Contact_URL'].map(statuses)
+    if (df.loc[mask, 'Status'] == wanted).all():
+        return df
+    return replace_lead_statuses(df, mask, wanted)
+
+def apply_queued_lead_updates(df):
+    """Overlays queued status edits on a leads frame, returning it unchanged when they are already applied.
+    
+    The result is shared by every session until the snapshot or the queue changes, so reruns do not rebuild it.
+    A previous overlay passed back in is recomputed from the snapshot it was built on.
+    """
+    start_lead_writer() # Restores the edits kept from an earlier run
+    queue = get_lead_write_queue()
+    with queue["lock"]:
+        overlay, generation = queue["overlay"], queue["generation"]
+    statuses = get_queued_lead_statuses()
+    if overlay is not None and df is overlay["df"]:
+        df = overlay["source"]
+    if overlay is not None and overlay["source"] is df and overlay["generation"] == generation:
+        return overlay["df"]
+    
+    result = overlay_lead_statuses(df, statuses)
+    with queue["lock"]:
+        queue["overlay"] = {"source": df, "generation": generation, "df": result}
+    return result
+
+def write_lead_statuses(client, statuses):
+    """Writes lead statuses into the leads sheet's Status cells and patches the shared leads snapshot.
+    
+    Returns False when the sheet has no Contact_URL/Status columns; raises on gspread errors.
+    """
+    worksheet = client.open_by_key(LEADS_DATABASE_SHEET_ID).get_worksheet_by_id(int(LEADS_SHEET_GID))
+    raw_header = worksheet.row_values(1)
+    header = [re.sub('[^A-Za-z0-9_]+', '', column) for column in raw_header]
+    if 'Contact_URL' not in header or 'Status' not in header:
+        return False
+    
+    # One cell per matching row, all sent in a single batch_update
+    status_column = header.index('Status') + 1
+    urls = worksheet.col_values(header.index('Contact_URL') + 1)
+    updates = [
+        {"range": gspread.utils.rowcol_to_a1(row, status_column), "values": [[statuses[url]]]}
+        for row, url in enumerate(urls[1:], start=2) if url in statuses
+    ]
+    if updates:
+        worksheet.batch_update(updates, value_input_option="USER_ENTERED")
+    
+    # The tab is synced append-only, so edits in place are patched into the raw snapshot here
+    key = (LEADS_DATABASE_SHEET_ID, LEADS_SHEET_GID)
+    with get_leads_snapshot_lock():
+        raw, _ = read_local_leads_snapshot(*key)
+        if raw is None:
+            invalidate_snapshots([key])
             return True
-        else:
-            st.warning(f"Could not find lead with URL: {contact_url}")
-            return False
-    else:
+        url_column = raw.columns[header.index('Contact_URL')]
+        mask = raw[url_column].isin(statuses)
+        raw.loc[mask, raw.columns[header.index('Status')]] = raw.loc[mask, url_column].map(statuses)
+        write_local_leads_snapshot(*key, raw)
+        put_snapshot(key, process_outreach_data(raw.copy()), version=len(raw))
+    return True
+
+def flush_lead_updates(client):
+    """Writes every queued lead edit to the leads sheet and the webhook outbox.
+    
+    Failed sheet writes are queued again up to LEAD_WRITE_MAX_ATTEMPTS times; after that, or when the sheet
+    cannot take them at all, they move to "failed" and the CRM reports them.
+    """
+    queue = get_lead_write_queue()
+    with queue["lock"]:
+        batch, queue["pending"] = queue["pending"], OrderedDict()
+        queue["inflight"] = dict(batch)
+    if not batch:
+        return
+    
+    # Webhooks go to the outbox, which retries them on its own
+    unsent = [url for url, entry in batch.items() if not entry.get("webhook_queued")]
+    for url in unsent:
+        enqueue_webhook(batch[url]["payload"])
+        batch[url]["webhook_queued"] = True
+    if unsent:
+        with queue["lock"]:
+            persist_lead_writes(queue, saved=[(url, "pending", batch[url]) for url in unsent if url not in queue["pending"]])
+    
+    error, permanent = None, False
+    try:
+        if not write_lead_statuses(client, {url: entry["status"] for url, entry in batch.items()}):
+            error, permanent = "The leads sheet has no Contact_URL or Status column", True
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    if error:
+        logger.warning("Could not write %d lead status edits to the leads sheet: %s", len(batch), error)
+    
+    with queue["lock"]:
+        queue["inflight"] = {}
+        queue["generation"] += 1
+        # Retry after another full delay, unless the lead was edited again meanwhile
+        saved, deleted = [], []
+        for url, entry in batch.items():
+            if url in queue["pending"]:
+                continue
+            if not error:
+                deleted.append(url)
+                continue
+            entry = {**entry, "queued_at": time.time(), "webhook_queued": True, "attempts": entry.get("attempts", 0) + 1}
+            if permanent or entry["attempts"] >= LEAD_WRITE_MAX_ATTEMPTS:
+                queue["failed"][url] = {**entry, "error": error}
+                saved.append((url, "failed", queue["failed"][url]))
+            else:
+                queue["pending"][url] = entry
+                saved.append((url, "pending", entry))
+        persist_lead_writes(queue, saved, deleted)
+    get_refresh_scheduler()["wake"].set() # Let the local tier pick up the patched snapshot
+
+@st.cache_resource
+def start_lead_writer():
+    """Starts the process-wide background thread that flushes queued lead edits on a size/time policy.
+    
+    Edits kept in `lead_writes` by an earlier run are queued again first.
+    """
+    queue = get_lead_write_queue()
+    restore_lead_writes(queue)
+    
+    def write_forever():
+        client = None
+        while True:
+            queue["wake"].wait(timeout=1)
+            queue["wake"].clear()
+            with queue["lock"]:
+                oldest = min((entry["queued_at"] for entry in queue["pending"].values()), default=None)
+                due = len(queue["pending"]) >= LEAD_WRITE_BATCH_SIZE or (
+                    oldest is not None and time.time() - oldest >= LEAD_WRITE_MAX_DELAY
+                )
+            if not due:
+                continue
+            try:
+                if client is None:
+                    client = authorize_gsheets_client()
+                flush_lead_updates(client)
+            except Exception as e:
+                logger.warning("Lead writer could not flush queued edits: %s", e)
+    
+    thread = threading.Thread(target=write_forever, name="lead-write-behind", daemon=True)
+    thread.start()
+    return thread
+
+def create_lead_payloads(df):
+    """Creates standard lead payloads for every row of a DataFrame, column by column."""
+    notes, tags = get_lead_meta()
+    tags = {url: ", ".join(values) for url, values in tags.items()}
+    
+    # Same keys and defaults as create_lead_payload, selected as whole columns
+    payloads = pd.DataFrame(index=df.index)
+    defaults = {
+        "Contact_Name": '', "Contact_URL": '', "Status": 'Pending',
+        "Last_Message_Date": datetime.now().strftime("%Y-%m-%d"),
+        "Company": '', "Title": '', "Location": '', "Email": '', "Phone": ''
+    }
+    for column, default in defaults.items():
+        payloads[column] = df[column] if column in df.columns else default
+    payloads["Notes"] = payloads["Contact_URL"].map(notes).fillna('')
+    payloads["Tags"] = payloads["Contact_URL"].map(tags).fillna('')
+    payloads["Source"] = "LinkedIn CRM App"
+    return payloads.astype(object).to_dict('records')
+
+def send_bulk_webhooks(df):
+    """Queues one webhook per lead in a DataFrame and records the job for progress reporting."""
+    first_id, last_id = enqueue_webhooks(create_lead_payloads(df))
+    st.session_state.bulk_webhook_job = {
+        "first_id": first_id, "last_id": last_id, "leads": len(df), "started_at": time.time()
+    }
+    add_log_entry(f"Queued {len(df)} leads for webhook delivery")
+
+def render_bulk_webhook_progress():
+    """Shows delivery progress of the current bulk webhook job (polled as a fragment)."""
+    job = st.session_state.bulk_webhook_job
+    if job is None:
+        return
+    
+    counts = get_webhook_job_progress(job["first_id"], job["last_id"])
+    queued = sum(counts.values())
+    done = counts.get("sent", 0) + counts.get("failed", 0)
+    elapsed = time.time() - job["started_at"]
+    # Leads whose identical payload was still waiting in the outbox were not queued again
+    skipped = job["leads"] - queued
+    st.progress(done / queued if queued else 1.0, text=(
+        f"{counts.get('sent', 0)} delivered, {counts.get('failed', 0)} failed, {queued - done} pending of {queued} queued"
+        + (f" ({skipped} already waiting)" if skipped else "") + f" · {elapsed:.0f}s"
+    ))
+
+def update_lead_status(contact_url, new_status):
+    """Updates the status of a lead immediately and queues the Sheets write and webhook for the background writer."""
+    df = st.session_state.leads_database
+    if 'Contact_URL' not in df.columns:
         st.error("Leads database is missing 'Contact_URL' column.")
         return False
+    
+    mask = df['Contact_URL'] == contact_url
+    if not mask.any():
+        st.warning(f"Could not find lead with URL: {contact_url}")
+        return False
+    
+    # 1. Queue the Sheets write and webhook; repeated edits of this lead are coalesced
+    lead_row = df[mask].iloc[0]
+    payload = create_lead_payload(lead_row)
+    payload['Status'] = new_status # Ensure the new status is in the payload
+    enqueue_lead_update(contact_url, new_status, payload)
+    
+    # 2. Show it through the shared overlay, which replaces only the Status column
+    previous, df = df, apply_queued_lead_updates(df)
+    st.session_state.leads_database = df
+    patch_crm_lead_status(previous, df, contact_url, new_status)
+    
+    add_log_entry(f"Status for {lead_row.get('Contact_Name', 'Lead')} updated to {new_status}")
+    return True
+
+# ==================== SEARCH INDEX ==================== #
+
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+")
+
+def lowercase_field_values(df, field):
+    """Returns a column's cell values as lowercased strings in an object array; missing cells become ''."""
+    return df[field].astype(str).str.lower().fillna("").to_numpy(dtype=object)
+
+def build_field_postings(values):
+    """Builds a sorted token vocabulary and its posting lists (row positions) for one field."""
+    tokens = pd.Series(values, dtype=object).str.findall(SEARCH_TOKEN_PATTERN.pattern).explode().dropna()
+    pairs = pd.DataFrame({"token": tokens.to_numpy(dtype=object), "pos": tokens.index.to_numpy()})
+    pairs = pairs.drop_duplicates().sort_values(["token", "pos"])
+    vocab, starts = np.unique(pairs["token"].to_numpy(dtype=object), return_index=True)
+    offsets = np.append(starts, len(pairs))
+    return {"vocab": vocab, "offsets": offsets, "positions": pairs["pos"].to_numpy(dtype=np.int64)}
+
+def changed_field_rows(old, new):
+    """Returns a boolean mask of the positions where two equally long columns hold different cells.
+    
+    Cells are compared as stored, so unchanged rows are never converted to text; missing equals missing.
+    """
+    old, new = old.reset_index(drop=True), new.reset_index(drop=True)
+    if isinstance(old.dtype, pd.CategoricalDtype) and isinstance(new.dtype, pd.CategoricalDtype) \
+            and old.cat.categories.equals(new.cat.categories):
+        return old.cat.codes.to_numpy() != new.cat.codes.to_numpy()
+    if old.dtype != new.dtype or isinstance(old.dtype, pd.CategoricalDtype):
+        old, new = old.astype(object), new.astype(object)
+    return (old.ne(new) & ~(old.isna() & new.isna())).to_numpy(dtype=bool)
+
+def build_search_index(df, fields):
+    """Builds an inverted token index over the given columns of a DataFrame snapshot."""
+    return {
+        "df": df,
+        "fields": list(fields),
+        "size": len(df),
+        "base_size": len(df),
+        "base": {field: build_field_postings(lowercase_field_values(df, field)) for field in fields},
+        "stale": np.empty(0, dtype=np.int64),
+        "delta": {}
+    }
+
+def update_search_index(index, df):
+    """Brings an index up to date with a new snapshot, re-indexing only the rows that changed."""
+    fields = index["fields"]
+    if len(df) < index["size"] or any(field not in df.columns for field in fields):
+        return build_search_index(df, fields)
+    
+    # Compare the cells of existing rows against the indexed snapshot; appended rows are always new
+    size = index["size"]
+    changed = np.zeros(len(df), dtype=bool)
+    changed[size:] = True
+    for field in fields:
+        changed[:size] |= changed_field_rows(index["df"][field].iloc[:size], df[field].iloc[:size])
+    positions = np.flatnonzero(changed)
+    
+    if len(index["delta"]) + len(positions) > SEARCH_INDEX_MAX_DELTA:
+        return build_search_index(df, fields)
+    
+    # Only changed rows are lowercased; they move to the overlay and their base postings are masked out as stale
+    rows = df.iloc[positions]
+    values = {field: lowercase_field_values(rows, field) for field in fields}
+    for i, pos in enumerate(positions.tolist()):
+        index["delta"][pos] = {field: set(SEARCH_TOKEN_PATTERN.findall(values[field][i])) for field in fields}
+    index["stale"] = np.union1d(index["stale"], positions[positions < index["base_size"]])
+    index.update(df=df, size=len(df))
+    return index
+
+def parse_search_query(query, fields, aliases=None):
+    """Splits a query into (fields, token) AND terms; `field:value` parts are scoped to that field."""
+    by_name = {str(field).lower(): field for field in fields}
+    for alias, field in (aliases or {}).items():
+        if field in fields:
+            by_name[alias.lower()] = field
+    
+    terms = []
+    for part in query.lower().split():
+        scope = fields
+        prefix, sep, value = part.partition(":")
+        if sep and prefix in by_name:
+            scope, part = [by_name[prefix]], value
+        terms.extend((scope, token) for token in SEARCH_TOKEN_PATTERN.findall(part))
+    return terms
+
+def match_search_term(index, scope, token):
+    """Returns a boolean row mask of rows with a word starting with `token` in any of the scoped fields."""
+    mask = np.zeros(index["size"], dtype=bool)
+    for field in scope:
+        postings = index["base"][field]
+        lo = np.searchsorted(postings["vocab"], token, side="left")
+        hi = np.searchsorted(postings["vocab"], token + "\U0010ffff", side="left")
+        mask[postings["positions"][postings["offsets"][lo]:postings["offsets"][hi]]] = True
+    mask[index["stale"]] = False
+    
+    for pos, row in index["delta"].items():
+        if any(word.startswith(token) for field in scope for word in row[field]):
+            mask[pos] = True
+    return mask
+
+def search_index(index, query, aliases=None):
+    """Returns the sorted row positions matching every term of the query."""
+    matched = np.ones(index["size"], dtype=bool)
+    for scope, token in parse_search_query(query, index["fields"], aliases):
+        matched &= match_search_term(index, scope, token)
+    return np.flatnonzero(matched)
+
+@st.cache_resource
+def get_search_indexes():
+    """Returns the process-wide search indexes, one per named table."""
+    return {"lock": threading.Lock(), "entries": {}}
+
+def search_dataframe(name, df, fields, query, aliases=None):
+    """Searches a DataFrame snapshot through its cached index and returns the matching row positions.
+    
+    The index is built on first use and updated incrementally when a new snapshot of the table arrives.
+    """
+    fields = [field for field in fields if field in df.columns]
+    if not fields:
+        return np.empty(0, dtype=np.int64)
+    
+    indexes = get_search_indexes()
+    with indexes["lock"]:
+        index = indexes["entries"].get(name)
+        if index is None or index["fields"] != fields:
+            index = build_search_index(df, fields)
+        elif index["df"] is not df:
+            index = update_search_index(index, df)
+        indexes["entries"][name] = index
+        return search_index(index, query, aliases)
 
 # ==================== DATA PROCESSING & VISUALIZATION ==================== #
 
+def as_categorical(values, categories):
+    """Returns `values` as a Categorical over the declared categories, extended by any other value present.
+    
+    Filters and counts on the result compare integer codes instead of strings.
+    """
+    extra = pd.Index(values.dropna().unique()).difference(categories)
+    return values.astype(pd.CategoricalDtype(list(categories) + extra.tolist()))
+
 def process_outreach_data(df):
     """Cleans and processes the outreach tracking data."""
     if df.empty:
@@ -918,7 +2506,7 @@ def process_outreach_data(df):
             
     # Clean up status column (e.g., if it contains extra text)
     if 'Status' in df.columns:
-        df['Status'] = df['Status'].astype(str).str.strip()
+        df['Status'] = as_categorical(df['Status'].astype(str).str.strip(), LEAD_STATUSES)
     
     return df
 
@@ -941,12 +2529,42 @@ def process_chat_data(df):
         
     return df
 
+@st.cache_resource
+def get_figure_cache():
+    """Returns the process-wide LRU cache of built Plotly figures, keyed by (kind, data snapshot, options)."""
+    return {"lock": threading.Lock(), "entries": OrderedDict()}
+
+def get_cached_figure(kind, source, build, **options):
+    """Returns the figure `build(**options)` for a data snapshot, constructing it only on a cache miss.
+    
+    `source` is the DataFrame snapshot the chart is derived from. Snapshots are never mutated, so their
+    identity is their version. Entries only hold a weak reference to it, which also tells a reused id apart,
+    so the cache never keeps a replaced snapshot alive; entries of snapshots that are gone are dropped.
+    """
+    cache = get_figure_cache()
+    key = (kind, id(source), tuple(sorted(options.items())))
+    with cache["lock"]:
+        entry = cache["entries"].get(key)
+        if entry is not None and entry["source"]() is source:
+            cache["entries"].move_to_end(key)
+            return entry["figure"]
+    
+    figure = build(**options)
+    with cache["lock"]:
+        for dead in [k for k, e in cache["entries"].items() if e["source"]() is None]:
+            del cache["entries"][dead]
+        cache["entries"][key] = {"source": weakref.ref(source), "figure": figure}
+        cache["entries"].move_to_end(key)
+        while len(cache["entries"]) > FIGURE_CACHE_SIZE:
+            cache["entries"].popitem(last=False)
+    return figure
+
 def create_status_pie_chart(df):
     """Creates a Plotly pie chart for lead status distribution."""
     if df.empty:
         return go.Figure()
         
-    status_counts = df['Status'].value_counts().reset_index()
+    status_counts = count_crm_statuses(df).reset_index()
     status_counts.columns = ['Status', 'Count']
     
     # Define a color map for statuses
@@ -1081,24 +2699,18 @@ def main_app():
     # --- 1. Authentication and Data Loading ---
     client = get_gsheets_client()
     
-    # Initialize data caches if they don't exist
-    if st.session_state.sheets_data is None:
-        st.session_state.sheets_data = {}
-    if st.session_state.leads_sheets_data is None:
-        st.session_state.leads_sheets_data = {}
-
-    # Load data
+    # Load data (all sheets are fetched concurrently)
     with st.spinner("Loading data from Google Sheets..."):
-        # Load chat history
-        chat_df_raw = load_data_from_gsheets(CHAT_SPREADSHEET_ID, CHAT_SHEET_NAME, use_cache=st.session_state.auto_refresh)
-        st.session_state.chat_df = process_chat_data(chat_df_raw)
+        data = load_all_data(client)
         
-        # Load leads database (CRM)
-        leads_df_raw = load_leads_data(LEADS_DATABASE_SHEET_ID, LEADS_SHEET_GID, use_cache=st.session_state.auto_refresh)
-        st.session_state.leads_database = process_outreach_data(leads_df_raw)
+        # Chat history
+        st.session_state.chat_df = data["chat_df"]
         
-        # Load daily tracker
-        st.session_state.daily_tracker = load_daily_tracker_data(client)
+        # Leads database (CRM)
+        st.session_state.leads_database = apply_queued_lead_updates(data["leads_database"])
+        
+        # Daily tracker
+        st.session_state.daily_tracker = data["daily_tracker"]
     
     # --- 2. Sidebar and Configuration ---
     with st.sidebar:
@@ -1120,8 +2732,14 @@ def main_app():
             st.session_state.refresh_interval = st.slider("Refresh interval (seconds)", 30, 300, st.session_state.refresh_interval, 30)
         
         if st.button("Manual Refresh Data", use_container_width=True):
-            st.session_state.sheets_data = None # Clear cache
-            st.session_state.leads_sheets_data = None # Clear cache
+            invalidate_snapshots() # Next read revalidates every sheet with Google
+            if client is not None:
+                # Pull the sheets into the local data tier right away instead of waiting for the background sync
+                with st.spinner("Syncing with Google Sheets..."):
+                    try:
+                        sync_local_store(client)
+                    except Exception as e:
+                        st.error(f"Sync failed: {e}")
             st.session_state.last_refresh = datetime.utcnow()
             st.rerun()
             
@@ -1147,9 +2765,9 @@ def main_app():
         render_integrations_logs()
         
     # --- 4. Auto-refresh logic ---
+    # The shared scheduler fetches the sheets; this session only polls the local versions, without blocking
     if st.session_state.auto_refresh:
-        time.sleep(st.session_state.refresh_interval)
-        st.rerun()
+        st.fragment(watch_for_new_data, run_every=st.session_state.refresh_interval)()
 
 # ==================== PAGE RENDERERS ==================== #
 
@@ -1219,11 +2837,12 @@ def render_dashboard():
     
     with chart_col1:
         st.subheader("Activity Trends")
-        st.plotly_chart(create_daily_activity_chart(daily_summary['df']), use_container_width=True)
+        # Figures are rebuilt only when the snapshot they are drawn from changes
+        st.plotly_chart(get_cached_figure("daily_activity", st.session_state.daily_tracker, lambda: create_daily_activity_chart(daily_summary['daily'].reset_index())), use_container_width=True)
         
     with chart_col2:
         st.subheader("Conversion Pipeline")
-        st.plotly_chart(create_conversion_funnel(daily_summary), use_container_width=True)
+        st.plotly_chart(get_cached_figure("conversion_funnel", st.session_state.daily_tracker, lambda: create_conversion_funnel(daily_summary)), use_container_width=True)
         
     st.markdown("---")
     
@@ -1233,7 +2852,8 @@ def render_dashboard():
     lead_col1, lead_col2 = st.columns([1, 2])
     
     with lead_col1:
-        st.plotly_chart(create_status_pie_chart(st.session_state.leads_database), use_container_width=True)
+        leads = st.session_state.leads_database
+        st.plotly_chart(get_cached_figure("status_pie", leads, lambda: create_status_pie_chart(leads)), use_container_width=True)
         
     with lead_col2:
         st.subheader("Top 5 Recent Conversations")
@@ -1285,7 +2905,7 @@ def render_crm():
     col_search, col_status, col_sort = st.columns([3, 2, 1])
     
     with col_search:
-        st.session_state.search_query = st.text_input("Search Leads (Name, Title, Company)", st.session_state.search_query, placeholder="e.g., John Doe, CEO, TechCorp")
+        st.session_state.search_query = st.text_input("Search Leads (Name, Title, Company)", st.session_state.search_query, placeholder="e.g., John Doe, CEO, company:TechCorp")
         
     with col_status:
         status_options = ['all'] + st.session_state.leads_database['Status'].unique().tolist()
@@ -1295,25 +2915,53 @@ def render_crm():
         sort_options = ['Last_Message_Date', 'Status', 'Contact_Name']
         st.session_state.sort_by = st.selectbox("Sort By", sort_options, index=sort_options.index(st.session_state.sort_by))
 
+    # --- Edits the Background Writer Gave Up On ---
+    
+    failed_updates = get_failed_lead_updates()
+    if failed_updates:
+        reasons = sorted({entry["error"] for entry in failed_updates.values()})
+        st.warning(f"{len(failed_updates)} status edit(s) could not be saved to the leads sheet: {'; '.join(reasons)}")
+        col_retry, col_dismiss, _ = st.columns([1, 1, 4])
+        if col_retry.button("🔄 Retry Saving", key="retry_failed_lead_updates"):
+            retry_failed_lead_updates()
+            st.session_state.leads_database = apply_queued_lead_updates(st.session_state.leads_database)
+            st.rerun()
+        if col_dismiss.button("Dismiss", key="dismiss_failed_lead_updates"):
+            dismiss_failed_lead_updates()
+            st.rerun()
+    
     # --- Apply Filters and Sort ---
     
-    filtered_df = st.session_state.leads_database.copy()
+    leads_df = st.session_state.leads_database
     
-    # Status filter
-    if st.session_state.filter_status != 'all':
-        filtered_df = filtered_df[filtered_df['Status'] == st.session_state.filter_status]
-        
-    # Search filter
+    # Search filter: every term must match the start of a word; `company:acme` scopes a term to one field
+    search_positions = None
     if st.session_state.search_query:
-        search_term = st.session_state.search_query.lower()
-        filtered_df = filtered_df[
-            filtered_df['Contact_Name'].astype(str).str.lower().str.contains(search_term) |
-            filtered_df['Title'].astype(str).str.lower().str.contains(search_term) |
-            filtered_df['Company'].astype(str).str.lower().str.contains(search_term)
-        ]
+        search_positions = search_dataframe("crm_leads", leads_df, list(CRM_SEARCH_FIELDS.values()), st.session_state.search_query, CRM_SEARCH_FIELDS)
+    
+    # Status filter and sort run as indexed queries on the CRM store; only the resulting rows are taken from the frame
+    status_filter = None if st.session_state.filter_status == 'all' else st.session_state.filter_status
+    positions = query_crm_positions(leads_df, status_filter, st.session_state.sort_by, search_positions)
+    filtered_df = leads_df.iloc[positions]
+    
+    # --- Bulk Webhook Dispatch ---
+    
+    with st.expander("📤 Bulk Webhook Dispatch", expanded=st.session_state.bulk_webhook_job is not None):
+        bulk_labels = dict(zip(filtered_df['Contact_URL'].tolist(), column_values(filtered_df, 'Contact_Name')))
+        st.session_state.selected_leads = st.multiselect(
+            "Selected Leads (leave empty to send every filtered lead)",
+            list(bulk_labels),
+            default=[url for url in st.session_state.selected_leads if url in bulk_labels],
+            format_func=bulk_labels.get
+        )
+        bulk_df = filtered_df[filtered_df['Contact_URL'].isin(st.session_state.selected_leads)] if st.session_state.selected_leads else filtered_df
         
-    # Sort
-    filtered_df = filtered_df.sort_values(by=st.session_state.sort_by, ascending=False)
+        if st.button(f"Send {len(bulk_df)} Leads to Webhook", use_container_width=True, disabled=bulk_df.empty):
+            send_bulk_webhooks(bulk_df)
+        
+        # Deliveries run on the outbox worker pool; the progress bar polls the outbox
+        if st.session_state.bulk_webhook_job is not None:
+            st.fragment(render_bulk_webhook_progress, run_every=1)()
     
     # --- Layout ---
     
@@ -1326,45 +2974,31 @@ def render_crm():
         if filtered_df.empty:
             st.info("No leads match the current filters.")
         else:
-            # Display lead cards
-            for index, row in filtered_df.iterrows():
-                contact_url = row['Contact_URL']
-                
-                # Check if this is the currently selected contact
-                is_selected = st.session_state.selected_contact == contact_url
-                
-                # Create a clickable container using a button-like structure
-                style = """
-                    cursor: pointer; 
-                    padding: 1rem; 
-                    border-radius: 10px; 
-                    margin-bottom: 0.5rem; 
-                    transition: all 0.2s;
-                    box-shadow: 0 2px 5px rgba(0,0,0,0.05);
-                """
-                if is_selected:
-                    style += "background-color: #e6e9f0; border: 2px solid #667eea;"
-                else:
-                    style += "background-color: #f8f8f8; border: 1px solid #eee;"
-                
-                # Use a unique key for the button/container to make it clickable
-                if st.button(
-                    key=f"select_lead_{contact_url}",
-                    label=f"""
-                        <div style="{style}">
-                            <div style="display: flex; justify-content: space-between; align-items: center;">
-                                <div style="font-weight: 700; color: #333; font-size: 1rem;">{row['Contact_Name']}</div>
-                                <div style="font-size: 0.75rem; color: #999;">{row['Last_Message_Date']}</div>
-                            </div>
-                            <div style="font-size: 0.85rem; color: #666;">{row['Title']} at {row['Company']}</div>
-                            <div style="margin-top: 0.5rem;">{get_status_badge(row['Status'])}</div>
-                        </div>
-                    """,
-                    use_container_width=True,
-                    unsafe_allow_html=True
-                ):
-                    st.session_state.selected_contact = contact_url
-                    st.rerun() # Rerun to update the conversation column
+            # Pick the lead to open; the cards are rendered as a single HTML block
+            contact_urls = filtered_df['Contact_URL'].tolist()
+            lead_labels = dict(zip(contact_urls, (f"{name} · {company}" for name, company in zip(
+                column_values(filtered_df, 'Contact_Name'), column_values(filtered_df, 'Company')))))
+            selected = st.selectbox(
+                "Open Conversation",
+                list(lead_labels),
+                index=list(lead_labels).index(st.session_state.selected_contact) if st.session_state.selected_contact in lead_labels else None,
+                format_func=lead_labels.get,
+                placeholder="Select a lead"
+            )
+            if selected is not None and selected != st.session_state.selected_contact:
+                st.session_state.selected_contact = selected
+                st.session_state.history_limit = MESSAGE_HISTORY_PAGE_SIZE
+            
+            rows = zip(
+                [url == st.session_state.selected_contact for url in contact_urls],
+                column_values(filtered_df, 'Contact_Name'),
+                column_values(filtered_df, 'Last_Message_Date'),
+                column_values(filtered_df, 'Title'),
+                column_values(filtered_df, 'Company'),
+                column_values(filtered_df, 'Status')
+            )
+            cards_html = render_fragments("lead_card", render_lead_card, rows)
+            st.markdown(f'<div style="max-height: 600px; overflow-y: auto;">{cards_html}</div>', unsafe_allow_html=True)
                     
     # --- Conversation View ---
     with conversation_col:
@@ -1380,8 +3014,15 @@ def render_crm():
             tab_conv, tab_details, tab_actions = st.tabs(["Conversation", "Details", "Actions"])
             
             with tab_conv:
-                # Display message history
-                history_html = get_message_history(st.session_state.chat_df, st.session_state.selected_contact)
+                # Display the most recent page of the message history
+                total_messages = count_contact_messages(st.session_state.chat_df, st.session_state.selected_contact)
+                if total_messages > st.session_state.history_limit:
+                    col_count, col_more = st.columns([3, 1])
+                    col_count.caption(f"Showing the last {st.session_state.history_limit} of {total_messages} messages")
+                    if col_more.button("Load earlier", use_container_width=True):
+                        st.session_state.history_limit += MESSAGE_HISTORY_PAGE_SIZE
+                        st.rerun()
+                history_html = get_message_history(st.session_state.chat_df, st.session_state.selected_contact, last_n=st.session_state.history_limit)
                 st.markdown(f"""
                 <div style="height: 500px; overflow-y: auto; background-color: white; padding: 1.5rem; border-radius: 15px; box-shadow: inset 0 0 10px rgba(0,0,0,0.05);">
                     {history_html}
@@ -1393,10 +3034,10 @@ def render_crm():
                 st.json(selected_lead.to_dict())
                 
                 st.subheader("Notes")
-                current_notes = st.session_state.notes.get(st.session_state.selected_contact, "")
+                current_notes = get_lead_meta([st.session_state.selected_contact])[0].get(st.session_state.selected_contact, "")
                 new_notes = st.text_area("Edit Notes", current_notes, height=150)
                 if new_notes != current_notes:
-                    st.session_state.notes[st.session_state.selected_contact] = new_notes
+                    save_lead_notes(st.session_state.selected_contact, new_notes)
                     add_log_entry(f"Notes updated for {selected_lead['Contact_Name']}")
                     st.rerun()
                     
@@ -1406,8 +3047,8 @@ def render_crm():
                 current_status = selected_lead['Status']
                 new_status = st.selectbox(
                     "Select New Status", 
-                    ['Connected', 'Sent', 'Pending', 'Replied', 'Converted', 'Ready'],
-                    index=['Connected', 'Sent', 'Pending', 'Replied', 'Converted', 'Ready'].index(current_status)
+                    LEAD_STATUSES,
+                    index=LEAD_STATUSES.index(current_status)
                 )
                 
                 if st.button("Update Status and Send Webhook", use_container_width=True):
@@ -1518,16 +3159,29 @@ def render_integrations_logs():
         if col_test.button("Send Custom Test Webhook", use_container_width=True):
             try:
                 payload = json.loads(st.session_state.webhook_test_payload)
-                send_webhook_payload(payload)
             except json.JSONDecodeError:
                 st.error("Invalid JSON payload.")
+            else:
+                with st.spinner("Sending test webhook..."):
+                    success, response = test_webhook_request(payload)
+                if success:
+                    add_log_entry("Test webhook delivered")
+                else:
+                    st.error(f"Test webhook failed: {response}")
             
         st.markdown("---")
         st.subheader("Recent Webhook Transactions")
         
-        if st.session_state.webhook_history:
-            # Convert history to DataFrame for easy display
-            webhook_df = pd.DataFrame(st.session_state.webhook_history).sort_values(by='timestamp', ascending=False)
+        # Delivery state comes from the outbox, shared by every session
+        stats = get_webhook_outbox_stats()
+        col_pending, col_sent, col_failed, col_rate = st.columns(4)
+        col_pending.metric("Pending", stats["counts"].get("pending", 0) + stats["counts"].get("sending", 0))
+        col_sent.metric("Delivered", stats["counts"].get("sent", 0))
+        col_failed.metric("Failed", stats["counts"].get("failed", 0))
+        col_rate.metric("Deliveries/s (1 min)", f"{stats['throughput']:.2f}")
+        
+        webhook_df = get_webhook_deliveries()
+        if not webhook_df.empty:
             st.dataframe(webhook_df, use_container_width=True)
         else:
             st.info("No webhook transactions recorded yet.")
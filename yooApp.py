@@ -1,20 +1,35 @@
 import streamlit as st
 import pandas as pd
 import requests
+from urllib.parse import urlparse
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime, timedelta
 import io
+import os
+import csv
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow.feather as feather
+import random
+import sqlite3
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 import json
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import hashlib
 import time
 import re
 
+logger = logging.getLogger(__name__)  # Failures in background threads, which cannot reach the page
+
 # Page configuration
 st.set_page_config(
     page_title="LinkedIn Outreach & Habit Tracker Pro",
@@ -126,101 +141,447 @@ LEADS_DATABASE_SHEET_ID = "1eLEFvyV1_f74UC1g5uQ-xA7A62sK8Pog27KIjw_Sk3Y"
 DAILY_TRACKER_SHEET_NAME = "daily_tracker_20251021"
 LEADS_SHEET_GID = "1881909623"  # linkedin-tracking-csv.csv sheet
 
+# Local data tier
+# Each app keeps its files in its own subdirectory: the apps share dataset names but not their schemas
+LOCAL_DATA_DIR = os.path.join(os.environ.get("LINKEDIN_TRACKER_DATA_DIR", ".data"), "yooapp")
+LOCAL_SYNC_INTERVAL = 60  # seconds between background syncs
+SHEET_CACHE_MAX_ENTRIES = 16  # parsed sheet frames kept in the shared cache
+SHEET_CACHE_TTL = 30  # seconds a frame is served without revalidating the export
+# Low-cardinality lead columns loaded as categoricals, so filters and counts compare integer codes
+LEADS_CATEGORICAL_COLUMNS = ['connection_status', 'status', 'search_term', 'search_city', 'search_country']
+# Long free-text lead columns; they are kept out of the leads frame in a SQLite store and loaded on demand
+LEADS_TEXT_COLUMNS = ['linkedin_message', 'email_message', 'personalization_points', 'follow_up_suggestions', 'summary']
+LEADS_TEXT_CHUNK_ROWS = 5000  # rows per chunk when copying text columns from an export into the store
+LEADS_TEXT_QUERY_BATCH = 500  # lead URLs per SELECT when reading texts back
+SHEETS_DOWNLOAD_CHUNK_SIZE = 1 << 20  # bytes per chunk when streaming an export to disk
+
+# Pooled HTTP session shared by every session in this process
+SHEETS_MAX_CONCURRENT_PER_HOST = 4
+
+@st.cache_resource
+def get_http_session():
+    """Process-wide HTTP session with keep-alive pooling and retry/backoff on 429/5xx"""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@st.cache_resource
+def get_host_limits():
+    """Per-host semaphores capping concurrent requests to the same host"""
+    return {"lock": threading.Lock(), "semaphores": {}}
+
+@contextmanager
+def http_get(url, timeout=10, **kwargs):
+    """GET a URL through the pooled session; the per-host slot is held until the response is closed on exit"""
+    host = urlparse(url).netloc
+    limits = get_host_limits()
+    with limits["lock"]:
+        if host not in limits["semaphores"]:
+            limits["semaphores"][host] = threading.BoundedSemaphore(SHEETS_MAX_CONCURRENT_PER_HOST)
+        semaphore = limits["semaphores"][host]
+    with semaphore, get_http_session().get(url, timeout=timeout, **kwargs) as response:
+        yield response
+
+# Change detection: parsed frames are reused while an export's content is unchanged
+@st.cache_resource
+def get_sheet_snapshots():
+    """Process-wide LRU store of parsed sheet frames keyed by sheet ID and GID/name"""
+    return {"lock": threading.Lock(), "entries": OrderedDict()}
+
+def invalidate_sheet_snapshots():
+    """Expire every cached sheet frame so the next read revalidates it against Google"""
+    snapshots = get_sheet_snapshots()
+    with snapshots["lock"]:
+        for entry in snapshots["entries"].values():
+            entry["validated_at"] = 0
+
+def get_export_path(cache_key):
+    """Local path a sheet's CSV export is downloaded under; each download goes to its own temporary file next to it"""
+    return get_local_data_path("export_" + "_".join(re.sub(r"\W+", "_", str(part)) for part in cache_key) + ".csv")
+
+def download_export(response, path):
+    """Stream a response body to `path` chunk by chunk and return its SHA-256 digest"""
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        for chunk in response.iter_content(SHEETS_DOWNLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+def read_csv_header(path):
+    """Column names from the first line of a CSV file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+def read_leads_export(path):
+    """Parse a leads export without its long text columns, which are copied into the lead text store instead"""
+    header = read_csv_header(path)
+    text_cols = [col for col in header if col.strip() in LEADS_TEXT_COLUMNS]
+    url_cols = [col for col in header if col.strip() == 'linkedin_url']
+    if text_cols and url_cols:
+        chunks = pd.read_csv(path, usecols=url_cols[:1] + text_cols, dtype=str, chunksize=LEADS_TEXT_CHUNK_ROWS)
+        store_lead_texts(chunk.rename(columns=str.strip) for chunk in chunks)
+
+    usecols = [col for col in header if col.strip() not in LEADS_TEXT_COLUMNS]
+    if not usecols:
+        return pd.DataFrame()
+    # Cells are read as strings (categoricals for the low-cardinality columns) and typed by normalize_leads_database
+    dtypes = {col: 'category' if col.strip() in LEADS_CATEGORICAL_COLUMNS else str for col in usecols}
+    return pd.read_csv(path, usecols=usecols, dtype=dtypes)
+
+def fetch_sheet_snapshot(cache_key, url, normalize=None, parse=pd.read_csv):
+    """Download a CSV export and return its frame, skipping the parse and normalize steps when unchanged.
+
+    The body is streamed to a temporary file rather than held in memory, `parse` reads the frame from it,
+    and the file is removed afterwards. The returned frame is shared across sessions and must be treated as read-only.
+    """
+    snapshots = get_sheet_snapshots()
+    with snapshots["lock"]:
+        entry = snapshots["entries"].get(cache_key)
+        if entry is not None:
+            snapshots["entries"].move_to_end(cache_key)
+
+    # Within the TTL every session shares the cached frame without touching the network
+    if entry is not None and entry["url"] == url and time.time() - entry["validated_at"] < SHEET_CACHE_TTL:
+        return entry["df"]
+
+    headers = {}
+    if entry is not None and entry["url"] == url and entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+
+    download_path = f"{get_export_path(cache_key)}.{threading.get_ident()}.tmp"
+    try:
+        with http_get(url, timeout=10, headers=headers, stream=True) as response:
+            if response.status_code == 304 and entry is not None:
+                entry["validated_at"] = time.time()
+                return entry["df"]
+            if response.status_code != 200:
+                return None
+            digest = download_export(response, download_path)
+
+        if entry is not None and entry["digest"] == digest:
+            entry["validated_at"] = time.time()
+            return entry["df"]
+        df = parse(download_path)
+    finally:
+        if os.path.exists(download_path):
+            os.remove(download_path)
+    if normalize is not None:
+        df = normalize(df)
+
+    with snapshots["lock"]:
+        snapshots["entries"][cache_key] = {
+            "url": url,
+            "digest": digest,
+            "etag": response.headers.get("ETag"),
+            "df": df,
+            "validated_at": time.time()
+        }
+        snapshots["entries"].move_to_end(cache_key)
+        while len(snapshots["entries"]) > SHEET_CACHE_MAX_ENTRIES:
+            snapshots["entries"].popitem(last=False)
+    return df
+
 # Function to get sheet data by GID
-def get_sheet_by_gid(sheet_id, gid):
+def get_sheet_by_gid(sheet_id, gid, normalize=None, parse=pd.read_csv):
     """Get Google Sheet data using GID"""
     try:
         url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            df = pd.read_csv(io.StringIO(response.text))
-            return df
+        return fetch_sheet_snapshot((sheet_id, gid), url, normalize, parse)
     except Exception as e:
         st.error(f"Error loading sheet with GID {gid}: {str(e)}")
     return None
 
 # Function to get sheet data by name
-def get_sheet_by_name(sheet_id, sheet_name):
+def get_sheet_by_name(sheet_id, sheet_name, normalize=None):
+    urls = [
+        f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}",
+        f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+    ]
+    for url in urls:
+        try:
+            df = fetch_sheet_snapshot((sheet_id, sheet_name), url, normalize)
+            if df is not None:
+                return df
+        except:
+            pass
+    return None
+
+def normalize_daily_tracker(df):
+    """Clean column names and coerce the daily tracker's numeric columns"""
+    df.columns = df.columns.str.strip()
+    numeric_cols = ['Connections_Sent', 'Connections_Accepted', 'Initial_Messages_Sent',
+                  'Interested_Responses', 'Links_Sent', 'Follow_Up_1', 'Follow_Up_2',
+                  'Follow_Up_3', 'Follow_Up_4', 'Conversions']
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    return df
+
+# Local columnar data tier: the app reads Feather files that a background thread keeps in sync with Sheets
+def get_local_data_path(filename):
+    """Path inside the local data directory, created on first use"""
+    os.makedirs(LOCAL_DATA_DIR, exist_ok=True)
+    return os.path.join(LOCAL_DATA_DIR, filename)
+
+@st.cache_resource
+def get_local_dataset_cache():
+    """Process-wide cache of local datasets keyed by name and file mtime"""
+    return {"lock": threading.Lock(), "entries": {}}
+
+def load_local_dataset(name):
+    """Memory-map a dataset from the local tier; the returned frame is shared and read-only"""
+    path = get_local_data_path(f"{name}.feather")
     try:
-        url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            return pd.read_csv(io.StringIO(response.text))
-    except:
-        pass
+        version = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    cache = get_local_dataset_cache()
+    with cache["lock"]:
+        entry = cache["entries"].get(name)
+    if entry is not None and entry["version"] == version:
+        return entry["df"]
+
     try:
-        url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            return pd.read_csv(io.StringIO(response.text))
-    except:
-        pass
-    return None
+        df = feather.read_table(path, memory_map=True).to_pandas()
+    except Exception:
+        return None
+
+    with cache["lock"]:
+        cache["entries"][name] = {"version": version, "df": df}
+    return df
+
+def save_local_dataset(name, df):
+    """Atomically write a dataset to the local tier, returning False if it cannot be stored"""
+    path = get_local_data_path(f"{name}.feather")
+    try:
+        feather.write_feather(df.reset_index(drop=True), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        return True
+    except Exception:
+        return False
+
+@st.cache_resource
+def get_local_sync_state():
+    """Process-wide record of the sheet snapshot last written to each local dataset"""
+    return {}
 
 # Load daily tracker data
-@st.cache_data(ttl=60)
 def load_daily_tracker():
+    """Read the daily tracker from the local data tier, seeding it from the sheet on first use"""
     try:
-        df = get_sheet_by_name(DAILY_TRACKER_SHEET_ID, DAILY_TRACKER_SHEET_NAME)
+        # Saved progress lives apart from the sheet mirror so the background sync never overwrites it
+        df = load_local_dataset("daily_tracker_edits")
+        if df is None:
+            df = load_local_dataset("daily_tracker")
+        if df is None:
+            df = get_sheet_by_name(DAILY_TRACKER_SHEET_ID, DAILY_TRACKER_SHEET_NAME, normalize=normalize_daily_tracker)
+            if df is not None and not df.empty:
+                save_local_dataset("daily_tracker", df)
         if df is not None and not df.empty:
-            df.columns = df.columns.str.strip()
-            numeric_cols = ['Connections_Sent', 'Connections_Accepted', 'Initial_Messages_Sent',
-                          'Interested_Responses', 'Links_Sent', 'Follow_Up_1', 'Follow_Up_2',
-                          'Follow_Up_3', 'Follow_Up_4', 'Conversions']
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-            return df
+            return df.copy()
         return create_empty_daily_tracker()
     except:
         return create_empty_daily_tracker()
 
+def normalize_leads_database(df):
+    """Keep the expected linkedin-tracking-csv.csv columns and parse their types"""
+    df.columns = df.columns.str.strip()
+
+    expected_columns = [
+        'timestamp', 'name', 'profile_name', 'profile_location', 'profile_tagline',
+        'linkedin_url', 'linkedin_subject', 'linkedin_message',
+        'email_subject', 'email_message', 'outreach_strategy',
+        'personalization_points', 'follow_up_suggestions', 'connection_status',
+        'browserflow_session', 'success', 'credits_used', 'error_message',
+        'status', 'search_term', 'search_city', 'search_country',
+        'image_url', 'tagline', 'location', 'summary'
+    ]
+
+    available_columns = [col for col in expected_columns if col in df.columns]
+
+    if available_columns:
+        df = df[available_columns].copy()
+
+    if 'name' not in df.columns and 'profile_name' in df.columns:
+        df['name'] = df['profile_name']
+    elif 'profile_name' not in df.columns and 'name' in df.columns:
+        df['profile_name'] = df['name']
+
+    if 'success' in df.columns:
+        df['success'] = df['success'].astype(str).str.lower().isin(['true', 'yes', '1', 't'])
+
+    if 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+
+    if 'credits_used' in df.columns:
+        df['credits_used'] = pd.to_numeric(df['credits_used'], errors='coerce').fillna(0)
+
+    return apply_leads_schema(df)
+
+def apply_leads_schema(df):
+    """Store the low-cardinality lead columns as categoricals; returns df unchanged when they already are"""
+    columns = [col for col in LEADS_CATEGORICAL_COLUMNS
+               if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)]
+    if not columns:
+        return df
+
+    df = df.copy(deep=False)
+    for col in columns:
+        df[col] = df[col].astype('category')
+    return df
+
+# Lead text store: long text columns in SQLite, keyed by the lead's linkedin_url so that frames from older
+# exports, re-sorted sheets and uploads all find their own texts
+def connect_lead_text_store():
+    """Connection to the on-disk lead text store, creating its table on first use"""
+    conn = sqlite3.connect(get_local_data_path("lead_texts.sqlite3"), timeout=30, isolation_level=None,
+                           check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    existing = [row[1] for row in conn.execute("PRAGMA table_info(lead_texts)")]
+    if existing and 'linkedin_url' not in existing:
+        conn.execute("DROP TABLE lead_texts")  # keyed by export row position; refilled by the next export
+    columns = ", ".join(f"{col} TEXT" for col in LEADS_TEXT_COLUMNS)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS lead_texts (linkedin_url TEXT PRIMARY KEY, {columns})")
+    return conn
+
+@st.cache_resource
+def get_lead_text_store():
+    """Process-wide connection to the lead text store and the lock serializing its use"""
+    return {"lock": threading.Lock(), "conn": connect_lead_text_store()}
+
+def store_lead_texts(chunks):
+    """Upsert the texts of the given frames (linkedin_url plus text columns); leads without a URL are skipped"""
+    columns = ['linkedin_url'] + LEADS_TEXT_COLUMNS
+    updates = ", ".join(f"{col} = excluded.{col}" for col in LEADS_TEXT_COLUMNS)
+    upsert = (f"INSERT INTO lead_texts ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+              f"ON CONFLICT (linkedin_url) DO UPDATE SET {updates}")
+    store = get_lead_text_store()
+    with store["lock"]:
+        conn = store["conn"]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for chunk in chunks:
+                chunk = chunk.reindex(columns=columns).astype(object)
+                chunk = chunk[chunk['linkedin_url'].notna() & (chunk['linkedin_url'] != '')]
+                conn.executemany(upsert, chunk.where(chunk.notna(), None).itertuples(index=False, name=None))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+def get_lead_texts(df, columns=LEADS_TEXT_COLUMNS):
+    """Requested text columns for the leads of a frame, looked up by linkedin_url and aligned to its index"""
+    if 'linkedin_url' not in df.columns:
+        return pd.DataFrame(index=df.index, columns=list(columns), dtype=object)
+    urls = df['linkedin_url'].astype(object).where(df['linkedin_url'].notna(), None).tolist()
+    wanted = list(dict.fromkeys(url for url in urls if url))
+    store = get_lead_text_store()
+    rows = []
+    with store["lock"]:
+        for start in range(0, len(wanted), LEADS_TEXT_QUERY_BATCH):
+            batch = wanted[start:start + LEADS_TEXT_QUERY_BATCH]
+            rows += store["conn"].execute(
+                f"SELECT linkedin_url, {', '.join(columns)} FROM lead_texts WHERE linkedin_url IN ({', '.join('?' * len(batch))})",
+                batch
+            ).fetchall()
+    texts = pd.DataFrame.from_records(rows, columns=['linkedin_url'] + list(columns), index='linkedin_url')
+    return texts.reindex(urls).set_axis(df.index)
+
+def with_lead_texts(df):
+    """Leads frame with its text columns joined back from the lead text store, for exports and detail tables"""
+    missing = [col for col in LEADS_TEXT_COLUMNS if col not in df.columns]
+    if not missing or df.empty:
+        return df
+    return df.join(get_lead_texts(df, missing))
+
+def split_lead_texts(df):
+    """Move the text columns of a leads frame (an older local file or an upload) into the store"""
+    text_cols = [col for col in LEADS_TEXT_COLUMNS if col in df.columns]
+    if not text_cols:
+        return df
+    if 'linkedin_url' in df.columns:
+        store_lead_texts([df[['linkedin_url'] + text_cols]])
+    return df.drop(columns=text_cols)
+
 # Load leads database
-@st.cache_data(ttl=60)
 def load_leads_database():
-    """Load leads database from linkedin-tracking-csv.csv sheet (GID: 1881909623)"""
+    """Load leads database from the local data tier, seeding it from linkedin-tracking-csv.csv (GID: 1881909623) on first use"""
     try:
-        df = get_sheet_by_gid(LEADS_DATABASE_SHEET_ID, LEADS_SHEET_GID)
+        df = load_local_dataset("leads_database")
+        if df is None:
+            df = get_sheet_by_gid(LEADS_DATABASE_SHEET_ID, LEADS_SHEET_GID, normalize=normalize_leads_database,
+                                  parse=read_leads_export)
+            if df is not None and not df.empty:
+                save_local_dataset("leads_database", df)
+        else:
+            # Files written before the categorical schema or the lead text store are converted once
+            schema_df = apply_leads_schema(split_lead_texts(df))
+            if schema_df is not df:
+                df = schema_df
+                save_local_dataset("leads_database", df)
 
         if df is not None and not df.empty:
-            df.columns = df.columns.str.strip()
-
-            expected_columns = [
-                'timestamp', 'name', 'profile_name', 'profile_location', 'profile_tagline',
-                'linkedin_url', 'linkedin_subject', 'linkedin_message',
-                'email_subject', 'email_message', 'outreach_strategy',
-                'personalization_points', 'follow_up_suggestions', 'connection_status',
-                'browserflow_session', 'success', 'credits_used', 'error_message',
-                'status', 'search_term', 'search_city', 'search_country',
-                'image_url', 'tagline', 'location', 'summary'
-            ]
-
-            available_columns = [col for col in expected_columns if col in df.columns]
-
-            if available_columns:
-                df = df[available_columns]
-
-            if 'name' not in df.columns and 'profile_name' in df.columns:
-                df['name'] = df['profile_name']
-            elif 'profile_name' not in df.columns and 'name' in df.columns:
-                df['profile_name'] = df['name']
-
-            if 'success' in df.columns:
-                df['success'] = df['success'].astype(str).str.lower().isin(['true', 'yes', '1', 't'])
-
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-
-            if 'credits_used' in df.columns:
-                df['credits_used'] = pd.to_numeric(df['credits_used'], errors='coerce').fillna(0)
-
-            return df
+            return df  # shared read-only frame
 
         return create_empty_leads_database()
     except Exception as e:
         st.sidebar.error(f"Error loading leads from linkedin-tracking-csv.csv: {str(e)}")
         return create_empty_leads_database()
 
+# Pull all sheets at the same time
+def load_all_sheets():
+    """Fetch the daily tracker and leads database concurrently and write changed sheets to the local data tier"""
+    # Worker threads need the script context to use st.* inside the loaders (absent in the background sync)
+    ctx = get_script_run_ctx(suppress_warning=True)
+
+    def run_with_context(fetch):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        daily_future = executor.submit(run_with_context, lambda: get_sheet_by_name(
+            DAILY_TRACKER_SHEET_ID, DAILY_TRACKER_SHEET_NAME, normalize=normalize_daily_tracker))
+        leads_future = executor.submit(run_with_context, lambda: get_sheet_by_gid(
+            LEADS_DATABASE_SHEET_ID, LEADS_SHEET_GID, normalize=normalize_leads_database, parse=read_leads_export))
+        daily_data, leads_data = daily_future.result(), leads_future.result()
+
+    # Snapshot frames stay identical while a sheet is unchanged, so only changed sheets are rewritten
+    written = get_local_sync_state()
+    for name, df in (("daily_tracker", daily_data), ("leads_database", leads_data)):
+        if df is not None and not df.empty and written.get(name) is not df and save_local_dataset(name, df):
+            written[name] = df
+    return daily_data, leads_data
+
+# Background sync keeps the local data tier reconciled with Sheets
+@st.cache_resource
+def start_local_sync():
+    """Start the process-wide thread that re-pulls both sheets into the local data tier"""
+    def sync_forever():
+        while True:
+            try:
+                load_all_sheets()
+            except Exception:
+                logger.warning("Local data sync failed", exc_info=True)
+            time.sleep(LOCAL_SYNC_INTERVAL)
+
+    thread = threading.Thread(target=sync_forever, name="local-data-sync", daemon=True)
+    thread.start()
+    return thread
+
 # Create empty dataframes
 def create_empty_daily_tracker():
     start_date = datetime.now()
@@ -304,6 +665,69 @@ def create_empty_habit_log():
         'Notes': [''] * 30
     })
 
+# Compact habit log: one row of bits per habit (bit d = day offset d from the start date) plus sparse notes
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def pack_habit_log(habit_log):
+    """Bit-packed habits x days matrix with an integer day-offset index from a habit log frame"""
+    habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes']]
+    dates = pd.to_datetime(habit_log['Date'], errors='coerce')
+    valid = dates.notna().to_numpy()
+    start = dates[valid].min() if valid.any() else pd.Timestamp(datetime.now().date())
+    offsets = (dates[valid] - start).dt.days.to_numpy()
+    n_days = int(offsets.max()) + 1 if len(offsets) else 0
+
+    done = np.zeros((len(habit_columns), n_days), dtype=bool)
+    if habit_columns:
+        done[:, offsets] = habit_log.loc[valid, habit_columns].fillna(False).to_numpy(dtype=bool).T
+    notes = {}
+    if 'Notes' in habit_log.columns:
+        notes = {int(offset): note for offset, note in zip(offsets, habit_log.loc[valid, 'Notes'])
+                 if isinstance(note, str) and note}
+
+    return {
+        "start": start.strftime("%Y-%m-%d"),
+        "n_days": n_days,
+        "habits": habit_columns,
+        "bits": np.packbits(done, axis=1, bitorder='little'),
+        "notes": notes
+    }
+
+def unpack_habit_matrix(habit_bits):
+    """Habits x days boolean matrix of a packed habit log"""
+    return np.unpackbits(habit_bits["bits"], axis=1, count=habit_bits["n_days"], bitorder='little').astype(bool)
+
+def unpack_habit_log(habit_bits):
+    """Habit log frame (Date, one bool column per habit, Notes) for display and charting"""
+    n_days = habit_bits["n_days"]
+    done = unpack_habit_matrix(habit_bits)
+    habit_log = pd.DataFrame(done.T, columns=habit_bits["habits"], copy=False)
+    habit_log.insert(0, 'Date', pd.date_range(habit_bits["start"], periods=n_days, freq='D').strftime("%Y-%m-%d"))
+    habit_log['Notes'] = [habit_bits["notes"].get(offset, '') for offset in range(n_days)]
+    return habit_log
+
+def set_habit_bit(habit_bits, day_offset, habit, value):
+    """Set or clear one habit on one day in place"""
+    row = habit_bits["habits"].index(habit)
+    mask = np.uint8(1 << (day_offset & 7))
+    if value:
+        habit_bits["bits"][row, day_offset >> 3] |= mask
+    else:
+        habit_bits["bits"][row, day_offset >> 3] &= ~mask
+
+def set_habit_note(habit_bits, day_offset, note):
+    """Store the reflection note of one day"""
+    if note:
+        habit_bits["notes"][day_offset] = note
+    else:
+        habit_bits["notes"].pop(day_offset, None)
+
+def count_habit_completions(habit_bits):
+    """Completed days per habit, by popcount of the packed rows"""
+    return POPCOUNT_TABLE[habit_bits["bits"]].sum(axis=1, dtype=np.int64)
+
+start_local_sync()
+
 # Initialize session state
 if 'daily_tracker' not in st.session_state:
     st.session_state.daily_tracker = load_daily_tracker()
@@ -314,8 +738,12 @@ if 'leads_database' not in st.session_state:
 if 'habits' not in st.session_state:
     st.session_state.habits = create_empty_habits()
 
-if 'habit_log' not in st.session_state:
-    st.session_state.habit_log = create_empty_habit_log()
+if 'habit_bits' not in st.session_state:
+    local_habit_log = load_local_dataset("habit_log")
+    st.session_state.habit_bits = pack_habit_log(local_habit_log if local_habit_log is not None else create_empty_habit_log())
+
+if 'habit_log_version' not in st.session_state:
+    st.session_state.habit_log_version = 0  # bumped on every habit_bits edit; keys the habit stats cache
 
 if 'challenge_start_date' not in st.session_state:
     st.session_state.challenge_start_date = datetime.now().strftime("%Y-%m-%d")
@@ -388,8 +816,16 @@ if 'refresh_interval' not in st.session_state:
     st.session_state.refresh_interval = 60
 
 # CRM Configuration
-WEBHOOK_URL = "https://agentonline-u29564.vm.elestio.app/webhook/Leadlinked"
+WEBHOOK_URL = os.environ.get("LINKEDIN_TRACKER_WEBHOOK_URL", "https://agentonline-u29564.vm.elestio.app/webhook/Leadlinked")
+WEBHOOK_WORKERS = 4  # threads delivering webhooks from the outbox
+WEBHOOK_BATCH_SIZE = 1  # payloads per POST; above 1 they are sent together as {"batch": [...]}
+WEBHOOK_MAX_ATTEMPTS = 8  # deliveries are marked failed after this many attempts
+WEBHOOK_BACKOFF_BASE = 2  # seconds before the first retry, doubled on every further attempt
+WEBHOOK_BACKOFF_MAX = 300  # upper bound on the retry delay
+WEBHOOK_LEASE_SECONDS = 120  # a claimed delivery not finished within this time is taken over by another worker or process
 MY_PROFILE = {"name": "Donmenico Hudson", "url": "https://www.linkedin.com/in/donmenicohudson/"}
+HTML_FRAGMENT_CACHE_SIZE = 20000  # rendered cards kept in memory
+FIGURE_CACHE_SIZE = 64  # built Plotly figures kept in memory
 
 # CRM helper functions
 @st.cache_resource
@@ -411,6 +847,137 @@ def is_me(sender_name, sender_url, my_profile):
     return (my_profile["name"].lower() in sender_name.lower() or
             (sender_url and my_profile["url"].lower() in str(sender_url).lower()))
 
+def classify_my_messages(chat_df, my_profile):
+    """Vectorized is_me over a chat frame: case-insensitive name or URL substring match"""
+    if 'sender_name' not in chat_df.columns:
+        return pd.Series(False, index=chat_df.index)
+
+    # Only string sender names can match, as in is_me; Arrow strings keep the scans in C
+    names = chat_df['sender_name']
+    if names.dtype == object:
+        names = names.where(names.map(type).eq(str))
+    names = names.astype('string[pyarrow]').str.lower()
+    mine = names.str.contains(my_profile["name"].lower(), regex=False)
+
+    if 'sender_url' in chat_df.columns:
+        urls = chat_df['sender_url'].astype('string[pyarrow]').str.lower()
+        mine |= names.str.len().gt(0) & urls.str.contains(my_profile["url"].lower(), regex=False)
+
+    return mine.fillna(False).astype(bool)
+
+def ensure_is_me_column(chat_df):
+    """Add the cached is_me column to a chat snapshot once; later metrics and views reuse it"""
+    if 'is_me' not in chat_df.columns:
+        chat_df['is_me'] = classify_my_messages(chat_df, MY_PROFILE)
+    return chat_df['is_me']
+
+# HTML rendering: templates are built once, rows are formatted from column lists and joined once
+CONVERSATION_CARD_TEMPLATE = """
+            <div style='background: rgba(255, 255, 255, 0.98); padding: 2rem; border-radius: 20px;
+                        margin: 1rem 0; box-shadow: 0 4px 12px rgba(0,0,0,0.1);'>
+                <div style='display: flex; justify-content: space-between; align-items: start; margin-bottom: 1rem;'>
+                    <div>
+                        <h3 style='color: #667eea; margin: 0;'>{profile_name}</h3>
+                        <p style='color: #666; margin: 0.5rem 0;'>{tagline}</p>
+                    </div>
+                    <span style='background: #667eea; color: white; padding: 0.5rem 1rem;
+                                border-radius: 20px; font-size: 0.9rem;'>{status}</span>
+                </div>
+                <div style='background: #f8f9fa; padding: 1.5rem; border-radius: 15px;
+                            border-left: 4px solid #667eea; margin: 1rem 0;'>
+                    <p style='color: #2d3748; margin: 0; line-height: 1.6;'>{message}</p>
+                </div>
+                <div style='display: flex; justify-content: space-between; align-items: center; margin-top: 1rem;'>
+                    <span style='color: #999; font-size: 0.9rem;'>📅 {timestamp}</span>
+                    <a href="{linkedin_url}" target="_blank"
+                       style='background: #667eea; color: white; padding: 0.5rem 1.5rem;
+                              border-radius: 15px; text-decoration: none;'>View Profile</a>
+                </div>
+            </div>
+            """
+
+@st.cache_resource
+def get_fragment_cache():
+    """Process-wide LRU cache of rendered HTML fragments keyed by row content"""
+    return {"lock": threading.Lock(), "entries": OrderedDict()}
+
+def render_fragments(kind, render_row, rows):
+    """Render each row tuple with render_row, reusing cached fragments, and join them once"""
+    cache = get_fragment_cache()
+    fragments = []
+    with cache["lock"]:
+        entries = cache["entries"]
+        for row in rows:
+            key = (kind, row)
+            html = entries.get(key)
+            if html is None:
+                html = entries[key] = render_row(*row)
+            else:
+                entries.move_to_end(key)
+            fragments.append(html)
+        while len(entries) > HTML_FRAGMENT_CACHE_SIZE:
+            entries.popitem(last=False)
+    return "".join(fragments)
+
+def column_values(df, column, default=""):
+    """Column as a list, or default for every row when the column is missing"""
+    if column in df.columns:
+        return df[column].tolist()
+    return [default] * len(df)
+
+def render_lead_text_details(df, key):
+    """Lead picker showing the selected lead's messages and summary, loaded from the lead text store"""
+    names = column_values(df, 'name') if 'name' in df.columns else column_values(df, 'profile_name', 'Unknown')
+    labels = dict(zip(df.index.tolist(), names))
+    lead_id = st.selectbox("Open Lead", list(labels), index=None, format_func=labels.get,
+                           placeholder="Select a lead", key=key)
+    if lead_id is None:
+        return
+
+    lead = with_lead_texts(df.loc[[lead_id]]).iloc[0]
+    for col in LEADS_TEXT_COLUMNS:
+        if pd.notna(lead.get(col)) and str(lead[col]).strip():
+            st.markdown(f"**{col.replace('_', ' ').title()}:**")
+            st.text(lead[col])
+
+def render_conversation_card(profile_name, tagline, status, message, timestamp, linkedin_url):
+    """Render one lead conversation card"""
+    return CONVERSATION_CARD_TEMPLATE.format(
+        profile_name=profile_name, tagline=tagline, status=status,
+        message=message, timestamp=timestamp, linkedin_url=linkedin_url
+    )
+
+# Figure cache: Plotly figures are built once per (chart kind, data version, options) and shared across sessions
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide LRU cache of built Plotly figures"""
+    return {"lock": threading.Lock(), "entries": OrderedDict()}
+
+def frame_version(*frames):
+    """Content digest of DataFrames, used as the data version of charts drawn from them"""
+    digest = hashlib.sha1()
+    for df in frames:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        digest.update("|".join(map(str, df.columns)).encode())
+    return digest.hexdigest()
+
+def get_cached_figure(kind, version, build, **options):
+    """Figure from build(**options), constructed only when no figure exists for this kind, version and options"""
+    cache = get_figure_cache()
+    key = (kind, version, tuple(sorted(options.items())))
+    with cache["lock"]:
+        figure = cache["entries"].get(key)
+        if figure is not None:
+            cache["entries"].move_to_end(key)
+            return figure
+
+    figure = build(**options)
+    with cache["lock"]:
+        cache["entries"][key] = figure
+        while len(cache["entries"]) > FIGURE_CACHE_SIZE:
+            cache["entries"].popitem(last=False)
+    return figure
+
 def get_initials(name):
     """Get initials from a name"""
     if not name:
@@ -418,10 +985,163 @@ def get_initials(name):
     parts = name.split()
     return f"{parts[0][0]}{parts[1][0]}".upper() if len(parts) >= 2 else name[0].upper()
 
+# Webhook outbox: requests are stored in SQLite and delivered by a background worker pool
+def payload_hash(payload):
+    """SHA-256 of a payload's JSON, used as its idempotency key"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def connect_webhook_outbox():
+    """Connection to the on-disk webhook outbox, creating its table on first use"""
+    conn = sqlite3.connect(get_local_data_path("webhook_outbox.sqlite3"), timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL keeps commits atomic without an fsync per delivery
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT NOT NULL,
+            url TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            created_at REAL NOT NULL,
+            sent_at REAL,
+            response_status INTEGER,
+            response_text TEXT,
+            claimed_at REAL
+        )
+    """)
+    if "claimed_at" not in [column[1] for column in conn.execute("PRAGMA table_info(outbox)")]:
+        conn.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL")  # outboxes created before leases
+    conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS outbox_key ON outbox (idempotency_key)")
+    return conn
+
+@st.cache_resource
+def get_webhook_dispatcher():
+    """Process-wide enqueue connection and the event that wakes the delivery workers"""
+    return {"lock": threading.Lock(), "conn": connect_webhook_outbox(), "wake": threading.Event()}
+
+def enqueue_webhook(payload, url=None):
+    """Store a payload in the outbox for background delivery and return its idempotency key"""
+    start_webhook_workers()
+    dispatcher = get_webhook_dispatcher()
+    key = payload_hash(payload)
+    now = time.time()
+    with dispatcher["lock"]:
+        # A payload identical to one still waiting for delivery is not queued twice
+        dispatcher["conn"].execute(
+            """INSERT INTO outbox (idempotency_key, url, payload, next_attempt_at, created_at)
+               SELECT ?, ?, ?, ?, ? WHERE NOT EXISTS (
+                   SELECT 1 FROM outbox WHERE idempotency_key = ? AND status IN ('pending', 'sending'))""",
+            (key, url or WEBHOOK_URL, json.dumps(payload, default=str), now, now, key)
+        )
+    dispatcher["wake"].set()
+    return key
+
+def claim_webhook_batch(conn):
+    """Mark up to WEBHOOK_BATCH_SIZE due deliveries for one URL as sending and return them"""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Deliveries whose lease ran out belong to a worker that stopped, in this process or another one
+        rows = conn.execute(
+            """SELECT id, idempotency_key, url, payload, attempts FROM outbox
+               WHERE (status = 'pending' AND next_attempt_at <= ?)
+                  OR (status = 'sending' AND COALESCE(claimed_at, 0) <= ?)
+               ORDER BY id LIMIT ?""",
+            (now, now - WEBHOOK_LEASE_SECONDS, WEBHOOK_BATCH_SIZE)
+        ).fetchall()
+        rows = [row for row in rows if row[2] == rows[0][2]]  # a POST goes to a single URL
+        conn.executemany("UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ?", [(now, row[0]) for row in rows])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return rows
+
+def deliver_webhook_batch(conn, rows):
+    """POST claimed deliveries and record the outcome, retrying with exponential backoff and jitter"""
+    payloads = [json.loads(row[3]) for row in rows]
+    if len(rows) == 1:
+        body, key = payloads[0], rows[0][1]
+    else:
+        body, key = {"batch": payloads}, payload_hash([row[1] for row in rows])
+
+    try:
+        response = get_http_session().post(rows[0][2], json=body, headers={"Idempotency-Key": key}, timeout=10)
+        response.raise_for_status()
+        conn.executemany(
+            "UPDATE outbox SET status = 'sent', attempts = attempts + 1, sent_at = ?, response_status = ?, response_text = ? WHERE id = ?",
+            [(time.time(), response.status_code, response.text[:100], row[0]) for row in rows]
+        )
+    except requests.exceptions.RequestException as e:
+        status_code = getattr(e.response, 'status_code', None)
+        # Client errors other than timeouts and rate limits will not succeed on retry
+        permanent = status_code is not None and 400 <= status_code < 500 and status_code not in (408, 429)
+        schedule_webhook_retries(conn, rows, str(e), status_code, permanent)
+
+def schedule_webhook_retries(conn, rows, error, status_code=None, permanent=False):
+    """Return claimed deliveries to pending with exponential backoff and jitter, or mark them failed for good"""
+    updates = []
+    for row in rows:
+        attempts = row[4] + 1
+        delay = min(WEBHOOK_BACKOFF_MAX, WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.5, 1.5)
+        status = "failed" if permanent or attempts >= WEBHOOK_MAX_ATTEMPTS else "pending"
+        updates.append((status, attempts, time.time() + delay, status_code, error[:100], row[0]))
+    conn.executemany(
+        "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, response_status = ?, response_text = ? WHERE id = ?",
+        updates
+    )
+
+@st.cache_resource
+def start_webhook_workers():
+    """Start the process-wide pool of threads delivering webhooks from the outbox"""
+    dispatcher = get_webhook_dispatcher()
+
+    def deliver_forever():
+        conn = connect_webhook_outbox()
+        while True:
+            rows = []
+            try:
+                rows = claim_webhook_batch(conn)
+                if rows:
+                    deliver_webhook_batch(conn, rows)
+                    continue
+            except Exception as e:
+                logger.warning("Webhook worker failed on %d outbox deliveries: %s", len(rows), e, exc_info=True)
+                # Unexpected errors count as an attempt, so a delivery that always fails is eventually given up
+                try:
+                    schedule_webhook_retries(conn, rows, str(e) or type(e).__name__)
+                except Exception:
+                    logger.warning("Could not release claimed outbox deliveries; their lease will expire", exc_info=True)
+            dispatcher["wake"].wait(timeout=1)
+            dispatcher["wake"].clear()
+
+    threads = [threading.Thread(target=deliver_forever, name=f"webhook-worker-{i}", daemon=True) for i in range(WEBHOOK_WORKERS)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def get_webhook_outbox_stats(window=60):
+    """Outbox counts per status and deliveries per second over the last `window` seconds"""
+    dispatcher = get_webhook_dispatcher()
+    with dispatcher["lock"]:
+        counts = dict(dispatcher["conn"].execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        recent = dispatcher["conn"].execute(
+            "SELECT COUNT(*) FROM outbox WHERE status = 'sent' AND sent_at >= ?", (time.time() - window,)
+        ).fetchone()[0]
+    return {"counts": counts, "throughput": recent / window}
+
 def send_webhook_request(webhook_url, payload):
-    """Send data to webhook endpoint"""
+    """Queue data for the webhook endpoint; delivery happens in the background"""
+    key = enqueue_webhook(payload, webhook_url)
+    return True, f"Queued for delivery ({key[:8]})"
+
+def test_webhook_request(webhook_url, payload):
+    """POST data to the webhook endpoint and wait for its answer; connection tests bypass the outbox"""
     try:
-        response = requests.post(webhook_url, json=payload, timeout=10)
+        response = get_http_session().post(webhook_url, json=payload, timeout=10)
         return response.status_code == 200, response.text
     except Exception as e:
         return False, str(e)
@@ -468,10 +1188,8 @@ def calculate_metrics(chat_df, outreach_df):
     }
 
     if not chat_df.empty:
-        is_my_message = chat_df.apply(
-            lambda row: is_me(row.get('sender_name'), row.get('sender_url'), MY_PROFILE), axis=1
-        ).astype(bool)
-        metrics['messages_sent'] = len(chat_df[is_my_message])
+        is_my_message = ensure_is_me_column(chat_df)
+        metrics['messages_sent'] = int(is_my_message.sum())
         metrics['messages_received'] = len(chat_df) - metrics['messages_sent']
 
         if metrics['messages_sent'] > 0:
@@ -495,27 +1213,98 @@ def get_current_day():
     days_elapsed = (datetime.now() - datetime.strptime(st.session_state.challenge_start_date, "%Y-%m-%d")).days + 1
     return min(max(days_elapsed, 1), 30)
 
-def calculate_streak(habit_log, habit_name):
-    """Calculate current streak for a habit"""
-    if habit_name not in habit_log.columns:
-        return 0
+def calculate_habit_stats(habit_bits):
+    """Current streak, longest streak, success rate and completions for every habit in one pass
+
+    Runs of completed days are found from the diffs of the zero-padded habits x days matrix:
+    +1 marks the first day of a run and -1 the day after its last.
+    """
+    habit_columns = habit_bits["habits"]
+    n_habits, n_days = len(habit_columns), habit_bits["n_days"]
+    padded = np.zeros((n_habits, n_days + 2), dtype=np.int8)
+    padded[:, 1:-1] = unpack_habit_matrix(habit_bits)
+    edges = np.diff(padded, axis=1)
+    run_habits, run_starts = np.nonzero(edges == 1)
+    _, run_ends = np.nonzero(edges == -1)
+    run_lengths = run_ends - run_starts
+
+    longest = np.zeros(n_habits, dtype=np.int64)
+    np.maximum.at(longest, run_habits, run_lengths)
+    current = np.zeros(n_habits, dtype=np.int64)
+    ongoing = run_ends == n_days
+    current[run_habits[ongoing]] = run_lengths[ongoing]
+    completions = count_habit_completions(habit_bits)
 
-    streak = 0
-    for i in range(len(habit_log) - 1, -1, -1):
-        if habit_log.iloc[i][habit_name]:
-            streak += 1
-        else:
-            break
-    return streak
+    return pd.DataFrame({
+        'Current Streak': current,
+        'Longest Streak': longest,
+        'Total Completions': completions,
+        'Success Rate': completions / n_days * 100 if n_days > 0 else np.zeros(n_habits)
+    }, index=pd.Index(habit_columns, name='Habit'))
+
+def get_habit_stats(habit_bits):
+    """Habit stats frame for the session's habit log, recomputed only when the log changes"""
+    key = (st.session_state.habit_log_version, id(habit_bits))
+    cached = st.session_state.get('habit_stats_cache')
+    if cached is None or cached[0] != key:
+        cached = (key, calculate_habit_stats(habit_bits))
+        st.session_state.habit_stats_cache = cached
+    return cached[1]
+
+# Aggregate cube: daily, cumulative, weekly and challenge rollups of the tracker metrics, built once per data version
+TRACKER_METRICS = ['Connections_Sent', 'Connections_Accepted', 'Initial_Messages_Sent',
+                   'Interested_Responses', 'Links_Sent', 'Conversions']
+
+def calculate_tracker_rates(totals):
+    """Funnel conversion rates in percent from the challenge totals"""
+    def rate(numerator, denominator):
+        return totals[numerator] / totals[denominator] * 100 if totals[denominator] > 0 else 0
+    return {
+        'acceptance': rate('Connections_Accepted', 'Connections_Sent'),
+        'message': rate('Initial_Messages_Sent', 'Connections_Accepted'),
+        'interest': rate('Interested_Responses', 'Initial_Messages_Sent'),
+        'conversion': rate('Conversions', 'Interested_Responses'),
+    }
 
-def calculate_success_rate(habit_log, habit_name):
-    """Calculate success rate for a habit"""
-    if habit_name not in habit_log.columns:
-        return 0.0
+def build_tracker_cube(df):
+    """Materialize all tracker rollups in one pass over the daily tracker"""
+    metrics = [col for col in TRACKER_METRICS if col in df.columns]
+    daily = df[metrics].copy()
+    weeks = ((df['Day'] - 1) // 7) + 1 if 'Day' in df.columns else None
+    weekly = daily.groupby(weeks).sum() if weeks is not None else daily.iloc[:0].copy()
+    weekly.index.name = 'Week'
+    totals = daily.sum().reindex(TRACKER_METRICS, fill_value=0)
+    return {
+        "daily": daily,
+        "cumulative": daily.cumsum(),
+        "weeks": weeks,
+        "weekly": weekly,
+        "totals": totals,
+        "rates": calculate_tracker_rates(totals),
+    }
 
-    total_days = len(habit_log)
-    completed_days = habit_log[habit_name].sum()
-    return (completed_days / total_days * 100) if total_days > 0 else 0.0
+def update_tracker_cube(cube, idx, values):
+    """Fold an edit of one day's metrics into the cube without re-aggregating the other days"""
+    daily = cube["daily"]
+    metrics = [col for col in daily.columns if col in values]
+    delta = pd.Series({col: values[col] for col in metrics}) - daily.loc[idx, metrics]
+    daily.loc[idx, metrics] = daily.loc[idx, metrics] + delta
+
+    cumulative = cube["cumulative"]
+    cumulative.iloc[daily.index.get_loc(idx):, cumulative.columns.get_indexer(metrics)] += delta.to_numpy()
+    if cube["weeks"] is not None:
+        cube["weekly"].loc[cube["weeks"].loc[idx], metrics] += delta
+    cube["totals"][metrics] += delta
+    cube["rates"] = calculate_tracker_rates(cube["totals"])
+
+def get_tracker_cube(df, version):
+    """Tracker cube for the session's daily tracker, rebuilt only when the data version changes"""
+    cube = st.session_state.get('tracker_cube')
+    if cube is None or cube["version"] != version:
+        cube = build_tracker_cube(df)
+        cube["version"] = version
+        st.session_state.tracker_cube = cube
+    return cube
 
 # Title
 st.markdown('''
@@ -533,13 +1322,12 @@ st.sidebar.subheader("☁️ Google Sheets Sync")
 col1, col2 = st.sidebar.columns(2)
 with col1:
     if st.button("⬇️ Load Sheets", use_container_width=True):
-        st.cache_data.clear()
+        invalidate_sheet_snapshots()
         with st.spinner("Loading data..."):
-            daily_data = load_daily_tracker()
-            leads_data = load_leads_database()
+            daily_data, leads_data = load_all_sheets()
 
             if daily_data is not None and not daily_data.empty:
-                st.session_state.sheets_data = daily_data
+                st.session_state.sheets_data = daily_data.copy()
                 st.sidebar.success(f"✅ Daily: {len(daily_data)} rows")
             else:
                 st.sidebar.warning("⚠️ No daily tracker data")
@@ -553,7 +1341,9 @@ with col1:
 
 with col2:
     if st.button("🔄 Refresh", use_container_width=True):
-        st.cache_data.clear()
+        invalidate_sheet_snapshots()
+        with st.spinner("Syncing with Google Sheets..."):
+            load_all_sheets()
         st.rerun()
 
 # Debug info
@@ -575,7 +1365,7 @@ st.sidebar.markdown("---")
 # Load data
 daily_df = st.session_state.sheets_data if st.session_state.sheets_data is not None else st.session_state.daily_tracker
 leads_df = st.session_state.leads_sheets_data if st.session_state.leads_sheets_data is not None else load_leads_database()
-habit_log = st.session_state.habit_log
+habit_log = unpack_habit_log(st.session_state.habit_bits)
 
 # Challenge info
 current_day = get_current_day()
@@ -584,11 +1374,16 @@ st.sidebar.markdown(f"**📅 Day {current_day} of 30**")
 st.sidebar.progress(current_day / 30)
 st.sidebar.markdown(f"**Started:** {st.session_state.challenge_start_date}")
 
-# Quick stats - LinkedIn
-total_sent = daily_df['Connections_Sent'].sum() if 'Connections_Sent' in daily_df.columns else 0
-total_accepted = daily_df['Connections_Accepted'].sum() if 'Connections_Accepted' in daily_df.columns else 0
-total_interested = daily_df['Interested_Responses'].sum() if 'Interested_Responses' in daily_df.columns else 0
-total_conversions = daily_df['Conversions'].sum() if 'Conversions' in daily_df.columns else 0
+# Quick stats - LinkedIn (every tracker KPI is served from the aggregate cube)
+daily_version = frame_version(daily_df)
+tracker_cube = get_tracker_cube(daily_df, daily_version)
+tracker_totals = tracker_cube["totals"]
+tracker_rates = tracker_cube["rates"]
+total_sent = tracker_totals['Connections_Sent']
+total_accepted = tracker_totals['Connections_Accepted']
+messages_sent = tracker_totals['Initial_Messages_Sent']
+total_interested = tracker_totals['Interested_Responses']
+total_conversions = tracker_totals['Conversions']
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 🎯 LinkedIn Progress")
@@ -614,9 +1409,10 @@ if not today_habits.empty:
     st.sidebar.progress(completed_today / total_habits if total_habits > 0 else 0)
 
     # Show top streaks
+    habit_stats = get_habit_stats(st.session_state.habit_bits)
     for habit in habit_columns[:3]:
         if habit in habit_log.columns:
-            streak = calculate_streak(habit_log, habit)
+            streak = habit_stats.at[habit, 'Current Streak']
             if streak > 0:
                 st.sidebar.markdown(f"🔥 **{habit.replace('_', ' ')}:** {streak} days")
 
@@ -645,8 +1441,8 @@ st.sidebar.download_button(
     use_container_width=True
 )
 
-# Main Tabs
-tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11, tab12 = st.tabs([
+# Main Tabs: only the selected tab runs on a rerun, so rerun time scales with one view rather than twelve
+TAB_LABELS = [
     "🏠 Dashboard",
     "📅 Daily Tracker",
     "✅ Habit Tracker",
@@ -659,10 +1455,16 @@ tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11, tab12 = st.t
     "🔥 Streaks & Rewards",
     "🔗 Webhook Monitor",
     "⚙️ Settings"
-])
+]
+
+if 'current_tab' not in st.session_state:
+    st.session_state.current_tab = TAB_LABELS[0]
+
+active_tab = st.radio("View", TAB_LABELS, key="current_tab", horizontal=True, label_visibility="collapsed")
 
 # TAB 1: UNIFIED DASHBOARD
-with tab1:
+def render_dashboard():
+    """Render the unified dashboard tab"""
     st.markdown("## 🏠 Unified Performance Dashboard")
     st.markdown("*Your complete productivity overview in one place*")
 
@@ -680,8 +1482,7 @@ with tab1:
         st.markdown('<div class="metric-card success-card">', unsafe_allow_html=True)
         st.markdown("### ✅ Accepted")
         st.markdown(f"<div class='big-metric'>{int(total_accepted)}</div>", unsafe_allow_html=True)
-        acceptance = (total_accepted/total_sent*100) if total_sent > 0 else 0
-        st.markdown(f"<center>{acceptance:.1f}% rate</center>", unsafe_allow_html=True)
+        st.markdown(f"<center>{tracker_rates['acceptance']:.1f}% rate</center>", unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
     with col3:
@@ -695,8 +1496,7 @@ with tab1:
         st.markdown('<div class="metric-card warning-card">', unsafe_allow_html=True)
         st.markdown("### 🎉 Conversions")
         st.markdown(f"<div class='big-metric'>{int(total_conversions)}</div>", unsafe_allow_html=True)
-        conv_rate = (total_conversions/total_interested*100) if total_interested > 0 else 0
-        st.markdown(f"<center>{conv_rate:.1f}% rate</center>", unsafe_allow_html=True)
+        st.markdown(f"<center>{tracker_rates['conversion']:.1f}% rate</center>", unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
     with col5:
@@ -782,7 +1582,7 @@ with tab1:
     with col2:
         st.markdown("### Daily Habit Completion Rate")
         habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes']]
-        habit_log_copy = habit_log.copy()
+        habit_log_copy = habit_log.copy(deep=False)  # only adds columns
         habit_log_copy['Completion_Rate'] = habit_log_copy[habit_columns].sum(axis=1) / len(habit_columns) * 100
         fig = px.line(habit_log_copy, x='Date', y='Completion_Rate',
                      title='Daily Habit Completion %',
@@ -801,22 +1601,16 @@ with tab1:
     with col1:
         st.markdown("### LinkedIn Weekly Totals")
         if 'Day' in daily_df.columns:
-            df_weekly = daily_df.copy()
-            df_weekly['Week'] = ((df_weekly['Day'] - 1) // 7) + 1
-
-            weekly_summary = df_weekly.groupby('Week').agg({
-                'Connections_Sent': 'sum',
-                'Connections_Accepted': 'sum',
-                'Interested_Responses': 'sum',
-                'Conversions': 'sum'
-            }).reset_index()
+            weekly_summary = tracker_cube["weekly"][[
+                'Connections_Sent', 'Connections_Accepted', 'Interested_Responses', 'Conversions'
+            ]].reset_index()
 
             weekly_summary['Week'] = 'Week ' + weekly_summary['Week'].astype(str)
             st.dataframe(weekly_summary, use_container_width=True)
 
     with col2:
         st.markdown("### Habit Weekly Averages")
-        habit_log_copy = habit_log.copy()
+        habit_log_copy = habit_log.copy(deep=False)  # only adds columns
         habit_log_copy['Week'] = (pd.to_datetime(habit_log_copy['Date']) - pd.to_datetime(habit_log_copy['Date'].min())).dt.days // 7 + 1
 
         habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes', 'Week']]
@@ -855,7 +1649,8 @@ with tab1:
         st.markdown(f'<div class="stage-card"><b>To reach 1,200:</b> {needed_daily:.0f}/day for {days_left} days</div>', unsafe_allow_html=True)
 
 # TAB 2: DAILY TRACKER (LinkedIn)
-with tab2:
+def render_daily_tracker():
+    """Render the LinkedIn daily tracker tab"""
     st.markdown("## 📅 LinkedIn Daily Activity Tracker")
 
     st.markdown("### ⚡ Quick Entry - Today")
@@ -901,6 +1696,14 @@ with tab2:
             daily_df.loc[today_idx, 'Conversions'] = conv_today
             daily_df.loc[today_idx, 'Notes'] = notes_today
             st.session_state.daily_tracker = daily_df
+            # Only today's row changed, so the cube takes the delta instead of being rebuilt on the rerun
+            update_tracker_cube(tracker_cube, today_idx, {
+                'Connections_Sent': conn_today, 'Connections_Accepted': acc_today,
+                'Initial_Messages_Sent': msg_today, 'Interested_Responses': int_today,
+                'Links_Sent': link_today, 'Conversions': conv_today
+            })
+            tracker_cube["version"] = frame_version(daily_df)
+            save_local_dataset("daily_tracker_edits", daily_df)
             st.success("✅ LinkedIn progress saved!")
             st.rerun()
 
@@ -923,9 +1726,9 @@ with tab2:
 
     with col2:
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=daily_df['Day'], y=daily_df['Connections_Sent'].cumsum(),
+        fig.add_trace(go.Scatter(x=daily_df['Day'], y=tracker_cube["cumulative"]['Connections_Sent'],
                                 name='Sent', mode='lines+markers'))
-        fig.add_trace(go.Scatter(x=daily_df['Day'], y=daily_df['Connections_Accepted'].cumsum(),
+        fig.add_trace(go.Scatter(x=daily_df['Day'], y=tracker_cube["cumulative"]['Connections_Accepted'],
                                 name='Accepted', mode='lines+markers'))
         fig.add_hline(y=1200, line_dash="dash", line_color="green",
                      annotation_text="Goal: 1,200")
@@ -933,7 +1736,8 @@ with tab2:
         st.plotly_chart(fig, use_container_width=True)
 
 # TAB 3: HABIT TRACKER
-with tab3:
+def render_habit_tracker():
+    """Render the habit tracker tab"""
     st.markdown("## ✅ Daily Habit Tracker")
     st.markdown("*Build consistency, track streaks, achieve your goals*")
 
@@ -948,6 +1752,7 @@ with tab3:
         today_idx = today_idx[0]
 
         habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes']]
+        habit_stats = get_habit_stats(st.session_state.habit_bits)
 
         # Create habit checkboxes in a grid
         cols_per_row = 3
@@ -959,8 +1764,8 @@ with tab3:
                     habit_display = habit.replace('_', ' ').title()
 
                     current_value = habit_log.loc[today_idx, habit] if habit in habit_log.columns else False
-                    streak = calculate_streak(habit_log, habit)
-                    success_rate = calculate_success_rate(habit_log, habit)
+                    streak = habit_stats.at[habit, 'Current Streak']
+                    success_rate = habit_stats.at[habit, 'Success Rate']
 
                     with col:
                         st.markdown(f"**{habit_display}**")
@@ -972,8 +1777,10 @@ with tab3:
                         )
 
                         if new_value != current_value:
+                            set_habit_bit(st.session_state.habit_bits, today_idx, habit, new_value)
                             habit_log.loc[today_idx, habit] = new_value
-                            st.session_state.habit_log = habit_log
+                            st.session_state.habit_log_version += 1
+                            save_local_dataset("habit_log", habit_log)
 
                         if streak > 0:
                             st.markdown(f'<span class="streak-badge">🔥 {streak} day streak</span>', unsafe_allow_html=True)
@@ -990,8 +1797,10 @@ with tab3:
         )
 
         if st.button("💾 Save Today's Habits", type="primary", use_container_width=True):
+            set_habit_note(st.session_state.habit_bits, today_idx, today_notes)
             habit_log.loc[today_idx, 'Notes'] = today_notes
-            st.session_state.habit_log = habit_log
+            st.session_state.habit_log_version += 1
+            save_local_dataset("habit_log", habit_log)
             st.success("✅ Habits saved successfully!")
             st.rerun()
 
@@ -1003,32 +1812,9 @@ with tab3:
     habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes']]
 
     # Create summary statistics
-    habit_stats = []
-    for habit in habit_columns:
-        if habit in habit_log.columns:
-            streak = calculate_streak(habit_log, habit)
-            success_rate = calculate_success_rate(habit_log, habit)
-            total_completions = habit_log[habit].sum()
-
-            # Calculate longest streak
-            longest_streak = 0
-            current_streak = 0
-            for val in habit_log[habit]:
-                if val:
-                    current_streak += 1
-                    longest_streak = max(longest_streak, current_streak)
-                else:
-                    current_streak = 0
-
-            habit_stats.append({
-                'Habit': habit.replace('_', ' ').title(),
-                'Current Streak': streak,
-                'Longest Streak': longest_streak,
-                'Total Completions': int(total_completions),
-                'Success Rate': f"{success_rate:.1f}%"
-            })
-
-    habit_stats_df = pd.DataFrame(habit_stats)
+    habit_stats_df = get_habit_stats(st.session_state.habit_bits).reset_index()
+    habit_stats_df['Habit'] = habit_stats_df['Habit'].str.replace('_', ' ').str.title()
+    habit_stats_df['Success Rate'] = habit_stats_df['Success Rate'].map("{:.1f}%".format)
     st.dataframe(habit_stats_df, use_container_width=True)
 
     st.markdown("---")
@@ -1092,7 +1878,8 @@ with tab3:
     st.dataframe(habit_log, use_container_width=True, height=400)
 
 # TAB 4: LEADS CRM
-with tab4:
+def render_leads_crm():
+    """Render the leads CRM tab"""
     st.markdown("## 👥 Leads CRM - From Google Sheets")
     st.caption("Data from linkedin-tracking-csv.csv sheet (GID: 1881909623)")
 
@@ -1189,13 +1976,16 @@ with tab4:
         else:
             st.dataframe(filtered_df, use_container_width=True, height=500)
 
+        # Messages and summary are loaded from the lead text store only for the lead opened here
+        st.markdown("### 🔍 Lead Details")
+        render_lead_text_details(filtered_df, "crm_detail_lead")
+
         # Export filtered data
         st.markdown("---")
-        csv_filtered = io.StringIO()
-        filtered_df.to_csv(csv_filtered, index=False)
+        # Built only when clicked, since it joins every filtered lead's texts back in
         st.download_button(
             label=f"📥 Download Filtered Leads ({len(filtered_df)} records)",
-            data=csv_filtered.getvalue(),
+            data=lambda: with_lead_texts(filtered_df).to_csv(index=False),
             file_name=f"filtered_leads_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
             mime="text/csv",
             use_container_width=True
@@ -1206,7 +1996,8 @@ with tab4:
         st.info("📌 Click '⬇️ Load Sheets' button in the sidebar to fetch lead data")
 
 # TAB 5: ADVANCED SEARCH
-with tab5:
+def render_advanced_search():
+    """Render the advanced lead search tab"""
     st.markdown("## 🔍 Advanced Lead Search & Generation")
     st.markdown("*Search and connect with decision-makers worldwide*")
 
@@ -1440,7 +2231,8 @@ with tab5:
         st.info("No recent activity to display")
 
 # TAB 6: CONVERSATIONS
-with tab6:
+def render_conversations():
+    """Render the conversations tab"""
     st.markdown("## 💬 Conversation History")
     st.markdown("*Track all your LinkedIn conversations in one place*")
 
@@ -1475,41 +2267,24 @@ with tab6:
         # Display conversations
         st.markdown("### 💬 Recent Conversations")
 
-        for idx, row in leads_df.head(20).iterrows():
-            profile_name = row.get('name', row.get('profile_name', 'Unknown'))
-            linkedin_url = row.get('linkedin_url', '#')
-            message = row.get('linkedin_message', 'No message')
-            timestamp = row.get('timestamp', 'N/A')
-            status = row.get('connection_status', 'pending')
-
-            st.markdown(f"""
-            <div style='background: rgba(255, 255, 255, 0.98); padding: 2rem; border-radius: 20px;
-                        margin: 1rem 0; box-shadow: 0 4px 12px rgba(0,0,0,0.1);'>
-                <div style='display: flex; justify-content: space-between; align-items: start; margin-bottom: 1rem;'>
-                    <div>
-                        <h3 style='color: #667eea; margin: 0;'>{profile_name}</h3>
-                        <p style='color: #666; margin: 0.5rem 0;'>{row.get('profile_tagline', row.get('tagline', 'N/A'))}</p>
-                    </div>
-                    <span style='background: #667eea; color: white; padding: 0.5rem 1rem;
-                                border-radius: 20px; font-size: 0.9rem;'>{status}</span>
-                </div>
-                <div style='background: #f8f9fa; padding: 1.5rem; border-radius: 15px;
-                            border-left: 4px solid #667eea; margin: 1rem 0;'>
-                    <p style='color: #2d3748; margin: 0; line-height: 1.6;'>{message}</p>
-                </div>
-                <div style='display: flex; justify-content: space-between; align-items: center; margin-top: 1rem;'>
-                    <span style='color: #999; font-size: 0.9rem;'>📅 {timestamp}</span>
-                    <a href="{linkedin_url}" target="_blank"
-                       style='background: #667eea; color: white; padding: 0.5rem 1.5rem;
-                              border-radius: 15px; text-decoration: none;'>View Profile</a>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        recent = leads_df.head(20)
+        if 'linkedin_message' not in recent.columns:
+            recent = recent.join(get_lead_texts(recent, ['linkedin_message']))
+        rows = zip(
+            column_values(recent, 'name') if 'name' in recent.columns else column_values(recent, 'profile_name', 'Unknown'),
+            column_values(recent, 'profile_tagline') if 'profile_tagline' in recent.columns else column_values(recent, 'tagline', 'N/A'),
+            column_values(recent, 'connection_status', 'pending'),
+            column_values(recent, 'linkedin_message', 'No message'),
+            column_values(recent, 'timestamp', 'N/A'),
+            column_values(recent, 'linkedin_url', '#')
+        )
+        st.markdown(render_fragments("conversation_card", render_conversation_card, rows), unsafe_allow_html=True)
     else:
         st.info("💬 No conversations yet. Start your outreach to see conversations here!")
 
 # TAB 7: EMAIL QUEUE
-with tab7:
+def render_email_queue():
+    """Render the email queue tab"""
     st.markdown("## 📧 Email Queue Manager")
     st.markdown("*Manage and send follow-up emails to your leads*")
 
@@ -1558,7 +2333,8 @@ with tab7:
 
 
 # TAB 8: ANALYTICS HUB
-with tab8:
+def render_analytics_hub():
+    """Render the analytics hub tab"""
     st.markdown("## 📊 Advanced Analytics Hub")
     st.markdown("*Deep insights into your LinkedIn outreach and habit performance*")
 
@@ -1567,30 +2343,24 @@ with tab8:
 
     col1, col2, col3, col4, col5 = st.columns(5)
 
-    messages_sent = daily_df['Initial_Messages_Sent'].sum() if 'Initial_Messages_Sent' in daily_df.columns else 0
-
     with col1:
         if total_sent > 0:
-            acceptance_rate = (total_accepted / total_sent) * 100
-            st.metric("Acceptance Rate", f"{acceptance_rate:.1f}%",
+            st.metric("Acceptance Rate", f"{tracker_rates['acceptance']:.1f}%",
                      "Target: 30-40%")
 
     with col2:
         if total_accepted > 0:
-            message_rate = (messages_sent / total_accepted) * 100
-            st.metric("Message Rate", f"{message_rate:.1f}%",
+            st.metric("Message Rate", f"{tracker_rates['message']:.1f}%",
                      "% messaged")
 
     with col3:
         if messages_sent > 0:
-            interest_rate = (total_interested / messages_sent) * 100
-            st.metric("Interest Rate", f"{interest_rate:.1f}%",
+            st.metric("Interest Rate", f"{tracker_rates['interest']:.1f}%",
                      "Target: 15-25%")
 
     with col4:
         if total_interested > 0:
-            final_conv_rate = (total_conversions / total_interested) * 100
-            st.metric("Conversion Rate", f"{final_conv_rate:.1f}%",
+            st.metric("Conversion Rate", f"{tracker_rates['conversion']:.1f}%",
                      "Target: 5-15%")
 
     with col5:
@@ -1604,32 +2374,37 @@ with tab8:
     # Combined performance analysis
     st.markdown("### 📈 Integrated Performance Analysis")
 
+    # Figures are rebuilt only when the data they are drawn from changes
+    habit_version = frame_version(habit_log)
+
     # Create correlation between habits and LinkedIn performance
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("#### LinkedIn Conversion Funnel")
-        funnel_data = {
-            'Stage': ['Sent', 'Accepted', 'Messaged', 'Interested', 'Converted'],
-            'Count': [total_sent, total_accepted, messages_sent, total_interested, total_conversions]
-        }
-        fig = go.Figure(go.Funnel(
-            y=funnel_data['Stage'],
-            x=funnel_data['Count'],
-            textinfo="value+percent initial"
-        ))
-        st.plotly_chart(fig, use_container_width=True)
+        def build_funnel():
+            funnel_data = {
+                'Stage': ['Sent', 'Accepted', 'Messaged', 'Interested', 'Converted'],
+                'Count': [total_sent, total_accepted, messages_sent, total_interested, total_conversions]
+            }
+            return go.Figure(go.Funnel(
+                y=funnel_data['Stage'],
+                x=funnel_data['Count'],
+                textinfo="value+percent initial"
+            ))
+        st.plotly_chart(get_cached_figure("linkedin_funnel", daily_version, build_funnel), use_container_width=True)
 
     with col2:
         st.markdown("#### Habit Completion by Category")
-        habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes']]
-        habit_completion = {habit.replace('_', ' ').title(): habit_log[habit].sum()
-                          for habit in habit_columns if habit in habit_log.columns}
+        def build_habit_completion():
+            habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes']]
+            habit_completion = {habit.replace('_', ' ').title(): habit_log[habit].sum()
+                              for habit in habit_columns if habit in habit_log.columns}
 
-        fig = px.bar(x=list(habit_completion.keys()), y=list(habit_completion.values()),
-                    title='Total Completions by Habit',
-                    labels={'x': 'Habit', 'y': 'Completions'})
-        st.plotly_chart(fig, use_container_width=True)
+            return px.bar(x=list(habit_completion.keys()), y=list(habit_completion.values()),
+                         title='Total Completions by Habit',
+                         labels={'x': 'Habit', 'y': 'Completions'})
+        st.plotly_chart(get_cached_figure("habit_completion", habit_version, build_habit_completion), use_container_width=True)
 
     st.markdown("---")
 
@@ -1641,43 +2416,40 @@ with tab8:
     with col1:
         st.markdown("#### LinkedIn Weekly Performance")
         if 'Day' in daily_df.columns:
-            df_weekly = daily_df.copy()
-            df_weekly['Week'] = ((df_weekly['Day'] - 1) // 7) + 1
-
-            weekly_summary = df_weekly.groupby('Week').agg({
-                'Connections_Sent': 'sum',
-                'Connections_Accepted': 'sum',
-                'Conversions': 'sum'
-            }).reset_index()
-
-            fig = go.Figure()
-            fig.add_trace(go.Bar(x=weekly_summary['Week'], y=weekly_summary['Connections_Sent'],
-                                name='Sent'))
-            fig.add_trace(go.Bar(x=weekly_summary['Week'], y=weekly_summary['Connections_Accepted'],
-                                name='Accepted'))
-            fig.add_trace(go.Bar(x=weekly_summary['Week'], y=weekly_summary['Conversions'],
-                                name='Conversions'))
-            fig.update_layout(barmode='group', title='Weekly LinkedIn Metrics')
-            st.plotly_chart(fig, use_container_width=True)
+            def build_weekly_linkedin():
+                weekly_summary = tracker_cube["weekly"].reset_index()
+
+                fig = go.Figure()
+                fig.add_trace(go.Bar(x=weekly_summary['Week'], y=weekly_summary['Connections_Sent'],
+                                    name='Sent'))
+                fig.add_trace(go.Bar(x=weekly_summary['Week'], y=weekly_summary['Connections_Accepted'],
+                                    name='Accepted'))
+                fig.add_trace(go.Bar(x=weekly_summary['Week'], y=weekly_summary['Conversions'],
+                                    name='Conversions'))
+                fig.update_layout(barmode='group', title='Weekly LinkedIn Metrics')
+                return fig
+            st.plotly_chart(get_cached_figure("weekly_linkedin", daily_version, build_weekly_linkedin), use_container_width=True)
 
     with col2:
         st.markdown("#### Habit Weekly Completion Rates")
-        habit_log_copy = habit_log.copy()
-        habit_log_copy['Week'] = (pd.to_datetime(habit_log_copy['Date']) - pd.to_datetime(habit_log_copy['Date'].min())).dt.days // 7 + 1
+        def build_weekly_habits():
+            habit_log_copy = habit_log.copy(deep=False)  # only adds columns
+            habit_log_copy['Week'] = (pd.to_datetime(habit_log_copy['Date']) - pd.to_datetime(habit_log_copy['Date'].min())).dt.days // 7 + 1
 
-        habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes', 'Week']]
-        weekly_habits = habit_log_copy.groupby('Week')[habit_columns].mean() * 100
+            habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes', 'Week']]
+            weekly_habits = habit_log_copy.groupby('Week')[habit_columns].mean() * 100
 
-        fig = go.Figure()
-        for habit in habit_columns[:5]:  # Show top 5 habits
-            if habit in weekly_habits.columns:
-                fig.add_trace(go.Scatter(x=weekly_habits.index, y=weekly_habits[habit],
-                                        mode='lines+markers',
-                                        name=habit.replace('_', ' ').title()))
-
-        fig.update_layout(title='Weekly Habit Completion %',
-                         xaxis_title='Week', yaxis_title='Completion %')
-        st.plotly_chart(fig, use_container_width=True)
+            fig = go.Figure()
+            for habit in habit_columns[:5]:  # Show top 5 habits
+                if habit in weekly_habits.columns:
+                    fig.add_trace(go.Scatter(x=weekly_habits.index, y=weekly_habits[habit],
+                                            mode='lines+markers',
+                                            name=habit.replace('_', ' ').title()))
+
+            fig.update_layout(title='Weekly Habit Completion %',
+                             xaxis_title='Week', yaxis_title='Completion %')
+            return fig
+        st.plotly_chart(get_cached_figure("weekly_habits", habit_version, build_weekly_habits), use_container_width=True)
 
     st.markdown("---")
 
@@ -1685,32 +2457,35 @@ with tab8:
     st.markdown("### 🔗 Habit-Performance Correlation")
     st.markdown("*Discover which habits correlate with better LinkedIn performance*")
 
-    # Calculate daily habit completion rate
-    habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes']]
-    habit_log_analysis = habit_log.copy()
-    habit_log_analysis['Daily_Habit_Rate'] = habit_log_analysis[habit_columns].sum(axis=1) / len(habit_columns) * 100
-
     # Merge with LinkedIn data
-    if 'Date' in daily_df.columns and 'Date' in habit_log_analysis.columns:
-        merged_data = pd.merge(daily_df, habit_log_analysis[['Date', 'Daily_Habit_Rate']],
-                              on='Date', how='inner')
-
+    if 'Date' in daily_df.columns and 'Date' in habit_log.columns:
+        def build_habit_correlation(metric, title, label):
+            # Calculate daily habit completion rate
+            habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes']]
+            habit_log_analysis = habit_log.copy(deep=False)  # only adds columns
+            habit_log_analysis['Daily_Habit_Rate'] = habit_log_analysis[habit_columns].sum(axis=1) / len(habit_columns) * 100
+            merged_data = pd.merge(daily_df, habit_log_analysis[['Date', 'Daily_Habit_Rate']],
+                                  on='Date', how='inner')
+
+            return px.scatter(merged_data, x='Daily_Habit_Rate', y=metric,
+                             title=title,
+                             labels={'Daily_Habit_Rate': 'Daily Habit Completion %',
+                                    metric: label},
+                             trendline="ols")
+
+        correlation_version = (daily_version, habit_version)
         col1, col2 = st.columns(2)
 
         with col1:
-            fig = px.scatter(merged_data, x='Daily_Habit_Rate', y='Connections_Sent',
-                           title='Habit Completion vs Connections Sent',
-                           labels={'Daily_Habit_Rate': 'Daily Habit Completion %',
-                                  'Connections_Sent': 'Connections Sent'},
-                           trendline="ols")
+            fig = get_cached_figure("habit_correlation", correlation_version, build_habit_correlation,
+                                    metric='Connections_Sent', title='Habit Completion vs Connections Sent',
+                                    label='Connections Sent')
             st.plotly_chart(fig, use_container_width=True)
 
         with col2:
-            fig = px.scatter(merged_data, x='Daily_Habit_Rate', y='Conversions',
-                           title='Habit Completion vs Conversions',
-                           labels={'Daily_Habit_Rate': 'Daily Habit Completion %',
-                                  'Conversions': 'Conversions'},
-                           trendline="ols")
+            fig = get_cached_figure("habit_correlation", correlation_version, build_habit_correlation,
+                                    metric='Conversions', title='Habit Completion vs Conversions',
+                                    label='Conversions')
             st.plotly_chart(fig, use_container_width=True)
 
     st.markdown("---")
@@ -1760,7 +2535,8 @@ with tab8:
             st.metric("Overall Success", f"{overall_prob:.0f}%")
 
 # TAB 9: DAILY CHECKLIST
-with tab9:
+def render_daily_checklist():
+    """Render the daily checklist tab"""
     st.markdown("## ✅ Daily Outreach & Habit Checklist")
     st.markdown(f"### Day {current_day} of 30 - {datetime.now().strftime('%A, %B %d, %Y')}")
 
@@ -1897,7 +2673,8 @@ with tab9:
             st.error("💪 Room to improve!")
 
 # TAB 10: STREAKS & REWARDS
-with tab10:
+def render_streaks_rewards():
+    """Render the streaks and rewards tab"""
     st.markdown("## 🔥 Streaks, Achievements & Rewards")
     st.markdown("*Celebrate your consistency and unlock achievements!*")
 
@@ -1906,28 +2683,9 @@ with tab10:
 
     habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes']]
 
-    streak_data = []
-    for habit in habit_columns:
-        if habit in habit_log.columns:
-            streak = calculate_streak(habit_log, habit)
-            success_rate = calculate_success_rate(habit_log, habit)
-
-            # Calculate longest streak
-            longest_streak = 0
-            current_streak = 0
-            for val in habit_log[habit]:
-                if val:
-                    current_streak += 1
-                    longest_streak = max(longest_streak, current_streak)
-                else:
-                    current_streak = 0
-
-            streak_data.append({
-                'Habit': habit.replace('_', ' ').title(),
-                'Current Streak': streak,
-                'Longest Streak': longest_streak,
-                'Success Rate': success_rate
-            })
+    streak_data = get_habit_stats(st.session_state.habit_bits).reset_index().drop(columns='Total Completions')
+    streak_data['Habit'] = streak_data['Habit'].str.replace('_', ' ').str.title()
+    streak_data = streak_data.to_dict('records')
 
     # Sort by current streak
     streak_data.sort(key=lambda x: x['Current Streak'], reverse=True)
@@ -2034,7 +2792,7 @@ with tab10:
     st.markdown("*Visual representation of your consistency*")
 
     # Create a calendar view
-    habit_log_calendar = habit_log.copy()
+    habit_log_calendar = habit_log.copy(deep=False)  # only adds columns
     habit_log_calendar['Total_Completed'] = habit_log_calendar[habit_columns].sum(axis=1)
     habit_log_calendar['Completion_Rate'] = (habit_log_calendar['Total_Completed'] / len(habit_columns) * 100).round(0)
 
@@ -2048,7 +2806,8 @@ with tab10:
     st.plotly_chart(fig, use_container_width=True)
 
 # TAB 11: WEBHOOK MONITOR
-with tab11:
+def render_webhook_monitor():
+    """Render the webhook monitor tab"""
     st.markdown("## 🔗 Webhook Monitor & Testing")
     st.markdown("*Monitor webhook activity and test connections*")
 
@@ -2077,7 +2836,7 @@ with tab11:
                     'timestamp': datetime.now().isoformat()
                 }
 
-                success, response = send_webhook_request(WEBHOOK_URL, test_payload)
+                success, response = test_webhook_request(WEBHOOK_URL, test_payload)
 
                 if success:
                     st.success("✅ Webhook test successful!")
@@ -2099,10 +2858,22 @@ with tab11:
     # Webhook history
     st.markdown("### 📜 Webhook History")
 
+    # Delivery state comes from the outbox, shared by every session
+    outbox_stats = get_webhook_outbox_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("📬 Pending", outbox_stats["counts"].get("pending", 0) + outbox_stats["counts"].get("sending", 0))
+    with col2:
+        st.metric("✅ Delivered", outbox_stats["counts"].get("sent", 0))
+    with col3:
+        st.metric("❌ Failed", outbox_stats["counts"].get("failed", 0))
+    with col4:
+        st.metric("⚡ Deliveries/s (1 min)", f"{outbox_stats['throughput']:.2f}")
+
     if st.session_state.webhook_history:
         for entry in reversed(st.session_state.webhook_history[-20:]):
-            status_color = '#10b981' if entry['status'] == 'success' else '#ef4444'
-            status_icon = '✅' if entry['status'] == 'success' else '❌'
+            status_color = {'success': '#10b981', 'queued': '#f59e0b'}.get(entry['status'], '#ef4444')
+            status_icon = {'success': '✅', 'queued': '📬'}.get(entry['status'], '❌')
 
             st.markdown(f"""
             <div style='background: rgba(255, 255, 255, 0.98); padding: 1.5rem; border-radius: 15px;
@@ -2129,7 +2900,8 @@ with tab11:
 
 
 # TAB 12: SETTINGS
-with tab12:
+def render_settings():
+    """Render the settings tab"""
     st.markdown("## ⚙️ Settings & Configuration")
 
     # Challenge settings
@@ -2159,16 +2931,17 @@ with tab12:
 
     st.markdown("**Current Habits:**")
     habit_columns = [col for col in habit_log.columns if col not in ['Date', 'Notes']]
+    habit_stats = get_habit_stats(st.session_state.habit_bits)
 
     for habit in habit_columns:
         col1, col2, col3 = st.columns([3, 1, 1])
         with col1:
             st.text(habit.replace('_', ' ').title())
         with col2:
-            streak = calculate_streak(habit_log, habit)
+            streak = habit_stats.at[habit, 'Current Streak']
             st.caption(f"🔥 {streak} day streak")
         with col3:
-            success_rate = calculate_success_rate(habit_log, habit)
+            success_rate = habit_stats.at[habit, 'Success Rate']
             st.caption(f"✅ {success_rate:.0f}%")
 
     st.markdown("---")
@@ -2198,7 +2971,7 @@ with tab12:
 
                 # Add leads if available
                 if leads_df is not None and not leads_df.empty:
-                    csv_leads = leads_df.to_csv(index=False)
+                    csv_leads = with_lead_texts(leads_df).to_csv(index=False)
                     zip_file.writestr('leads_database.csv', csv_leads)
 
             st.download_button(
@@ -2217,7 +2990,10 @@ with tab12:
         if st.button("🔄 Reset All Data", use_container_width=True):
             if st.checkbox("I understand this will delete all my data"):
                 st.session_state.daily_tracker = create_empty_daily_tracker()
-                st.session_state.habit_log = create_empty_habit_log()
+                st.session_state.habit_bits = pack_habit_log(create_empty_habit_log())
+                st.session_state.habit_log_version += 1
+                save_local_dataset("daily_tracker_edits", st.session_state.daily_tracker)
+                save_local_dataset("habit_log", unpack_habit_log(st.session_state.habit_bits))
                 st.session_state.challenge_start_date = datetime.now().strftime("%Y-%m-%d")
                 st.success("✅ Data reset complete!")
                 st.rerun()
@@ -2264,6 +3040,23 @@ with tab12:
     Built with Streamlit, Pandas, and Plotly
     """)
 
+# Render the selected tab
+TAB_RENDERERS = dict(zip(TAB_LABELS, [
+    render_dashboard,
+    render_daily_tracker,
+    render_habit_tracker,
+    render_leads_crm,
+    render_advanced_search,
+    render_conversations,
+    render_email_queue,
+    render_analytics_hub,
+    render_daily_checklist,
+    render_streaks_rewards,
+    render_webhook_monitor,
+    render_settings
+]))
+TAB_RENDERERS[active_tab]()
+
 # Footer
 st.markdown("---")
 st.markdown("""